@@ -0,0 +1,156 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Client-side index over the reservations of an allocation listing.
+
+The index is built once from the output of
+``AllocationClientManager.list()`` and answers time window queries, such
+as which hosts are free between two dates, without rescanning every
+reservation.
+"""
+
+import bisect
+
+from blazarclient import exception
+from blazarclient.i18n import _
+from blazarclient import utils
+
+
+class IntervalIndex(object):
+    """Static index of half-open [start, end) intervals.
+
+    Intervals are kept in arrays sorted by start, with an implicit segment
+    tree holding the maximum end of each range of them. Finding the
+    intervals overlapping a window costs O(log n) plus O(log n) per
+    match.
+
+    :param intervals: iterable of (start, end, payload) tuples, with
+                      numeric start and end.
+    """
+
+    def __init__(self, intervals):
+        items = sorted(intervals, key=lambda item: item[0])
+        self.starts = [item[0] for item in items]
+        self.ends = [item[1] for item in items]
+        self.payloads = [item[2] for item in items]
+
+        size = 1
+        while size < len(items):
+            size *= 2
+        tree = [float('-inf')] * (2 * size)
+        tree[size:size + len(items)] = self.ends
+        for node in range(size - 1, 0, -1):
+            left, right = tree[2 * node], tree[2 * node + 1]
+            tree[node] = left if left > right else right
+        self._size = size
+        self._tree = tree
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlapping(self, start, end):
+        """Yield the payloads of intervals overlapping [start, end).
+
+        Payloads are yielded by increasing interval start.
+        """
+        # Only the intervals starting before the end of the window can
+        # overlap it, and those are a prefix of the sorted arrays.
+        limit = bisect.bisect_left(self.starts, end)
+        tree = self._tree
+        stack = [(1, 0, self._size)]
+        while stack:
+            node, low, high = stack.pop()
+            if low >= limit or tree[node] <= start:
+                continue
+            if high - low == 1:
+                yield self.payloads[low]
+                continue
+            middle = (low + high) // 2
+            stack.append((2 * node + 1, middle, high))
+            stack.append((2 * node, low, middle))
+
+
+class _ResourceIntervals(object):
+    """Sorted reservation starts of one resource with running max ends."""
+
+    __slots__ = ('starts', 'max_ends')
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals)
+        self.starts = [start for start, end in intervals]
+        self.max_ends = []
+        max_end = float('-inf')
+        for start, end in intervals:
+            max_end = end if end > max_end else max_end
+            self.max_ends.append(max_end)
+
+    def is_free(self, start, end):
+        position = bisect.bisect_left(self.starts, end)
+        return position == 0 or self.max_ends[position - 1] <= start
+
+
+class AllocationIndex(object):
+    """Index of the reservations allocated to a set of resources.
+
+    :param allocations: allocations as returned by
+                        ``AllocationClientManager.list()``, each with a
+                        resource_id and a list of reservations having
+                        start_date and end_date.
+    """
+
+    def __init__(self, allocations):
+        self.resource_ids = []
+        self._resources = {}
+        intervals = []
+        for allocation in allocations:
+            resource_id = allocation['resource_id']
+            resource_intervals = []
+            for reservation in allocation['reservations']:
+                start = utils.to_timestamp(reservation['start_date'])
+                end = utils.to_timestamp(reservation['end_date'])
+                resource_intervals.append((start, end))
+                intervals.append((start, end, (resource_id, reservation)))
+            self.resource_ids.append(resource_id)
+            self._resources[resource_id] = _ResourceIntervals(
+                resource_intervals)
+        self._intervals = IntervalIndex(intervals)
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def overlapping(self, start, end):
+        """Return (resource_id, reservation) pairs overlapping a window."""
+        return list(self._intervals.overlapping(utils.to_timestamp(start),
+                                                utils.to_timestamp(end)))
+
+    def is_free(self, resource_id, start, end):
+        """Return whether a resource has no reservation in a window."""
+        return self._resources[resource_id].is_free(utils.to_timestamp(start),
+                                                    utils.to_timestamp(end))
+
+    def free(self, start, end, count=None):
+        """Return the IDs of resources without reservation in a window.
+
+        :param count: stop after finding this many free resources.
+        """
+        start = utils.to_timestamp(start)
+        end = utils.to_timestamp(end)
+        if end <= start:
+            raise exception.BlazarClientException(
+                _('The end of the window must be after its start.'))
+        free = []
+        for resource_id in self.resource_ids:
+            if self._resources[resource_id].is_free(start, end):
+                free.append(resource_id)
+                if count is not None and len(free) >= count:
+                    break
+        return free
@@ -0,0 +1,167 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Reservation utilization computed from allocations or leases.
+
+Reservations are turned into NumPy arrays of start and end timestamps, in
+UTC seconds, and the number of resources reserved over time is binned at
+any resolution without looping over reservations in Python.
+
+NumPy is an optional dependency, installed with the ``analytics`` extra.
+"""
+
+import collections
+import warnings
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from blazarclient import exception
+from blazarclient.i18n import _
+from blazarclient import utils
+
+LEASE_WEIGHT_KEYS = {
+    'physical:host': 'max',
+    'virtual:instance': 'amount',
+    'virtual:floatingip': 'amount',
+}
+
+
+def _require_numpy():
+    if numpy is None:
+        raise exception.BlazarClientException(
+            _('NumPy is required to compute utilization, install '
+              'python-blazarclient[analytics].'))
+
+
+def to_timestamps(dates):
+    """Convert a sequence of dates to an array of UTC seconds.
+
+    ISO 8601 strings without an offset, such as the dates returned by the
+    Blazar API, are parsed by NumPy in one pass. Other values, including
+    strings with an offset which NumPy only parses with a warning, fall
+    back to ``utils.to_timestamp()``.
+    """
+    _require_numpy()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            values = numpy.array(dates, dtype='datetime64[us]')
+    except (TypeError, ValueError, UserWarning, DeprecationWarning):
+        return numpy.array([utils.to_timestamp(date)
+                            for date in dates], dtype=float)
+    return values.astype('int64') / 1e6
+
+
+def _arrays(starts, ends, weights):
+    return (to_timestamps(starts), to_timestamps(ends),
+            numpy.array(weights, dtype=float))
+
+
+def allocation_arrays(allocations, groups=None):
+    """Return the reservation arrays of allocations, by group of resources.
+
+    :param allocations: allocations as returned by
+                        ``AllocationClientManager.list()``.
+    :param groups: optional dict mapping resource IDs to a group. Resources
+                   missing from it are left out; without it, every
+                   reservation belongs to the None group.
+    :returns: a dict mapping each group to (starts, ends, weights) arrays,
+              each reservation having a weight of one resource.
+    """
+    _require_numpy()
+    dates = collections.defaultdict(lambda: ([], []))
+    for allocation in allocations:
+        if groups is None:
+            group = None
+        else:
+            resource_id = str(allocation['resource_id'])
+            if resource_id not in groups:
+                continue
+            group = groups[resource_id]
+        starts, ends = dates[group]
+        for reservation in allocation['reservations']:
+            starts.append(reservation['start_date'])
+            ends.append(reservation['end_date'])
+    return {group: _arrays(starts, ends, [1] * len(starts))
+            for group, (starts, ends) in dates.items()}
+
+
+def lease_arrays(leases, resource_type='physical:host'):
+    """Return the reservation arrays of leases for a resource type.
+
+    Leases do not tell which resources were allocated, so each reservation
+    is weighted by the number of resources it asks for: max for hosts and
+    amount for instances and floating IPs.
+
+    :returns: (starts, ends, weights) arrays.
+    """
+    _require_numpy()
+    weight_key = LEASE_WEIGHT_KEYS.get(resource_type)
+    starts, ends, weights = [], [], []
+    for lease in leases:
+        for reservation in lease.get('reservations', []):
+            if reservation.get('resource_type') != resource_type:
+                continue
+            starts.append(lease['start_date'])
+            ends.append(lease['end_date'])
+            weights.append(int(reservation.get(weight_key) or 1))
+    return _arrays(starts, ends, weights)
+
+
+def _integral(sorted_times, cumulative_weights, cumulative_moments, times):
+    """Return sum(w * max(0, t - x)) over events x for each t of times."""
+    position = numpy.searchsorted(sorted_times, times, side='right')
+    weights = numpy.concatenate(([0.0], cumulative_weights))[position]
+    moments = numpy.concatenate(([0.0], cumulative_moments))[position]
+    return times * weights - moments
+
+
+def utilization(starts, ends, weights, start, end, resolution):
+    """Bin the number of reserved resources over a time window.
+
+    The reserved count is a step function going up at each reservation
+    start and down at each end. Its integral up to any time is computed
+    from cumulative sums over the sorted events, so each bin gets the
+    exact time-weighted average of the reserved count in O(log n).
+
+    :param starts: array of reservation starts, in UTC seconds.
+    :param ends: array of reservation ends, in UTC seconds.
+    :param weights: array of resources held by each reservation.
+    :param start: start of the window, in UTC seconds.
+    :param end: end of the window, in UTC seconds.
+    :param resolution: width of the bins in seconds. The last bin is
+                       truncated at the end of the window.
+    :returns: a (bin starts, average reserved count) tuple of arrays.
+    """
+    _require_numpy()
+    if resolution <= 0 or end <= start:
+        raise exception.BlazarClientException(
+            _('The resolution and the time window must be positive.'))
+    edges = numpy.arange(start, end, resolution, dtype=float)
+    edges = numpy.append(edges, float(end))
+
+    # Times are taken relative to the window to keep the cumulative sums
+    # of weighted times small enough for float precision.
+    offsets = edges - edges[0]
+    integrals = numpy.zeros(len(edges))
+    for times, sign in ((starts, 1.0), (ends, -1.0)):
+        times = numpy.asarray(times, dtype=float) - edges[0]
+        order = numpy.argsort(times, kind='stable')
+        times = times[order]
+        sorted_weights = numpy.asarray(weights, dtype=float)[order]
+        integrals += sign * _integral(times, numpy.cumsum(sorted_weights),
+                                      numpy.cumsum(sorted_weights * times),
+                                      offsets)
+    return edges[:-1], numpy.diff(integrals) / numpy.diff(edges)
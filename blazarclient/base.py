@@ -13,21 +13,30 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+from urllib import parse
+
 from keystoneauth1 import adapter
+from keystoneauth1 import exceptions as ks_exceptions
 from oslo_serialization import jsonutils
 import requests
 
+from blazarclient import endpoints
 from blazarclient import exception
 from blazarclient.i18n import _
 
+DEFAULT_PAGE_SIZE = 1000
+
 
 class RequestManager(object):
     """Manager to create request from given Blazar URL and auth token."""
 
-    def __init__(self, blazar_url, auth_token, user_agent):
+    def __init__(self, blazar_url, auth_token, user_agent, recorder=None):
         self.blazar_url = blazar_url
         self.auth_token = auth_token
         self.user_agent = user_agent
+        # blazarclient.recording.Recorder of the requests, if any.
+        self.recorder = recorder
 
     def get(self, url):
         """Sends get request to Blazar.
@@ -94,12 +103,17 @@ class RequestManager(object):
         kwargs['headers']['Accept'] = 'application/json'
         kwargs['headers']['x-auth-token'] = self.auth_token
 
+        request_body = None
         if 'body' in kwargs:
+            request_body = kwargs.pop('body')
             kwargs['headers']['Content-Type'] = 'application/json'
-            kwargs['data'] = jsonutils.dump_as_bytes(kwargs['body'])
-            del kwargs['body']
+            kwargs['data'] = jsonutils.dump_as_bytes(request_body)
 
-        resp = requests.request(method, self.blazar_url + url, **kwargs)
+        started = time.perf_counter()
+        resp = self._send(method, url, **kwargs)
+        if self.recorder is not None:
+            self.recorder.record(method, url, request_body, resp,
+                                 time.perf_counter() - started)
 
         try:
             body = jsonutils.loads(resp.text)
@@ -117,13 +131,67 @@ class RequestManager(object):
 
         return resp, body
 
+    def _send(self, method, url, **kwargs):
+        return requests.request(method, self.blazar_url + url, **kwargs)
+
+
+class ReplayRequestManager(RequestManager):
+    """Manager serving the responses of a recording.
+
+    :param replay: a blazarclient.recording.Replay.
+    """
+
+    def __init__(self, replay, user_agent, recorder=None):
+        super(ReplayRequestManager, self).__init__('', None, user_agent,
+                                                   recorder=recorder)
+        self.replay = replay
+
+    def _send(self, method, url, **kwargs):
+        return self.replay.respond(method, url)
+
 
 class SessionClient(adapter.LegacyJsonAdapter):
     """Manager to create request with keystoneauth1 session."""
 
+    # blazarclient.recording.Recorder of the requests, if any.
+    recorder = None
+    # blazarclient.endpoints.EndpointCache of the endpoint, if any.
+    endpoint_cache = None
+    # Endpoint resolved through the cache, which unlike endpoint_override
+    # is not set by the user.
+    _cached_endpoint = None
+    _endpoint_key = None
+
+    def _resolve_endpoint(self):
+        """Set _cached_endpoint from the endpoint cache."""
+        key = endpoints.make_key(self.session, self.service_type,
+                                 self.interface, self.region_name,
+                                 self.version)
+        if key is not None:
+            self._cached_endpoint = self.endpoint_cache.resolve(
+                key, self.get_endpoint)
+            self._endpoint_key = key
+
     def request(self, url, method, **kwargs):
-        resp, body = super(SessionClient, self).request(
-            url, method, raise_exc=False, **kwargs)
+        if self.endpoint_cache is not None and not self.endpoint_override:
+            if self._cached_endpoint is None:
+                self._resolve_endpoint()
+            if self._cached_endpoint:
+                kwargs.setdefault('endpoint_override', self._cached_endpoint)
+        started = time.perf_counter()
+        try:
+            resp, body = super(SessionClient, self).request(
+                url, method, raise_exc=False, **kwargs)
+        except ks_exceptions.ConnectFailure:
+            # The cached endpoint may be gone, resolve it again next time.
+            if self._endpoint_key is not None:
+                self.endpoint_cache.invalidate(self._endpoint_key)
+                self._cached_endpoint = None
+                self._endpoint_key = None
+            raise
+        if self.recorder is not None:
+            self.recorder.record(method, url, kwargs.get('body'), resp,
+                                 time.perf_counter() - started)
 
         if resp.status_code >= 400:
             if body is not None:
@@ -141,21 +209,72 @@ class BaseClientManager(object):
     """Base class for managing resources of Blazar."""
 
     user_agent = 'python-blazarclient'
+    # Compact record type of the resources, see blazarclient.records.
+    record_class = None
 
-    def __init__(self, blazar_url, auth_token, session, **kwargs):
+    def __init__(self, blazar_url, auth_token, session, compact_records=False,
+                 recorder=None, replay=None, endpoint_cache=None, **kwargs):
         self.blazar_url = blazar_url
         self.auth_token = auth_token
         self.session = session
+        self.compact_records = compact_records
 
-        if self.session:
+        if replay is not None:
+            self.request_manager = ReplayRequestManager(
+                replay, user_agent=self.user_agent)
+        elif self.session:
             self.request_manager = SessionClient(
                 session=self.session,
                 user_agent=self.user_agent,
                 **kwargs
             )
+            if endpoint_cache is None:
+                endpoint_cache = endpoints.default_cache()
+            self.request_manager.endpoint_cache = endpoint_cache
         elif self.blazar_url and self.auth_token:
             self.request_manager = RequestManager(blazar_url=self.blazar_url,
                                                   auth_token=self.auth_token,
                                                   user_agent=self.user_agent)
         else:
             raise exception.InsufficientAuthInformation
+        if recorder is not None:
+            self.request_manager.recorder = recorder
+
+    def _record(self, resource):
+        """Return a resource as a compact record if they are enabled."""
+        if self.compact_records and self.record_class is not None:
+            return self.record_class.from_dict(resource)
+        return resource
+
+    def _records(self, resources):
+        """Return resources as compact records if they are enabled."""
+        if self.compact_records and self.record_class is not None:
+            return [self.record_class.from_dict(r) for r in resources]
+        return resources
+
+    def _list_iter(self, url, response_key, page_size=DEFAULT_PAGE_SIZE,
+                   marker_key='id'):
+        """Yield the resources of a collection one page at a time.
+
+        Pages are requested with the limit and marker query parameters. A
+        server ignoring them returns the whole collection on the first
+        request, which is then yielded only once.
+        """
+        marker = None
+        first = None
+        while True:
+            query = {'limit': page_size}
+            if marker is not None:
+                query['marker'] = marker
+            resp, body = self.request_manager.get('%s%s%s' % (
+                url, '&' if '?' in url else '?', parse.urlencode(query)))
+            page = body[response_key]
+            if not page:
+                return
+            if marker is not None and page[0][marker_key] == first:
+                return
+            first = page[0][marker_key]
+            yield from page
+            if len(page) != page_size:
+                return
+            marker = page[-1][marker_key]
@@ -0,0 +1,559 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Load generator measuring the capacity of a Blazar API.
+
+``blazar-bench`` sends a weighted mix of operations, made with the client
+managers, for a duration or a number of requests, and reports the
+throughput, latency percentiles and errors of each operation::
+
+    blazar-bench --mix lease-list=4,lease-create=1,lease-delete=1 \\
+        --concurrency 20 --duration 60 --output results.json
+
+It authenticates like the ``blazar`` command, from the ``--os-*`` options
+or the ``OS_*`` environment variables. ``--self-test`` runs against an
+in-process fake API instead, see blazarclient.testing.fake_server.
+
+Without ``--rate``, each of the ``--concurrency`` workers sends its next
+request as soon as the previous one completes. With ``--rate``, requests
+are scheduled at that many per second and the workers send them when they
+are due; the latency of a request is measured from the time it was due,
+so that a saturated API shows in the latencies instead of lowering the
+rate.
+
+Leases created by the run are named after ``--prefix``, reserve one host
+each in separate windows a year ahead, and are deleted at the end unless
+``--keep-leases`` is given.
+"""
+
+import argparse
+import datetime
+import platform
+import random
+import sys
+import threading
+import time
+
+from keystoneauth1 import exceptions as ks_exceptions
+from keystoneauth1 import loading
+from keystoneauth1 import session as ks_session
+from keystoneauth1 import token_endpoint
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
+import requests
+
+from blazarclient import client as blazar_client
+from blazarclient import exception
+from blazarclient.i18n import _
+from blazarclient.testing import fake_server
+from blazarclient import utils
+from blazarclient import version
+
+# Version of the layout of the JSON results.
+RESULTS_FORMAT = 1
+DEFAULT_MIX = ('lease-list=4,lease-show=2,allocation-list=2,'
+               'allocation-get=1,lease-create=1,lease-update=1,'
+               'lease-delete=1')
+PERCENTILES = (50, 95, 99)
+ERRORS = (exception.BlazarClientException, requests.RequestException,
+          ks_exceptions.ClientException)
+
+_OPERATIONS = {}
+
+
+def operation(name):
+    """Register an operation of the workload mixes.
+
+    The decorated function takes the Workload and returns the callable to
+    time, so that the requests preparing an operation are not timed.
+    """
+    def decorator(factory):
+        _OPERATIONS[name] = factory
+        return factory
+    return decorator
+
+
+def operations():
+    """Return the names of the operations, sorted."""
+    return sorted(_OPERATIONS)
+
+
+class Workload(object):
+    """Client and leases shared by the workers of a run.
+
+    :param client: a blazarclient v1 Client.
+    :param prefix: prefix of the names of the leases created.
+    :param host_reservations: whether created leases reserve a host.
+    """
+
+    def __init__(self, client, prefix='blazar-bench', host_reservations=True):
+        self.client = client
+        self.prefix = prefix
+        self.host_reservations = host_reservations
+        self.random = random.Random()
+        self._lock = threading.Lock()
+        # IDs of the leases created by the run and not deleted yet.
+        self._created = []
+        self._count = 0
+        self._origin = (timeutils.utcnow().replace(second=0, microsecond=0) +
+                        datetime.timedelta(days=365))
+        self._lease_ids = None
+        self._host_ids = None
+
+    def lease_values(self):
+        """Return the create() arguments of a new lease.
+
+        Every lease gets its own one hour window, so that host
+        reservations never compete for the same hosts.
+        """
+        with self._lock:
+            self._count += 1
+            count = self._count
+        start = self._origin + datetime.timedelta(hours=2 * count)
+        reservations = []
+        if self.host_reservations:
+            reservations.append({'resource_type': 'physical:host',
+                                 'min': 1, 'max': 1,
+                                 'hypervisor_properties': '',
+                                 'resource_properties': ''})
+        return {'name': '%s-%d' % (self.prefix, count),
+                'start': utils.format_api_date(start),
+                'end': utils.format_api_date(
+                    start + datetime.timedelta(hours=1)),
+                'reservations': reservations, 'events': []}
+
+    def add_created(self, lease):
+        with self._lock:
+            self._created.append(lease['id'])
+
+    def take_created(self):
+        """Return the ID of a lease of the run, creating one if needed.
+
+        The lease is no longer listed as created until add_created() gives
+        it back.
+        """
+        with self._lock:
+            if self._created:
+                return self._created.pop(
+                    self.random.randrange(len(self._created)))
+        return self.client.lease.create(**self.lease_values())['id']
+
+    def load_leases(self):
+        """List the leases lease_id() picks from.
+
+        run() calls it before starting the workers. Leases named with the
+        prefix are left out, as the run may delete them.
+        """
+        lease_ids = [lease['id'] for lease in self.client.lease.list()
+                     if not (lease.get('name') or '').startswith(self.prefix)]
+        with self._lock:
+            self._lease_ids = lease_ids
+
+    def lease_id(self):
+        """Return the ID of a lease which existed before the run."""
+        if self._lease_ids is None:
+            self.load_leases()
+        with self._lock:
+            if not self._lease_ids:
+                raise exception.BlazarClientException(
+                    _('There is no lease to show.'))
+            return self.random.choice(self._lease_ids)
+
+    def host_id(self):
+        """Return the ID of a host."""
+        with self._lock:
+            if self._host_ids is None:
+                self._host_ids = [host['id']
+                                  for host in self.client.host.list()]
+            if not self._host_ids:
+                raise exception.BlazarClientException(
+                    _('There is no host to query the allocation of.'))
+            return self.random.choice(self._host_ids)
+
+    def clean_up(self):
+        """Delete the leases of the run, returning how many failed."""
+        with self._lock:
+            created, self._created = self._created, []
+        failed = 0
+        for lease_id in created:
+            try:
+                self.client.lease.delete(lease_id)
+            except ERRORS:
+                failed += 1
+        return failed
+
+
+@operation('lease-create')
+def _lease_create(workload):
+    values = workload.lease_values()
+
+    def create():
+        workload.add_created(workload.client.lease.create(**values))
+    return create
+
+
+@operation('lease-update')
+def _lease_update(workload):
+    lease_id = workload.take_created()
+
+    def update():
+        try:
+            workload.client.lease.update(
+                lease_id, name='%s-updated' % workload.prefix)
+        finally:
+            workload.add_created({'id': lease_id})
+    return update
+
+
+@operation('lease-delete')
+def _lease_delete(workload):
+    lease_id = workload.take_created()
+
+    def delete():
+        try:
+            workload.client.lease.delete(lease_id)
+        except ERRORS:
+            workload.add_created({'id': lease_id})
+            raise
+    return delete
+
+
+@operation('lease-list')
+def _lease_list(workload):
+    return workload.client.lease.list
+
+
+@operation('lease-show')
+def _lease_show(workload):
+    lease_id = workload.lease_id()
+    return lambda: workload.client.lease.get(lease_id)
+
+
+@operation('host-list')
+def _host_list(workload):
+    return workload.client.host.list
+
+
+@operation('allocation-list')
+def _allocation_list(workload):
+    return lambda: workload.client.allocation.list('os-hosts')
+
+
+@operation('allocation-get')
+def _allocation_get(workload):
+    host_id = workload.host_id()
+    return lambda: workload.client.allocation.get('os-hosts', host_id)
+
+
+def parse_mix(value):
+    """Parse a mix of 'NAME=WEIGHT,...' into a dict of weights.
+
+    :raises: BlazarClientException if an operation is unknown or a weight
+             is not a positive number.
+    """
+    mix = {}
+    for item in value.split(','):
+        name, sep, weight = item.strip().partition('=')
+        if name not in _OPERATIONS:
+            raise exception.BlazarClientException(
+                _("Unknown operation '%(name)s', must be one of "
+                  "%(operations)s.") % {'name': name,
+                                        'operations': ', '.join(
+                                            operations())})
+        try:
+            mix[name] = float(weight) if sep else 1.0
+        except ValueError:
+            mix[name] = -1
+        if mix[name] <= 0:
+            raise exception.BlazarClientException(
+                _("Invalid weight '%(weight)s' of %(name)s.") %
+                {'weight': weight, 'name': name})
+    return mix
+
+
+def _error_name(error):
+    code = getattr(error, 'kwargs', {}).get('code')
+    if code is None:
+        code = getattr(error, 'http_status', None)
+    return 'HTTP %d' % code if code else type(error).__name__
+
+
+class _Schedule(object):
+    """Hand out the requests of a run to the workers."""
+
+    def __init__(self, rate, duration, count):
+        self.rate = rate
+        self.count = count
+        self.start = time.perf_counter()
+        self.deadline = self.start + duration if duration else None
+        self._issued = 0
+        self._lock = threading.Lock()
+
+    def next(self):
+        """Return the time the next request is due, or None at the end."""
+        with self._lock:
+            if self.count is not None and self._issued >= self.count:
+                return None
+            now = time.perf_counter()
+            due = (self.start + self._issued / self.rate if self.rate
+                   else now)
+            if self.deadline is not None and max(due, now) >= self.deadline:
+                return None
+            self._issued += 1
+            return due
+
+
+def run(workload, mix, concurrency=10, rate=None, duration=10.0,
+        count=None, seed=0):
+    """Send a mix of operations and return the samples.
+
+    :param mix: dict of relative weights by operation name.
+    :param concurrency: number of workers sending requests.
+    :param rate: requests per second to schedule, or None to send them as
+                 fast as the workers go.
+    :param duration: seconds after which no request is started, or None.
+    :param count: number of requests after which the run stops, or None.
+    :param seed: seed of the choice of the operations.
+    :returns: a tuple of the seconds the run took and a list of (operation
+              name, latency in seconds, error name or None) samples.
+    """
+    if duration is None and count is None:
+        raise exception.BlazarClientException(
+            _('A run needs a duration or a number of requests.'))
+    names, weights = zip(*sorted(mix.items()))
+    workload.random.seed(seed)
+    if 'lease-show' in mix:
+        workload.load_leases()
+    schedule = _Schedule(rate, duration, count)
+    samples = []
+
+    def work(worker):
+        rand = random.Random('%s-%d' % (seed, worker))
+        while True:
+            due = schedule.next()
+            if due is None:
+                return
+            name = rand.choices(names, weights)[0]
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            error = None
+            prepared = None
+            begun = time.perf_counter()
+            try:
+                call = _OPERATIONS[name](workload)
+                prepared = time.perf_counter()
+                call()
+            except ERRORS as e:
+                error = _error_name(e)
+            ended = time.perf_counter()
+            # The time spent preparing the operation is not part of its
+            # latency, the time spent waiting for a worker is.
+            latency = ended - due - ((prepared or ended) - begun)
+            samples.append((name, latency, error))
+
+    threads = [threading.Thread(target=work, args=(i,), daemon=True)
+               for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - schedule.start, samples
+
+
+def _percentile(latencies, percent):
+    # Nearest rank, latencies being sorted.
+    rank = max(1, -(-len(latencies) * percent // 100))
+    return latencies[int(rank) - 1]
+
+
+def _statistics(samples, elapsed):
+    latencies = sorted(latency for name, latency, error in samples)
+    errors = {}
+    for name, latency, error in samples:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+    error_count = sum(errors.values())
+    result = {
+        'requests': len(samples),
+        'throughput': len(samples) / elapsed if elapsed else 0.0,
+        'errors': error_count,
+        'error_rate': error_count / len(samples) if samples else 0.0,
+        'error_types': errors,
+        'latency': None,
+    }
+    if latencies:
+        result['latency'] = dict(
+            min=latencies[0], max=latencies[-1],
+            mean=sum(latencies) / len(latencies),
+            **{'p%d' % percent: _percentile(latencies, percent)
+               for percent in PERCENTILES})
+    return result
+
+
+def summarize(elapsed, samples):
+    """Return the statistics of run() results.
+
+    Latencies include the failed requests.
+
+    :returns: a dict with the statistics of each operation, under
+              'operations', and of all of them, under 'total'.
+    """
+    by_name = {}
+    for sample in samples:
+        by_name.setdefault(sample[0], []).append(sample)
+    return {'elapsed': elapsed,
+            'operations': {name: _statistics(name_samples, elapsed)
+                           for name, name_samples in sorted(by_name.items())},
+            'total': _statistics(samples, elapsed)}
+
+
+def report(summary, stream=None):
+    """Write a table of summarize() results, latencies in milliseconds."""
+    stream = stream or sys.stdout
+    columns = ['p%d' % percent for percent in PERCENTILES] + ['max']
+    stream.write('%-16s %8s %9s %s %8s\n' % (
+        'operation', 'requests', 'req/s',
+        ' '.join('%9s' % column for column in columns), 'errors'))
+    rows = list(summary['operations'].items())
+    rows.append(('total', summary['total']))
+    for name, stats in rows:
+        latency = stats['latency'] or dict.fromkeys(columns, 0.0)
+        stream.write('%-16s %8d %9.1f %s %7.2f%%\n' % (
+            name, stats['requests'], stats['throughput'],
+            ' '.join('%9.1f' % (latency[column] * 1000)
+                     for column in columns),
+            stats['error_rate'] * 100))
+    errors = summary['total']['error_types']
+    if errors:
+        stream.write('errors: %s\n' % ', '.join(
+            '%s x %d' % item for item in sorted(errors.items())))
+
+
+def _make_client(options):
+    auth = loading.load_auth_from_argparse_arguments(options)
+    sess = loading.load_session_from_argparse_arguments(options, auth=auth)
+    return blazar_client.Client(1, session=sess,
+                                service_type=options.os_service_type,
+                                interface=options.os_interface,
+                                region_name=options.os_region_name)
+
+
+def metadata(**options):
+    """Describe the environment of a run, with the given options."""
+    return dict(options,
+                blazarclient=version.__version__,
+                python=platform.python_version(),
+                implementation=platform.python_implementation(),
+                platform=platform.platform(),
+                machine=platform.machine(),
+                date=datetime.datetime.utcnow().isoformat())
+
+
+def _bench(args, client):
+    workload = Workload(client, prefix=args.prefix,
+                        host_reservations=args.reservation == 'host')
+    try:
+        elapsed, samples = run(workload, args.mix, args.concurrency,
+                               args.rate, args.duration, args.requests,
+                               args.seed)
+    finally:
+        if not args.keep_leases:
+            failed = workload.clean_up()
+            if failed:
+                sys.stderr.write('%d leases of the run could not be '
+                                 'deleted\n' % failed)
+    return summarize(elapsed, samples)
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help='weighted operations, as NAME=WEIGHT,... with '
+                             'names among %s' % ', '.join(operations()))
+    parser.add_argument('--concurrency', type=int, default=10,
+                        help='number of concurrent workers')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='requests per second to schedule, as fast as '
+                             'the workers go by default')
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help='seconds to run for')
+    parser.add_argument('--requests', type=int, default=None,
+                        help='number of requests after which to stop')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the choice of the operations')
+    parser.add_argument('--prefix', default='blazar-bench',
+                        help='prefix of the names of the leases created')
+    parser.add_argument('--reservation', choices=('host', 'none'),
+                        default='host',
+                        help='reservation of the leases created')
+    parser.add_argument('--keep-leases', action='store_true',
+                        help='do not delete the leases created')
+    parser.add_argument('-f', '--format', choices=('text', 'json'),
+                        default='text', help='format of the report')
+    parser.add_argument('--output', default=None,
+                        help='file to write the JSON results to')
+    parser.add_argument('--self-test', action='store_true',
+                        help='run against an in-process fake API')
+    parser.add_argument('--self-test-size', type=int, default=100,
+                        help='number of hosts and leases of the fake API')
+    parser.add_argument('--self-test-latency', type=float, default=0.0,
+                        help='seconds added to the fake API responses')
+    parser.add_argument('--self-test-error-rate', type=float, default=0.0,
+                        help='fraction of the fake API requests failing')
+    loading.register_auth_argparse_arguments(parser, argv)
+    loading.session.register_argparse_arguments(parser)
+    loading.adapter.register_argparse_arguments(
+        parser, service_type='reservation')
+    args = parser.parse_args(argv)
+    try:
+        args.mix = parse_mix(args.mix)
+    except exception.BlazarClientException as e:
+        parser.error(str(e))
+    if args.concurrency < 1:
+        parser.error('--concurrency must be positive')
+    if args.requests is not None:
+        args.duration = None
+
+    if args.self_test:
+        app = fake_server.FakeBlazar(latency=args.self_test_latency,
+                                     error_rate=args.self_test_error_rate)
+        app.populate(hosts=args.self_test_size, leases=args.self_test_size)
+        with fake_server.serve(app) as url:
+            summary = _bench(args, blazar_client.Client(
+                1, session=ks_session.Session(
+                    auth=token_endpoint.Token(url, 'token'))))
+    else:
+        summary = _bench(args, _make_client(args))
+
+    results = {'format': RESULTS_FORMAT,
+               'metadata': metadata(
+                   mix=args.mix, concurrency=args.concurrency,
+                   rate=args.rate, duration=args.duration,
+                   requests=args.requests, self_test=args.self_test),
+               'results': summary}
+    if args.format == 'json':
+        sys.stdout.write(jsonutils.dumps(results, indent=2, sort_keys=True))
+        sys.stdout.write('\n')
+    else:
+        report(summary)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(jsonutils.dumps(results, indent=2, sort_keys=True))
+            f.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -13,14 +13,18 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 import ast
+import itertools
 import logging
+import os
 
 from cliff import command
 from cliff.formatters import table
 from cliff import lister
 from cliff import show
 
+from blazarclient import base
 from blazarclient import exception
+from blazarclient.i18n import _
 from blazarclient import utils
 
 HEX_ELEM = '[0-9A-Fa-f]'
@@ -28,6 +32,27 @@ UUID_PATTERN = '-'.join([HEX_ELEM + '{8}', HEX_ELEM + '{4}',
                          HEX_ELEM + '{4}', HEX_ELEM + '{4}',
                          HEX_ELEM + '{12}'])
 
+# Only strings evaluating to a container or to None change how a value is
+# displayed, so anything else is left alone without calling the parser.
+LITERAL_PREFIXES = ('[', '{', '(')
+
+
+def _literal_eval(value):
+    """Deserialize a string into a list, dict or None if it looks like one.
+
+    Returns the original string when it cannot be evaluated.
+    """
+    stripped = value.lstrip(' \t')
+    if not stripped.startswith(LITERAL_PREFIXES):
+        if stripped.rstrip() != 'None':
+            return value
+    try:
+        return ast.literal_eval(stripped)
+    except (SyntaxError, ValueError, TypeError):
+        # NOTE(sbauza): This is probably a datetime string or something AST
+        #               cannot evaluate, we need to keep it unchanged.
+        return value
+
 
 class OpenStackCommand(command.Command):
     """Base class for OpenStack commands."""
@@ -69,6 +94,9 @@ class BlazarCommand(OpenStackCommand):
     allow_names = True
     name_key = None
     id_pattern = UUID_PATTERN
+    allow_mirror = False
+    # Mirror opened by get_reader(), closed once the command ran.
+    _mirror = None
 
     def __init__(self, app, app_args):
         super(BlazarCommand, self).__init__(app, app_args)
@@ -88,32 +116,59 @@ class BlazarCommand(OpenStackCommand):
         else:
             return self.app.client
 
+    def get_reader(self, parsed_args):
+        """Return the client, or the local mirror with --from-mirror.
+
+        The mirror is closed once the command ran.
+        """
+        if not getattr(parsed_args, 'from_mirror', False):
+            return self.get_client()
+        # NOTE: Imported here, so that the commands not reading a mirror
+        #       do not import sqlite3.
+        from blazarclient import mirror
+
+        source = mirror.source(self.get_client())
+        path = mirror.default_path(source)
+        if not os.path.exists(path):
+            raise exception.BlazarClientException(
+                _('No mirror found at %s, run the sync command first.') %
+                path)
+        self.close_reader()
+        self._mirror = mirror.Mirror(path, source=source)
+        return self._mirror
+
+    def close_reader(self):
+        """Close the mirror opened by get_reader(), if any."""
+        if self._mirror is not None:
+            self._mirror.close()
+            self._mirror = None
+
+    def run(self, parsed_args):
+        try:
+            return super(BlazarCommand, self).run(parsed_args)
+        finally:
+            self.close_reader()
+
     def get_parser(self, prog_name):
         parser = super(BlazarCommand, self).get_parser(prog_name)
+        if self.allow_mirror:
+            parser.add_argument(
+                '--from-mirror',
+                action='store_true',
+                default=False,
+                help='Read from the local mirror updated by the sync '
+                     'command instead of the API. Its path is taken from '
+                     'BLAZAR_MIRROR, defaulting to a file per endpoint and '
+                     'project in ~/.cache/blazarclient.'
+            )
         return parser
 
     def format_output_data(self, data):
         for k, v in data.items():
             if isinstance(v, str):
-                try:
-                    # Deserialize if possible into dict, lists, tuples...
-                    v = ast.literal_eval(v)
-                except SyntaxError:
-                    # NOTE(sbauza): This is probably a datetime string, we need
-                    #               to keep it unchanged.
-                    pass
-                except ValueError:
-                    # NOTE(sbauza): This is not something AST can evaluate,
-                    #               probably a string.
-                    pass
-            if isinstance(v, list):
-                value = '\n'.join(utils.dumps(
-                    i, indent=self.json_indent) if isinstance(i, dict)
-                    else str(i) for i in v)
-                data[k] = value
-            elif isinstance(v, dict):
-                value = utils.dumps(v, indent=self.json_indent)
-                data[k] = value
+                v = _literal_eval(v)
+            if isinstance(v, (list, dict)):
+                data[k] = utils.format_nested(v, indent=self.json_indent)
             elif v is None:
                 data[k] = ''
 
@@ -230,41 +285,103 @@ class ListCommand(BlazarCommand, lister.Lister):
     _formatters = {}
     list_columns = []
     unknown_parts_flag = True
+    allow_stream = True
+    allow_limit = True
+    # NOTE: The cliff list formatters and those of blazarclient.formatters
+    #       are registered under a namespace of their own, so that other
+    #       cliff applications do not offer the blazarclient ones.
+    formatter_namespace = 'blazarclient.formatter.list'
+
+    def validate_sort_by(self, sort_by):
+        for key, descending in utils.parse_sort_keys(sort_by):
+            if key not in self.list_columns:
+                msg = 'Invalid sort option %s' % sort_by
+                raise exception.BlazarClientException(msg)
 
     def args2body(self, parsed_args):
         params = {}
         if parsed_args.sort_by:
-            if parsed_args.sort_by in self.list_columns:
-                params['sort_by'] = parsed_args.sort_by
-            else:
-                msg = 'Invalid sort option %s' % parsed_args.sort_by
-                raise exception.BlazarClientException(msg)
+            self.validate_sort_by(parsed_args.sort_by)
+            params['sort_by'] = parsed_args.sort_by
         return params
 
     def get_parser(self, prog_name):
         parser = super(ListCommand, self).get_parser(prog_name)
+        if self.allow_stream:
+            parser.add_argument(
+                '--stream',
+                action='store_true',
+                default=False,
+                help='Fetch the %ss one page at a time and print them as '
+                     'they arrive, in server order.' % self.resource
+            )
+            parser.add_argument(
+                '--page-size', metavar='<page_size>',
+                type=int,
+                default=base.DEFAULT_PAGE_SIZE,
+                help='Number of records to fetch per request with --stream '
+                     '(default: %d)' % base.DEFAULT_PAGE_SIZE
+            )
+        if self.allow_limit:
+            parser.add_argument(
+                '--limit', metavar='<limit>',
+                type=int,
+                default=None,
+                help='Show only the first <limit> %ss, after sorting' %
+                     self.resource
+            )
         return parser
 
     def retrieve_list(self, parsed_args):
-        """Retrieve a list of resources from Blazar server."""
-        blazar_client = self.get_client()
+        """Retrieve a list of resources from Blazar server.
+
+        With --stream, an iterator fetching the resources page by page is
+        returned instead of a list.
+        """
+        blazar_client = self.get_reader(parsed_args)
         body = self.args2body(parsed_args)
         resource_manager = getattr(blazar_client, self.resource)
+        limit = getattr(parsed_args, 'limit', None)
+        if limit is not None and limit < 0:
+            raise exception.BlazarClientException(
+                'Invalid limit %d, must not be negative' % limit)
+        if getattr(parsed_args, 'stream', False):
+            # NOTE: Sorting needs the whole list, so streamed records are
+            #       kept in the order the server returns them.
+            body.pop('sort_by', None)
+            data = resource_manager.list_iter(page_size=parsed_args.page_size,
+                                              **body)
+            if limit is not None:
+                data = itertools.islice(data, limit)
+            return data
+        if limit is not None:
+            # NOTE: Only the first records are shown, so they are selected
+            #       with a heap here instead of sorting the whole list.
+            sort_by = body.pop('sort_by', None)
+            data = resource_manager.list(**body)
+            if sort_by:
+                return utils.sort_records(data, sort_by, limit=limit)
+            return data[:limit]
         data = resource_manager.list(**body)
         return data
 
     def setup_columns(self, info, parsed_args):
-        columns = len(info) > 0 and sorted(info[0].keys()) or []
+        # NOTE: info may be a lazy iterator, so only the first record is
+        #       consumed here to discover the columns.
+        info = iter(info)
+        first = next(info, None)
+        columns = first is not None and sorted(first.keys()) or []
         if not columns:
             parsed_args.columns = []
         elif parsed_args.columns:
             columns = [col for col in parsed_args.columns if col in columns]
         elif self.list_columns:
             columns = [col for col in self.list_columns if col in columns]
+        records = itertools.chain([first], info) if first is not None else ()
         return (
             columns,
             (utils.get_item_properties(s, columns, formatters=self._formatters)
-             for s in info)
+             for s in records)
         )
 
     def get_data(self, parsed_args):
@@ -286,7 +403,7 @@ class ShowCommand(BlazarCommand, show.ShowOne):
 
     def get_data(self, parsed_args):
         self.log.debug('get_data(%s)' % parsed_args)
-        blazar_client = self.get_client()
+        blazar_client = self.get_reader(parsed_args)
 
         if self.allow_names:
             res_id = utils.find_resource_id_by_name_or_id(blazar_client,
@@ -0,0 +1,172 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Cache of the Blazar endpoints resolved from the service catalog.
+
+Finding the endpoint of the reservation service takes the catalog of the
+token and, for versioned requests, a version discovery request. Clients
+made with a keystoneauth session, and the OpenStackClient plugin, keep the
+endpoints they resolve in a cache keyed by auth URL, region, interface,
+service type and version, so that creating clients again, in a long
+running service or a loop of CLI commands, skips that work.
+
+The default cache holds endpoints in memory for DEFAULT_TTL seconds. The
+BLAZAR_ENDPOINT_CACHE environment variable names a file where they are
+also kept between processes, and BLAZAR_ENDPOINT_CACHE_TTL changes their
+lifetime; a TTL of 0 disables the cache. A client takes another
+EndpointCache as its endpoint_cache argument.
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from oslo_serialization import jsonutils
+
+DEFAULT_TTL = 300
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def make_key(session, service_type, interface=None, region_name=None,
+             version=None):
+    """Return the cache key of an endpoint.
+
+    :param session: keystoneauth session resolving the endpoint.
+    :returns: a tuple, or None when the authentication of the session has
+              no auth URL, and so no catalog to cache.
+    """
+    auth_url = getattr(getattr(session, 'auth', None), 'auth_url', None)
+    if not isinstance(auth_url, str):
+        return None
+    if isinstance(interface, (list, tuple)):
+        interface = ','.join(interface)
+    return (auth_url.rstrip('/'), region_name or '', interface or '',
+            service_type or '', str(version or ''))
+
+
+class EndpointCache(object):
+    """Endpoints by key, expiring after a TTL.
+
+    :param ttl: seconds an endpoint is kept.
+    :param path: JSON file keeping the endpoints between processes, or None
+                 to keep them in memory only.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, path=None):
+        self.ttl = ttl
+        self.path = path
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _file_key(key):
+        return jsonutils.dumps(list(key))
+
+    def _read_file(self):
+        try:
+            with open(self.path) as f:
+                entries = jsonutils.loads(f.read())
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _write_file(self, entries):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            # The file is replaced at once, so that concurrent processes
+            # never read half of it. mkstemp() makes it private to the user.
+            fd, temporary = tempfile.mkstemp(dir=directory,
+                                             prefix='.blazar-endpoints')
+            with os.fdopen(fd, 'w') as f:
+                f.write(jsonutils.dumps(entries))
+            os.replace(temporary, self.path)
+        except OSError:
+            # The cache is an optimization, the endpoint is resolved again.
+            pass
+
+    def get(self, key):
+        """Return the endpoint of a key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._endpoints.get(key)
+            if (entry is None or entry[1] <= now) and self.path:
+                # Another process may have resolved it.
+                stored = self._read_file().get(self._file_key(key))
+                if isinstance(stored, dict):
+                    entry = (stored.get('url'), stored.get('expires', 0))
+                    self._endpoints[key] = entry
+            if entry is None or entry[1] <= now:
+                return None
+            return entry[0]
+
+    def set(self, key, url):
+        """Keep the endpoint of a key for the TTL."""
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._endpoints[key] = (url, expires)
+            if self.path:
+                entries = {k: v for k, v in self._read_file().items()
+                           if isinstance(v, dict) and
+                           v.get('expires', 0) > time.time()}
+                entries[self._file_key(key)] = {'url': url,
+                                                'expires': expires}
+                self._write_file(entries)
+
+    def invalidate(self, key):
+        """Forget the endpoint of a key, for example once it failed."""
+        with self._lock:
+            self._endpoints.pop(key, None)
+            if self.path:
+                entries = self._read_file()
+                if entries.pop(self._file_key(key), None) is not None:
+                    self._write_file(entries)
+
+    def clear(self):
+        """Forget every endpoint."""
+        with self._lock:
+            self._endpoints.clear()
+            if self.path:
+                self._write_file({})
+
+    def resolve(self, key, resolver):
+        """Return the endpoint of a key, calling resolver on a miss.
+
+        :param key: a make_key() key, or None to always call resolver.
+        :param resolver: callable returning the endpoint URL or None.
+        """
+        if key is None or self.ttl <= 0:
+            return resolver()
+        url = self.get(key)
+        if url is None:
+            url = resolver()
+            if url:
+                self.set(key, url)
+        return url
+
+
+def default_cache():
+    """Return the process wide cache, configured from the environment."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            try:
+                ttl = float(os.environ.get('BLAZAR_ENDPOINT_CACHE_TTL',
+                                           DEFAULT_TTL))
+            except ValueError:
+                ttl = DEFAULT_TTL
+            _default_cache = EndpointCache(
+                ttl=ttl, path=os.environ.get('BLAZAR_ENDPOINT_CACHE') or None)
+        return _default_cache
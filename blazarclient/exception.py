@@ -78,6 +78,16 @@ class IncorrectLease(BlazarClientException):
     code = 409
 
 
+class InvalidLeaseParameters(IncorrectLease):
+    """Occurs if lease parameters fail local validation.
+
+    The errors keyword argument lists the (location, message) tuples of
+    each problem found.
+    """
+    message = _("The lease parameters are invalid.")
+    code = 400
+
+
 class DuplicatedLeaseParameters(BlazarClientException):
     """Occurs if lease parameters are duplicated."""
     message = _("The lease parameters are duplicated.")
@@ -0,0 +1,176 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Output formatters writing list rows as they are produced.
+
+They are registered as blazarclient.formatter.list entry points, along with
+the cliff list formatters, and offered by the list commands of blazarclient
+only, rather than as cliff.formatter.list entry points, which would offer
+them to every cliff application.
+"""
+
+import itertools
+
+from cliff import columns
+from cliff.formatters import base
+
+from blazarclient import exception
+from blazarclient.i18n import _
+from blazarclient import utils
+
+DEFAULT_SAMPLE_ROWS = 100
+ALIGNMENTS = {
+    int: 'r',
+    float: 'r',
+}
+
+
+def _cell_text(value):
+    if isinstance(value, columns.FormattableColumn):
+        value = value.human_readable()
+    if not isinstance(value, str):
+        value = str(value)
+    return value.replace('\r\n', '\n').replace('\r', ' ')
+
+
+def _cell_lines(text, width):
+    """Split a cell into lines no longer than width."""
+    lines = []
+    for line in text.split('\n'):
+        if len(line) <= width:
+            lines.append(line)
+        else:
+            lines.extend(line[i:i + width]
+                         for i in range(0, len(line), width))
+    return lines
+
+
+def _parse_column_widths(column_widths):
+    widths = {}
+    for column_width in column_widths:
+        msg = _('Invalid column width %s, must be of the form '
+                '<column>=<width>') % column_width
+        name, sep, width = column_width.rpartition('=')
+        try:
+            widths[name] = int(width)
+        except ValueError:
+            raise exception.BlazarClientException(msg)
+        if not name or widths[name] < 1:
+            raise exception.BlazarClientException(msg)
+    return widths
+
+
+class StreamingTableFormatter(base.ListFormatter):
+    """Fixed-width table formatter writing each row as soon as it arrives.
+
+    Unlike the PrettyTable based table formatter, which buffers the whole
+    listing to compute column widths, widths are taken from --column-width
+    or estimated from the first --sample-rows rows. Later values wider than
+    their column are wrapped over several lines. Numbers are right aligned
+    in the columns whose first non-null sampled value is a number.
+    """
+
+    def add_argument_group(self, parser):
+        group = parser.add_argument_group('stream-table formatter')
+        group.add_argument(
+            '--sample-rows',
+            metavar='<integer>',
+            type=int,
+            default=DEFAULT_SAMPLE_ROWS,
+            help='Number of rows buffered to estimate column widths, '
+                 'wider values of later rows are wrapped (default: %d).' %
+                 DEFAULT_SAMPLE_ROWS,
+        )
+        group.add_argument(
+            '--column-width',
+            metavar='<column>=<width>',
+            action='append',
+            dest='column_widths',
+            default=[],
+            help='Fixed width of a column, skips estimating it. Can be '
+                 'repeated.',
+        )
+
+    def emit_list(self, column_names, data, stdout, parsed_args):
+        declared = _parse_column_widths(parsed_args.column_widths)
+        data = iter(data)
+        sample = list(itertools.islice(data, max(parsed_args.sample_rows, 1)))
+        if not sample:
+            stdout.write('\n')
+            return
+
+        align = [ALIGNMENTS.get(type(next(
+            (value for value in values if value is not None), None)), 'l')
+            for values in zip(*sample)]
+        sample = [[_cell_text(value) for value in row] for row in sample]
+        widths = []
+        for index, name in enumerate(column_names):
+            if name in declared:
+                widths.append(declared[name])
+            else:
+                widths.append(max(
+                    [len(name)] +
+                    [len(line) for row in sample
+                     for line in row[index].split('\n')]))
+
+        border = '+%s+\n' % '+'.join('-' * (width + 2) for width in widths)
+        stdout.write(border)
+        self._write_row(stdout, column_names, widths, ['l'] * len(widths))
+        stdout.write(border)
+        for row in sample:
+            self._write_row(stdout, row, widths, align)
+        del sample
+        for row in data:
+            self._write_row(stdout, [_cell_text(value) for value in row],
+                            widths, align)
+        stdout.write(border)
+
+    @staticmethod
+    def _write_row(stdout, cells, widths, align):
+        parts = []
+        for cell, width, side in zip(cells, widths, align):
+            if len(cell) > width or '\n' in cell:
+                break
+            parts.append(cell.rjust(width) if side == 'r'
+                         else cell.ljust(width))
+        else:
+            stdout.write('| %s |\n' % ' | '.join(parts))
+            return
+
+        cell_lines = [_cell_lines(cell, width)
+                      for cell, width in zip(cells, widths)]
+        height = max(len(lines) for lines in cell_lines)
+        out = []
+        for i in range(height):
+            parts = []
+            for lines, width, side in zip(cell_lines, widths, align):
+                line = lines[i] if i < len(lines) else ''
+                parts.append(line.rjust(width) if side == 'r'
+                             else line.ljust(width))
+            out.append('| %s |\n' % ' | '.join(parts))
+        stdout.write(''.join(out))
+
+
+class NDJSONFormatter(base.ListFormatter):
+    """Newline-delimited JSON formatter, writing one object per row."""
+
+    def add_argument_group(self, parser):
+        pass
+
+    def emit_list(self, column_names, data, stdout, parsed_args):
+        for row in data:
+            record = {}
+            for name, value in zip(column_names, row):
+                if isinstance(value, columns.FormattableColumn):
+                    value = value.machine_readable()
+                record[name] = value
+            stdout.write(utils.dumps(record) + '\n')
@@ -0,0 +1,461 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local SQLite mirror of leases, hosts and allocations.
+
+The mirror is filled by ``Mirror.sync()`` from the client managers and
+exposes read-only managers with the same list and get methods, so commands
+can read from it instead of the API.
+
+A mirror records the endpoint, region and project it was synced from, and
+refuses to be read or synced for another one. Without BLAZAR_MIRROR, each
+of them gets its own mirror file.
+"""
+
+import hashlib
+import os
+import sqlite3
+
+from oslo_serialization import jsonutils
+
+from blazarclient import base
+from blazarclient import exception
+from blazarclient.i18n import _
+from blazarclient import utils
+from blazarclient.v1 import allocations as allocations_v1
+
+DEFAULT_DIRECTORY = os.path.join('~', '.cache', 'blazarclient')
+DEFAULT_PATH = os.path.join(DEFAULT_DIRECTORY, 'mirror.sqlite')
+COLLECTIONS = ('lease', 'host', 'allocation')
+ALLOCATION_RESOURCES = ('os-hosts',)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS leases (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    status TEXT,
+    project_id TEXT,
+    user_id TEXT,
+    start_ts REAL,
+    end_ts REAL,
+    changed_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leases_name ON leases (name);
+CREATE INDEX IF NOT EXISTS leases_status ON leases (status);
+CREATE INDEX IF NOT EXISTS leases_project_id ON leases (project_id);
+CREATE INDEX IF NOT EXISTS leases_start_ts ON leases (start_ts);
+CREATE INDEX IF NOT EXISTS leases_end_ts ON leases (end_ts);
+
+CREATE TABLE IF NOT EXISTS hosts (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    changed_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS hosts_name ON hosts (name);
+
+CREATE TABLE IF NOT EXISTS allocations (
+    resource TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (resource, resource_id)
+);
+CREATE TABLE IF NOT EXISTS allocation_reservations (
+    resource TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    reservation_id TEXT,
+    lease_id TEXT,
+    start_ts REAL,
+    end_ts REAL
+);
+CREATE INDEX IF NOT EXISTS allocation_reservations_resource
+    ON allocation_reservations (resource, resource_id);
+CREATE INDEX IF NOT EXISTS allocation_reservations_reservation_id
+    ON allocation_reservations (reservation_id);
+CREATE INDEX IF NOT EXISTS allocation_reservations_lease_id
+    ON allocation_reservations (lease_id);
+CREATE INDEX IF NOT EXISTS allocation_reservations_start_ts
+    ON allocation_reservations (start_ts);
+"""
+
+
+def _text(value):
+    return value if isinstance(value, str) else None
+
+
+def source(client):
+    """Return the deployment and project a client reads from.
+
+    :param client: a blazarclient Client.
+    :returns: a dict of the endpoint, region and project of the client,
+              which are None when unknown.
+    """
+    manager = getattr(getattr(client, 'lease', None), 'request_manager', None)
+    endpoint = region = project = None
+    if isinstance(manager, base.SessionClient):
+        auth = getattr(manager.session, 'auth', None)
+        endpoint = (_text(manager.endpoint_override) or
+                    _text(getattr(auth, 'auth_url', None)) or
+                    _text(getattr(auth, 'endpoint', None)))
+        region = _text(manager.region_name)
+        project = (_text(getattr(auth, 'project_id', None)) or
+                   _text(getattr(auth, 'project_name', None)))
+    elif isinstance(manager, base.RequestManager):
+        endpoint = _text(manager.blazar_url)
+    return {'endpoint': endpoint, 'region': region, 'project': project}
+
+
+def default_path(source=None):
+    """Return the mirror path from BLAZAR_MIRROR or the default one.
+
+    :param source: a source() dict, giving a default path of its own.
+    """
+    path = os.environ.get('BLAZAR_MIRROR')
+    if not path:
+        path = DEFAULT_PATH
+        if source and any(source.values()):
+            digest = hashlib.sha1(jsonutils.dump_as_bytes(
+                source, sort_keys=True)).hexdigest()[:16]
+            path = os.path.join(DEFAULT_DIRECTORY,
+                                'mirror-%s.sqlite' % digest)
+    return os.path.expanduser(path)
+
+
+def _timestamp(value):
+    return value and utils.to_timestamp(value)
+
+
+def _changed_at(record):
+    return record.get('updated_at') or record.get('created_at')
+
+
+def _prefix_upper_bound(prefix):
+    """Return the smallest string greater than every string with prefix."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class Mirror(object):
+    """SQLite mirror of the resources of a Blazar deployment.
+
+    :param path: path of the database file, created if missing.
+    :param source: source() of the client the mirror is read for, checked
+                   against the one it was synced from.
+    :raises: BlazarClientException if the mirror was synced from another
+             source.
+    """
+
+    def __init__(self, path=None, source=None):
+        self.path = path or default_path(source)
+        if self.path != ':memory:':
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.executescript(SCHEMA)
+        self.lease = LeaseMirrorManager(self)
+        self.host = HostMirrorManager(self)
+        self.allocation = AllocationMirrorManager(self)
+        if source is not None:
+            try:
+                self.check_source(source)
+            except exception.BlazarClientException:
+                self.close()
+                raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    @property
+    def source(self):
+        """Return the source() the mirror was synced from, or None."""
+        rows = self.query("SELECT value FROM meta WHERE key = 'source'")
+        return jsonutils.loads(rows[0][0]) if rows else None
+
+    def check_source(self, source):
+        """Raise if the mirror was synced from another source.
+
+        Unknown values, such as the project of a token, are not compared.
+        """
+        synced = self.source
+        if not synced:
+            return
+        for key, value in source.items():
+            if value is not None and synced.get(key) not in (None, value):
+                raise exception.BlazarClientException(
+                    _('The mirror at %(path)s was synced from %(synced)s, '
+                      'not %(source)s. Give another mirror path with '
+                      'BLAZAR_MIRROR or --path.') % {
+                          'path': self.path, 'synced': synced,
+                          'source': source})
+
+    def query(self, sql, params=()):
+        return self.connection.execute(sql, params).fetchall()
+
+    def sync(self, client, collections=COLLECTIONS,
+             page_size=base.DEFAULT_PAGE_SIZE):
+        """Update the mirror from the API.
+
+        The API has no change feed, so each collection is listed again, one
+        page at a time. Leases and hosts are only written when their
+        updated_at, or created_at if never updated, differs from the
+        mirrored one, and records gone from the API are deleted.
+
+        :param client: a blazarclient Client, whose source() is recorded.
+        :param collections: names of the collections to sync.
+        :returns: a dict mapping each collection to the number of added,
+                  updated, deleted and unchanged records.
+        """
+        client_source = source(client)
+        self.check_source(client_source)
+        stats = {}
+        with self.connection:
+            if any(client_source.values()):
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) "
+                    "VALUES ('source', ?)",
+                    (jsonutils.dumps(client_source, sort_keys=True),))
+            if 'lease' in collections:
+                stats['lease'] = self._sync_records(
+                    'leases', client.lease.list_iter(page_size=page_size),
+                    self._lease_row)
+            if 'host' in collections:
+                stats['host'] = self._sync_records(
+                    'hosts', client.host.list_iter(page_size=page_size),
+                    self._host_row)
+            if 'allocation' in collections:
+                stats['allocation'] = self._sync_allocations(
+                    client, page_size)
+        return stats
+
+    @staticmethod
+    def _lease_row(lease):
+        return {'id': str(lease['id']),
+                'name': lease.get('name'),
+                'status': lease.get('status'),
+                'project_id': lease.get('project_id'),
+                'user_id': lease.get('user_id'),
+                'start_ts': _timestamp(lease.get('start_date')),
+                'end_ts': _timestamp(lease.get('end_date')),
+                'changed_at': _changed_at(lease),
+                'data': jsonutils.dumps(lease)}
+
+    @staticmethod
+    def _host_row(host):
+        return {'id': str(host['id']),
+                'name': host.get('hypervisor_hostname'),
+                'changed_at': _changed_at(host),
+                'data': jsonutils.dumps(host)}
+
+    def _sync_records(self, table, records, to_row):
+        known = dict(self.query('SELECT id, changed_at FROM %s' % table))
+        stats = dict(added=0, updated=0, deleted=0, unchanged=0)
+        seen = set()
+        for record in records:
+            record_id = str(record['id'])
+            seen.add(record_id)
+            changed_at = _changed_at(record)
+            if record_id in known:
+                if changed_at is not None and known[record_id] == changed_at:
+                    stats['unchanged'] += 1
+                    continue
+                stats['updated'] += 1
+            else:
+                stats['added'] += 1
+            row = to_row(record)
+            self.connection.execute(
+                'INSERT OR REPLACE INTO %s (%s) VALUES (%s)' % (
+                    table, ', '.join(row), ', '.join('?' * len(row))),
+                list(row.values()))
+        gone = [(record_id,) for record_id in known if record_id not in seen]
+        self.connection.executemany('DELETE FROM %s WHERE id = ?' % table,
+                                    gone)
+        stats['deleted'] = len(gone)
+        return stats
+
+    def _sync_allocations(self, client, page_size):
+        # NOTE: Allocations have no timestamps, so they are compared with
+        #       their mirrored copy.
+        stats = dict(added=0, updated=0, deleted=0, unchanged=0)
+        for resource in ALLOCATION_RESOURCES:
+            known = dict(self.query(
+                'SELECT resource_id, data FROM allocations '
+                'WHERE resource = ?', (resource,)))
+            seen = set()
+            for allocation in client.allocation.list_iter(
+                    resource, page_size=page_size):
+                resource_id = str(allocation['resource_id'])
+                seen.add(resource_id)
+                data = jsonutils.dumps(allocation, sort_keys=True)
+                if known.get(resource_id) == data:
+                    stats['unchanged'] += 1
+                    continue
+                stats['updated' if resource_id in known else 'added'] += 1
+                self._delete_allocation(resource, resource_id)
+                self.connection.execute(
+                    'INSERT INTO allocations (resource, resource_id, data) '
+                    'VALUES (?, ?, ?)', (resource, resource_id, data))
+                self.connection.executemany(
+                    'INSERT INTO allocation_reservations (resource, '
+                    'resource_id, reservation_id, lease_id, start_ts, end_ts)'
+                    ' VALUES (?, ?, ?, ?, ?, ?)',
+                    [(resource, resource_id, reservation.get('id'),
+                      reservation.get('lease_id'),
+                      _timestamp(reservation.get('start_date')),
+                      _timestamp(reservation.get('end_date')))
+                     for reservation in allocation['reservations']])
+            for resource_id in set(known) - seen:
+                self._delete_allocation(resource, resource_id)
+                stats['deleted'] += 1
+        return stats
+
+    def _delete_allocation(self, resource, resource_id):
+        for table in ('allocations', 'allocation_reservations'):
+            self.connection.execute(
+                'DELETE FROM %s WHERE resource = ? AND resource_id = ?' %
+                table, (resource, resource_id))
+
+
+class _MirrorManager(object):
+    """Read-only manager returning the records of a mirror table."""
+
+    table = None
+    resource = None
+
+    def __init__(self, mirror):
+        self.mirror = mirror
+
+    def _select(self, where=(), params=(), sort_by=None):
+        sql = 'SELECT data FROM %s' % self.table
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        records = [jsonutils.loads(data)
+                   for data, in self.mirror.query(sql, params)]
+        if sort_by:
+            records = utils.sort_records(records, sort_by)
+        return records
+
+    def get(self, resource_id):
+        records = self._select(['id = ?'], [str(resource_id)])
+        if not records:
+            raise exception.BlazarClientException(
+                _("%(resource)s '%(id)s' not found in the mirror.") % {
+                    'resource': self.resource, 'id': resource_id},
+                code=404)
+        return records[0]
+
+    def list(self, sort_by=None):
+        return self._select(sort_by=sort_by)
+
+    def list_iter(self, page_size=base.DEFAULT_PAGE_SIZE, **filters):
+        return iter(self.list(**filters))
+
+
+class LeaseMirrorManager(_MirrorManager):
+    """Mirror counterpart of LeaseClientManager."""
+
+    table = 'leases'
+    resource = 'lease'
+
+    def list(self, sort_by=None, status=None, project_id=None, user_id=None,
+             name_prefix=None, overlap_start=None, overlap_end=None):
+        """List the mirrored leases, with the filters of the API manager."""
+        where, params = [], []
+        if status is not None:
+            where.append('upper(status) = ?')
+            params.append(status.upper())
+        if project_id is not None:
+            where.append('project_id = ?')
+            params.append(project_id)
+        if user_id is not None:
+            where.append('user_id = ?')
+            params.append(user_id)
+        if name_prefix:
+            # NOTE: A range on the name uses its index, unlike LIKE which
+            #       is also case insensitive.
+            where.append('name >= ? AND name < ?')
+            params.extend([name_prefix, _prefix_upper_bound(name_prefix)])
+        if overlap_start is not None:
+            where.append('end_ts > ?')
+            params.append(utils.to_timestamp(overlap_start))
+        if overlap_end is not None:
+            where.append('start_ts < ?')
+            params.append(utils.to_timestamp(overlap_end))
+        return self._select(where, params, sort_by=sort_by)
+
+
+class HostMirrorManager(_MirrorManager):
+    """Mirror counterpart of ComputeHostClientManager."""
+
+    table = 'hosts'
+    resource = 'host'
+
+
+class AllocationMirrorManager(_MirrorManager):
+    """Mirror counterpart of AllocationClientManager."""
+
+    table = 'allocations'
+    resource = 'allocation'
+
+    def get(self, resource, resource_id, lease_id=None, reservation_id=None):
+        records = self._select(['resource = ?', 'resource_id = ?'],
+                               [resource, str(resource_id)])
+        if not records:
+            raise exception.BlazarClientException(
+                _("Allocation of '%s' not found in the mirror.") %
+                resource_id, code=404)
+        filtered = allocations_v1.filter_allocations(
+            records, lease_id=lease_id, reservation_id=reservation_id)
+        if filtered:
+            return filtered[0]
+        return dict(records[0], reservations=[])
+
+    def list(self, resource, sort_by=None, lease_id=None,
+             reservation_id=None):
+        """List the mirrored allocations of a resource type.
+
+        Resources with reservations matching the lease and reservation ID
+        filters are looked up in the reservation index.
+        """
+        where, params = ['resource = ?'], [resource]
+        conditions = [(column, value) for column, value in (
+            ('lease_id', lease_id), ('reservation_id', reservation_id))
+            if value is not None]
+        if conditions:
+            where.append(
+                'resource_id IN (SELECT resource_id FROM '
+                'allocation_reservations WHERE resource = ? AND %s)' %
+                ' AND '.join('%s = ?' % column for column, value
+                             in conditions))
+            params.append(resource)
+            params.extend(value for column, value in conditions)
+        allocations = allocations_v1.filter_allocations(
+            self._select(where, params), lease_id=lease_id,
+            reservation_id=reservation_id)
+        if sort_by:
+            allocations = utils.sort_records(allocations, sort_by)
+        return allocations
+
+    def list_iter(self, resource, page_size=base.DEFAULT_PAGE_SIZE,
+                  lease_id=None, reservation_id=None):
+        return iter(self.list(resource, lease_id=lease_id,
+                              reservation_id=reservation_id))
@@ -14,6 +14,7 @@ import logging
 
 from osc_lib import utils
 
+from blazarclient import endpoints
 
 LOG = logging.getLogger(__name__)
 
@@ -36,13 +37,19 @@ def make_client(instance):
 
     LOG.debug("Instantiating reservation client: %s", reservation_client)
 
+    endpoint = endpoints.default_cache().resolve(
+        endpoints.make_key(instance.session, API_NAME,
+                           interface=instance.interface,
+                           region_name=instance._region_name),
+        lambda: instance.get_endpoint_for_service_type(
+            API_NAME,
+            interface=instance.interface,
+            region_name=instance._region_name))
+
     client = reservation_client(
         instance._api_version[API_NAME],
         session=instance.session,
-        endpoint_override=instance.get_endpoint_for_service_type(
-            API_NAME,
-            interface=instance.interface,
-            region_name=instance._region_name)
+        endpoint_override=endpoint
     )
     return client
 
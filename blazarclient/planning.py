@@ -0,0 +1,183 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Lease planning helpers working on fetched hosts and allocations."""
+
+import collections
+import datetime
+import operator
+
+from oslo_serialization import jsonutils
+from oslo_utils import strutils
+
+from blazarclient import exception
+from blazarclient.i18n import _
+from blazarclient import utils
+
+MINUTE = 60.0
+
+_COMPARISONS = {
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+def _coerce(left, right):
+    """Compare numbers as numbers, anything else as strings."""
+    if strutils.is_int_like(left) or strutils.is_int_like(right):
+        try:
+            return float(left), float(right)
+        except (TypeError, ValueError):
+            pass
+    return str(left), str(right)
+
+
+def match_properties(resource, expression):
+    """Evaluate a resource_properties expression against a resource.
+
+    Expressions use the JSON filter syntax of the resource_properties
+    reservation parameter, for example ``["and", [">=", "$vcpus", "16"],
+    ["==", "$gpu", "True"]]``, where ``$name`` refers to a resource
+    attribute. An empty expression matches every resource.
+
+    :param expression: expression as a JSON string or a decoded list.
+    """
+    if not expression:
+        return True
+    if isinstance(expression, str):
+        try:
+            expression = jsonutils.loads(expression)
+        except ValueError:
+            raise exception.BlazarClientException(
+                _("Invalid resource_properties '%s'.") % expression)
+    return bool(_evaluate(resource, expression))
+
+
+def _evaluate(resource, expression):
+    if not isinstance(expression, list):
+        if isinstance(expression, str) and expression.startswith('$'):
+            return resource.get(expression[1:])
+        return expression
+    if not expression:
+        raise exception.BlazarClientException(
+            _('Empty resource_properties expression.'))
+    op, args = expression[0], expression[1:]
+    if op == 'and':
+        return all(_evaluate(resource, arg) for arg in args)
+    if op == 'or':
+        return any(_evaluate(resource, arg) for arg in args)
+    if op == 'not':
+        return not any(_evaluate(resource, arg) for arg in args)
+    values = [_evaluate(resource, arg) for arg in args]
+    if op == 'in':
+        return any(str(value) in str(values[0]) for value in values[1:])
+    if op not in _COMPARISONS or len(values) < 2:
+        raise exception.BlazarClientException(
+            _("Invalid resource_properties operator '%s'.") % op)
+    if values[0] is None:
+        return False
+    return all(_COMPARISONS[op](*_coerce(values[0], value))
+               for value in values[1:])
+
+
+def _feasible_starts(busy, duration, not_before, not_after):
+    """Yield the [first, last] start ranges of free windows of a resource.
+
+    Bounds are rounded inwards to the minute, the precision of lease dates.
+    """
+    cursor = not_before
+    for start, end in sorted(busy) + [(float('inf'), float('inf'))]:
+        if end <= cursor:
+            continue
+        first = -(-cursor // MINUTE) * MINUTE
+        last = min(start - duration, not_after)
+        if last != float('inf'):
+            last = last // MINUTE * MINUTE
+        if first <= last:
+            yield first, last
+        if start > not_after:
+            return
+        cursor = max(cursor, end)
+
+
+def earliest_slot(hosts, allocations, count, duration, not_before,
+                  not_after=None, resource_properties=None):
+    """Find the earliest window where enough hosts are free.
+
+    A sweep over the start ranges at which each host can host the whole
+    window finds the earliest start covered by at least count of them.
+
+    :param hosts: hosts as returned by ``ComputeHostClientManager.list()``.
+    :param allocations: host allocations as returned by
+                        ``AllocationClientManager.list('os-hosts')``.
+    :param count: number of hosts needed.
+    :param duration: length of the window in seconds.
+    :param not_before: earliest start of the window.
+    :param not_after: latest start of the window, unbounded by default.
+    :param resource_properties: expression selecting the eligible hosts.
+    :returns: a (start, end, host IDs) tuple, with start and end as naive
+              UTC datetimes, or None if no window was found.
+    """
+    if count < 1 or duration <= 0:
+        raise exception.BlazarClientException(
+            _('The host count and the duration must be positive.'))
+    if isinstance(resource_properties, str) and resource_properties:
+        try:
+            resource_properties = jsonutils.loads(resource_properties)
+        except ValueError:
+            raise exception.BlazarClientException(
+                _("Invalid resource_properties '%s'.") % resource_properties)
+    not_before = utils.to_timestamp(not_before)
+    if not_after is None:
+        not_after = float('inf')
+    else:
+        not_after = utils.to_timestamp(not_after)
+
+    busy = collections.defaultdict(list)
+    for allocation in allocations:
+        for reservation in allocation['reservations']:
+            busy[str(allocation['resource_id'])].append((
+                utils.to_timestamp(reservation['start_date']),
+                utils.to_timestamp(reservation['end_date'])))
+
+    # Closed start ranges: at equal times, openings sort before closings.
+    events = []
+    ranges = []
+    for host in hosts:
+        if not match_properties(host, resource_properties):
+            continue
+        host_id = str(host['id'])
+        for first, last in _feasible_starts(busy[host_id], duration,
+                                            not_before, not_after):
+            events.append((first, 0))
+            events.append((last, 1))
+            ranges.append((first, last, host_id))
+    events.sort()
+
+    available = 0
+    for time, closing in events:
+        if closing:
+            available -= 1
+            continue
+        available += 1
+        if available >= count:
+            host_ids = [host_id for first, last, host_id in ranges
+                        if first <= time <= last]
+            start = utils.EPOCH + datetime.timedelta(seconds=time)
+            return (start, start + datetime.timedelta(seconds=duration),
+                    host_ids[:count])
+    return None
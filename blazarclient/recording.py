@@ -0,0 +1,171 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Record the requests of a client to a file and replay them offline.
+
+A Recorder given to a client, for example ``Client(session=session,
+recorder=Recorder('trace.jsonl'))`` or ``blazar --record trace.jsonl``,
+appends every request and response to the file as a line of JSON, with the
+time the request took. Credentials are redacted: authentication headers,
+and the values of keys such as password, token or trust_id in bodies.
+
+A Replay serves the recorded responses back to a client created with
+``Client(replay=Replay('trace.jsonl'))`` or ``blazar --replay
+trace.jsonl``, without any connection or authentication. Responses are
+parsed and checked by the client as if they came from the server, so the
+client side costs of a command can be profiled on the recorded data.
+"""
+
+import collections
+import threading
+import time
+
+from oslo_serialization import jsonutils
+import requests
+from requests import structures
+
+from blazarclient import exception
+from blazarclient.i18n import _
+
+LATENCIES = ('original', 'zero')
+REDACTED = '<redacted>'
+# Keys whose values are redacted in bodies, compared lowercase.
+REDACTED_KEYS = frozenset(('password', 'secret', 'token', 'auth_token',
+                           'access_token', 'trust_id', 'application_credential'
+                           '_secret'))
+# Headers which are not recorded, compared lowercase.
+REDACTED_HEADERS = frozenset(('x-auth-token', 'x-subject-token',
+                              'x-service-token', 'authorization', 'cookie',
+                              'set-cookie'))
+
+
+def redact(value):
+    """Return value with the values of REDACTED_KEYS replaced."""
+    if isinstance(value, dict):
+        return {k: REDACTED if str(k).lower() in REDACTED_KEYS
+                else redact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def _redact_text(text):
+    # Most bodies hold nothing to redact, and are kept as they were sent.
+    lowered = text.lower()
+    if not any('"%s"' % key in lowered for key in REDACTED_KEYS):
+        return text
+    try:
+        return jsonutils.dumps(redact(jsonutils.loads(text)))
+    except ValueError:
+        return text
+
+
+class Recorder(object):
+    """Append the requests of a client and their responses to a file.
+
+    :param path: file of JSON lines, created if needed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, method, url, body, resp, elapsed):
+        """Append a request and its response.
+
+        :param url: URL of the request, relative to the Blazar endpoint.
+        :param body: body of the request, or None.
+        :param resp: the requests.Response received.
+        :param elapsed: seconds the request took.
+        """
+        line = jsonutils.dumps({
+            'method': method,
+            'url': url,
+            'request_body': redact(body),
+            'status': resp.status_code,
+            'headers': {k: v for k, v in resp.headers.items()
+                        if k.lower() not in REDACTED_HEADERS},
+            'body': _redact_text(resp.text),
+            'elapsed': round(elapsed, 6),
+        })
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+
+
+class Replay(object):
+    """Serve the responses of a recording.
+
+    Requests are matched by method and URL. Responses to the same request
+    are served in the order they were recorded, and the last one is served
+    again once they are exhausted. Requests missing from the recording get
+    a 404 response.
+
+    :param path: file written by a Recorder.
+    :param latency: 'original' to wait as long as the recorded request
+                    took before responding, or 'zero'.
+    """
+
+    def __init__(self, path, latency='original'):
+        if latency not in LATENCIES:
+            raise exception.BlazarClientException(
+                _("Invalid latency '%(latency)s', must be one of "
+                  "%(latencies)s.") % {'latency': latency,
+                                       'latencies': ', '.join(LATENCIES)})
+        self.latency = latency
+        self._responses = collections.defaultdict(collections.deque)
+        self._lock = threading.Lock()
+        with open(path) as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = jsonutils.loads(line)
+                    key = (entry['method'], entry['url'])
+                except (ValueError, KeyError, TypeError):
+                    raise exception.BlazarClientException(
+                        _('Invalid recording %(path)s, line %(number)d.') %
+                        {'path': path, 'number': number})
+                self._responses[key].append(entry)
+
+    def _next(self, method, url):
+        with self._lock:
+            responses = self._responses.get((method, url))
+            if not responses:
+                return None
+            if len(responses) > 1:
+                return responses.popleft()
+            return responses[0]
+
+    def respond(self, method, url):
+        """Return the next recorded response to a request.
+
+        :param url: URL of the request, relative to the Blazar endpoint.
+        :returns: a requests.Response.
+        """
+        entry = self._next(method, url)
+        if entry is None:
+            entry = {'status': 404, 'elapsed': 0,
+                     'headers': {'Content-Type': 'application/json'},
+                     'body': jsonutils.dumps({
+                         'error_code': 404,
+                         'error_message': 'No recorded response to %s %s' %
+                                          (method, url)})}
+        if self.latency == 'original':
+            time.sleep(entry['elapsed'])
+        resp = requests.Response()
+        resp.status_code = entry['status']
+        resp.headers = structures.CaseInsensitiveDict(entry['headers'])
+        resp.encoding = 'utf-8'
+        resp.url = url
+        resp._content = entry['body'].encode('utf-8')
+        return resp
@@ -0,0 +1,225 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compact record types for lease, host and allocation results.
+
+Records store the known keys of a resource in ``__slots__`` instead of a
+per-instance dict, intern values repeated across resources such as status
+and resource_type, and keep unknown keys in a small extra dict. They are
+mutable mappings, so they can be used wherever the plain dicts returned by
+the API are, and expose keys as attributes for
+``utils.get_item_properties()``.
+
+Managers return records instead of dicts when created with
+``compact_records=True``, for example ``Client(session=session,
+compact_records=True)``.
+"""
+
+import collections.abc
+import datetime
+import sys
+
+from oslo_utils import timeutils
+
+
+class Record(collections.abc.MutableMapping):
+    """Mapping storing the keys listed in fields in slots."""
+
+    __slots__ = ('_extra', '_dates')
+
+    # Subclasses list their known keys in both fields and __slots__.
+    fields = ()
+    interned_fields = ()
+    # Keys holding lists of nested resources, mapped to their record type.
+    nested_fields = {}
+    _field_set = frozenset()
+    _interned_set = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super(Record, cls).__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.fields)
+        cls._interned_set = frozenset(cls.interned_fields)
+
+    def __init__(self, values=(), **kwargs):
+        self._extra = None
+        self._dates = None
+        if kwargs:
+            values = dict(values, **kwargs)
+        elif not isinstance(values, collections.abc.Mapping):
+            values = dict(values)
+        # NOTE: This is __setitem__ inlined, as records are built by the
+        #       thousand from API responses.
+        fields = self._field_set
+        interned = self._interned_set
+        nested = self.nested_fields
+        extra = None
+        for key, value in values.items():
+            if key not in fields:
+                if extra is None:
+                    extra = self._extra = {}
+                extra[sys.intern(key)] = value
+            elif key in interned and isinstance(value, str):
+                object.__setattr__(self, key, sys.intern(value))
+            elif key in nested and isinstance(value, list):
+                record_class = nested[key]
+                object.__setattr__(self, key, [
+                    record_class(item) if isinstance(item, dict) else item
+                    for item in value])
+            else:
+                object.__setattr__(self, key, value)
+
+    @classmethod
+    def from_dict(cls, values):
+        return cls(values)
+
+    def __getattr__(self, name):
+        # Only called for names which are not set slots or class members.
+        extra = None if name.startswith('_') else self._extra
+        if extra is None or name not in extra:
+            raise AttributeError(name)
+        return extra[name]
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key, value):
+        if key in self._field_set:
+            if key in self._interned_set and isinstance(value, str):
+                value = sys.intern(value)
+            elif key in self.nested_fields and isinstance(value, list):
+                record_class = self.nested_fields[key]
+                value = [record_class.from_dict(item)
+                         if isinstance(item, dict) else item
+                         for item in value]
+            object.__setattr__(self, key, value)
+            if self._dates is not None:
+                self._dates.pop(key, None)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[sys.intern(key)] = value
+
+    def __delitem__(self, key):
+        if key in self._field_set:
+            try:
+                object.__delattr__(self, key)
+            except AttributeError:
+                raise KeyError(key)
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        for field in self.fields:
+            if hasattr(self, field):
+                yield field
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for key in self)
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, self.to_dict())
+
+    def __reduce__(self):
+        return type(self), (self.to_dict(),)
+
+    def to_dict(self):
+        """Return the record as plain dicts, nested records included."""
+        result = {}
+        for key, value in self.items():
+            if key in self.nested_fields and isinstance(value, list):
+                value = [item.to_dict() if isinstance(item, Record) else item
+                         for item in value]
+            result[key] = value
+        return result
+
+    def get_datetime(self, key):
+        """Return a date key as a naive UTC datetime, or None.
+
+        The date is parsed on first access and cached.
+        """
+        if self._dates is not None and key in self._dates:
+            return self._dates[key]
+        value = self.get(key)
+        if isinstance(value, str):
+            try:
+                value = datetime.datetime.fromisoformat(value)
+            except ValueError:
+                value = timeutils.parse_isotime(value)
+            value = timeutils.normalize_time(value)
+        if self._dates is None:
+            self._dates = {}
+        self._dates[key] = value
+        return value
+
+
+class Reservation(Record):
+    """Reservation of a lease."""
+
+    fields = ('id', 'lease_id', 'resource_id', 'resource_type', 'status',
+              'min', 'max', 'amount', 'hypervisor_properties',
+              'resource_properties', 'before_end', 'affinity', 'vcpus',
+              'memory_mb', 'disk_gb', 'flavor_id', 'network_id',
+              'required_floatingips', 'missing_resources',
+              'resources_changed', 'created_at', 'updated_at')
+    __slots__ = fields
+    interned_fields = ('resource_type', 'status', 'hypervisor_properties',
+                       'resource_properties', 'before_end', 'lease_id')
+
+
+class Lease(Record):
+    """Lease with its reservations."""
+
+    fields = ('id', 'name', 'status', 'project_id', 'user_id', 'start_date',
+              'end_date', 'before_end_date', 'trust_id', 'degraded',
+              'reservations', 'events', 'created_at', 'updated_at')
+    __slots__ = fields
+    interned_fields = ('status', 'project_id', 'user_id', 'trust_id')
+    nested_fields = {'reservations': Reservation}
+
+
+class Host(Record):
+    """Compute host, with its extra capabilities as extra keys."""
+
+    fields = ('id', 'hypervisor_hostname', 'hypervisor_type',
+              'hypervisor_version', 'vcpus', 'memory_mb', 'local_gb',
+              'cpu_info', 'service_name', 'availability_zone', 'trust_id',
+              'reservable', 'disabled', 'created_at', 'updated_at')
+    __slots__ = fields
+    interned_fields = ('hypervisor_type', 'service_name',
+                       'availability_zone', 'cpu_info')
+
+
+class AllocatedReservation(Record):
+    """Reservation holding an allocated resource."""
+
+    fields = ('id', 'lease_id', 'start_date', 'end_date')
+    __slots__ = fields
+    interned_fields = ('id', 'lease_id')
+
+
+class Allocation(Record):
+    """Reservations allocated to one resource."""
+
+    fields = ('resource_id', 'reservations')
+    __slots__ = fields
+    nested_fields = {'reservations': AllocatedReservation}
@@ -28,10 +28,12 @@ from oslo_utils import encodeutils
 
 from blazarclient import client as blazar_client
 from blazarclient import exception
+from blazarclient import recording
 from blazarclient.v1.shell_commands import allocations
 from blazarclient.v1.shell_commands import floatingips
 from blazarclient.v1.shell_commands import hosts
 from blazarclient.v1.shell_commands import leases
+from blazarclient.v1.shell_commands import mirror
 from blazarclient import version as base_version
 
 COMMANDS_V1 = {
@@ -40,6 +42,7 @@ COMMANDS_V1 = {
     'lease-create': leases.CreateLease,
     'lease-update': leases.UpdateLease,
     'lease-delete': leases.DeleteLease,
+    'lease-find-slot': leases.FindLeaseSlot,
     'host-list': hosts.ListHosts,
     'host-show': hosts.ShowHost,
     'host-create': hosts.CreateHost,
@@ -54,6 +57,9 @@ COMMANDS_V1 = {
     'floatingip-delete': floatingips.DeleteFloatingIP,
     'allocation-list': allocations.ListAllocations,
     'allocation-show': allocations.ShowAllocations,
+    'allocation-free': allocations.ListFreeResources,
+    'utilization': allocations.ListUtilization,
+    'sync': mirror.SyncMirror,
 }
 
 VERSION = 1
@@ -132,9 +138,13 @@ class BlazarShell(app.App):
         Subclasses may override this method to extend
         the parser with more global options.
         """
+        # Abbreviations are not allowed, as the global options would take
+        # the options of the commands they abbreviate, such as --end for
+        # --endpoint-type.
         parser = argparse.ArgumentParser(
             description=description,
-            add_help=False)
+            add_help=False,
+            allow_abbrev=False)
         parser.add_argument(
             '--version',
             action='version',
@@ -185,6 +195,23 @@ class BlazarShell(app.App):
         parser.add_argument(
             '--os_reservation_api_version',
             help=argparse.SUPPRESS)
+        parser.add_argument(
+            '--record', metavar='<file>',
+            default=env('BLAZAR_RECORD'),
+            help=('Append the requests and responses, with credentials '
+                  'redacted, to a file. Defaults to env[BLAZAR_RECORD].'))
+        parser.add_argument(
+            '--replay', metavar='<file>',
+            default=env('BLAZAR_REPLAY'),
+            help=('Serve the responses recorded in a file instead of '
+                  'calling the API. Defaults to env[BLAZAR_REPLAY].'))
+        parser.add_argument(
+            '--replay-latency',
+            choices=recording.LATENCIES,
+            default='original',
+            help=('Wait as long as the recorded requests took before '
+                  'replaying them (original), or not at all (zero). '
+                  'Defaults to original.'))
 
         # Deprecated arguments
         parser.add_argument(
@@ -322,6 +349,16 @@ class BlazarShell(app.App):
 
     def authenticate_user(self):
         """Authenticate user and set client by using passed params."""
+        recorder = None
+        if self.options.record:
+            recorder = recording.Recorder(self.options.record)
+        if self.options.replay:
+            self.client = blazar_client.Client(
+                self.options.os_reservation_api_version,
+                replay=recording.Replay(self.options.replay,
+                                        self.options.replay_latency),
+                recorder=recorder)
+            return
         auth = loading.load_auth_from_argparse_arguments(self.options)
         sess = loading.load_session_from_argparse_arguments(
             self.options, auth=auth)
@@ -332,6 +369,7 @@ class BlazarShell(app.App):
                           self.options.os_service_type),
             interface=self.options.endpoint_type or self.options.os_interface,
             region_name=self.options.os_region_name,
+            recorder=recorder,
         )
         return
 
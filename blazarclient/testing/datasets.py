@@ -0,0 +1,297 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic synthetic datasets of hosts, leases and allocations.
+
+generate() returns hosts with extra capabilities, leases with reservations
+of every type of CREATE_RESERVATION_KEYS, floating IPs, and the host
+allocations of the host reservations, in the format of the API responses.
+The same arguments always give the same dataset.
+
+Allocations are consistent: every host reservation gets max hosts, a host
+never holds two overlapping reservations, and reservations asking for GPU
+hosts only get hosts with gpu=True. A lease is moved later when its hosts
+are busy, so leases may start after the generated window.
+
+Datasets can be written as JSON fixtures and loaded into a fake server::
+
+    python -m blazarclient.testing.datasets --hosts 1000 --leases 100000 \\
+        --output dataset.json
+    python -m blazarclient.testing.fake_server --dataset dataset.json
+"""
+
+import argparse
+import datetime
+import heapq
+import random
+import sys
+
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
+
+from blazarclient import utils
+from blazarclient.v1.shell_commands import leases as lease_commands
+
+# Share of each reservation type among the generated reservations.
+RESERVATION_TYPE_WEIGHTS = {
+    'physical:host': 6,
+    'virtual:instance': 2,
+    'flavor:instance': 1,
+    'virtual:floatingip': 1,
+}
+GPU_PROPERTIES = '["==", "$gpu", "True"]'
+# Keys of a dataset, in the order they are written.
+RESOURCES = ('hosts', 'leases', 'allocations', 'floatingips')
+
+
+def _uuid(rand):
+    # NOTE: Formatted by hand, as uuid.UUID() is most of the cost of
+    #       generating reservations.
+    value = '%032x' % rand.getrandbits(128)
+    return '%s-%s-4%s-a%s-%s' % (value[:8], value[8:12], value[13:16],
+                                 value[17:20], value[20:])
+
+
+def _date(start, minutes):
+    return (start + datetime.timedelta(minutes=minutes)).strftime(
+        utils.LEASE_DATE_FORMAT)
+
+
+def _host(rand, host_id, capabilities, created_at):
+    host = {
+        'id': host_id,
+        'hypervisor_hostname': 'host-%s' % host_id,
+        'hypervisor_type': 'QEMU',
+        'hypervisor_version': 4002000,
+        'vcpus': rand.choice((16, 32, 64)),
+        'memory_mb': rand.choice((65536, 131072, 262144)),
+        'local_gb': rand.choice((500, 1000, 2000)),
+        'cpu_info': 'x86_64',
+        'service_name': 'compute',
+        'availability_zone': 'nova',
+        'trust_id': _uuid(rand),
+        'reservable': True,
+        'disabled': False,
+        'created_at': created_at,
+        'updated_at': None,
+        'gpu': str(rand.random() < 0.25),
+        'rack': 'r%d' % rand.randint(1, 16),
+    }
+    for i in range(capabilities):
+        host['capability_%d' % i] = 'value_%d' % rand.randint(0, 9)
+    return host
+
+
+def _reservation_values(rand, resource_type):
+    """Return the type specific values of a reservation."""
+    if resource_type == 'physical:host':
+        count = rand.randint(1, 3)
+        return {'min': count, 'max': count, 'hypervisor_properties': '',
+                'resource_properties': (GPU_PROPERTIES
+                                        if rand.random() < 0.2 else ''),
+                'before_end': 'default'}
+    if resource_type == 'virtual:instance':
+        return {'vcpus': rand.choice((1, 2, 4, 8)),
+                'memory_mb': rand.choice((2048, 4096, 8192)),
+                'disk_gb': rand.choice((20, 40, 80)),
+                'amount': rand.randint(1, 10), 'affinity': 'None',
+                'resource_properties': ''}
+    if resource_type == 'flavor:instance':
+        return {'flavor_id': 'flavor-%d' % rand.randint(1, 5),
+                'amount': rand.randint(1, 10), 'affinity': 'None'}
+    return {'amount': rand.randint(1, 3), 'network_id': 'public',
+            'required_floatingips': []}
+
+
+def _reservation(rand, resource_type, lease_id, created_at):
+    # Start from the defaults of lease-create, as a request would.
+    reservation = {
+        key: value for key, value in
+        lease_commands.CREATE_RESERVATION_KEYS[resource_type].items()
+        if value is not None}
+    reservation.update(_reservation_values(rand, resource_type))
+    reservation.update(id=_uuid(rand), lease_id=lease_id,
+                       resource_id=_uuid(rand),
+                       missing_resources=False, resources_changed=False,
+                       created_at=created_at, updated_at=None)
+    return reservation
+
+
+def _status(start, end, now):
+    """Return the lease and reservation statuses at now."""
+    if end <= now:
+        return 'TERMINATED', 'deleted'
+    if start <= now:
+        return 'ACTIVE', 'active'
+    return 'PENDING', 'pending'
+
+
+def generate(hosts=100, leases=1000, floatingips=0, capabilities=5,
+             days=30, start=None, seed=0):
+    """Generate a dataset.
+
+    :param hosts: number of hosts.
+    :param leases: number of leases.
+    :param floatingips: number of floating IPs.
+    :param capabilities: number of extra capabilities of each host, on top
+                         of gpu and rack.
+    :param days: leases start within this many days of start, before or
+                 after it, and last up to a week.
+    :param start: reference time of the dataset, the current minute by
+                  default. Lease statuses are relative to it.
+    :param seed: seed of the generator.
+    :returns: a dict of lists of API resources, by name of RESOURCES.
+    """
+    rand = random.Random(seed)
+    if start is None:
+        start = timeutils.utcnow().replace(second=0, microsecond=0)
+    created_at = start.strftime(utils.LEASE_DATE_FORMAT)
+    origin = start - datetime.timedelta(days=days)
+
+    host_list = [_host(rand, str(i + 1), capabilities, created_at)
+                 for i in range(hosts)]
+    # Free hosts of each kind, as (minute they are free from, host ID).
+    free = {True: [], False: []}
+    for host in host_list:
+        free[host['gpu'] == 'True'].append((0, host['id']))
+    reserved = {host['id']: [] for host in host_list}
+
+    types, weights = zip(*sorted(RESERVATION_TYPE_WEIGHTS.items()))
+    if not hosts:
+        types, weights = zip(*[(t, w) for t, w in zip(types, weights)
+                               if t != 'physical:host'])
+    # Host reservations are allocated in start order, so that the earliest
+    # free hosts can be taken from a heap.
+    starts = sorted(rand.randint(0, 2 * days * 1440) for i in range(leases))
+    now = days * 1440
+    lease_list = []
+    for index, lease_start in enumerate(starts):
+        lease_id = _uuid(rand)
+        duration = rand.randint(60, 7 * 1440)
+        reservations = [
+            _reservation(rand, resource_type, lease_id, created_at)
+            for resource_type in rand.choices(types, weights,
+                                              k=rand.randint(1, 2))]
+        allocated = []
+        for reservation in reservations:
+            if reservation['resource_type'] != 'physical:host':
+                continue
+            gpu = reservation['resource_properties'] == GPU_PROPERTIES
+            if not free[gpu]:
+                gpu = not gpu
+                reservation['resource_properties'] = (GPU_PROPERTIES if gpu
+                                                      else '')
+            count = min(reservation['max'], len(free[gpu]))
+            reservation['min'] = reservation['max'] = count
+            taken = [heapq.heappop(free[gpu]) for i in range(count)]
+            lease_start = max([lease_start] + [t[0] for t in taken])
+            allocated.append((reservation, gpu, taken))
+        lease_end = lease_start + duration
+        status, reservation_status = _status(lease_start, lease_end, now)
+        for reservation in reservations:
+            reservation['status'] = reservation_status
+        start_date = _date(origin, lease_start)
+        end_date = _date(origin, lease_end)
+        for reservation, gpu, taken in allocated:
+            for free_from, host_id in taken:
+                reserved[host_id].append({
+                    'id': reservation['id'], 'lease_id': lease_id,
+                    'start_date': start_date, 'end_date': end_date})
+                heapq.heappush(free[gpu], (lease_end, host_id))
+        lease_list.append({
+            'id': lease_id,
+            'name': 'lease-%d' % index,
+            'status': status,
+            'project_id': 'project-%d' % rand.randint(1, 20),
+            'user_id': 'user-%d' % rand.randint(1, 200),
+            'start_date': start_date,
+            'end_date': end_date,
+            'before_end_date': None,
+            'trust_id': _uuid(rand),
+            'degraded': False,
+            'reservations': reservations,
+            'events': [],
+            'created_at': created_at,
+            'updated_at': None,
+        })
+
+    allocations = [{'resource_id': host['id'],
+                    'reservations': reserved[host['id']]}
+                   for host in host_list]
+
+    floatingip_list = [{
+        'id': _uuid(rand),
+        'floating_network_id': 'public',
+        'floating_ip_address': '10.%d.%d.%d' % (
+            i >> 16 & 255, i >> 8 & 255, i & 255),
+        'subnet_id': None,
+        'reservable': True,
+        'created_at': created_at,
+        'updated_at': None,
+    } for i in range(floatingips)]
+
+    return {'hosts': host_list, 'leases': lease_list,
+            'allocations': allocations, 'floatingips': floatingip_list}
+
+
+def dump(dataset, stream):
+    """Write a dataset as JSON, one resource per line.
+
+    Resources are encoded one at a time, so that large datasets are not
+    held twice in memory.
+    """
+    stream.write('{')
+    for position, name in enumerate(RESOURCES):
+        stream.write('%s\n"%s": [' % (',' if position else '', name))
+        for index, resource in enumerate(dataset.get(name, ())):
+            stream.write('%s\n%s' % (',' if index else '',
+                                     jsonutils.dumps(resource)))
+        stream.write('\n]')
+    stream.write('\n}\n')
+
+
+def load(path):
+    """Return the dataset saved in a JSON file."""
+    with open(path) as f:
+        dataset = jsonutils.loads(f.read())
+    return {name: dataset.get(name, []) for name in RESOURCES}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hosts', type=int, default=100)
+    parser.add_argument('--leases', type=int, default=1000)
+    parser.add_argument('--floatingips', type=int, default=0)
+    parser.add_argument('--capabilities', type=int, default=5)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--start', default=None,
+                        help="reference time, 'YYYY-MM-DD HH:MM' in UTC")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None,
+                        help='file to write, standard output by default')
+    args = parser.parse_args(argv)
+
+    start = utils.parse_date(args.start) if args.start else None
+    dataset = generate(hosts=args.hosts, leases=args.leases,
+                       floatingips=args.floatingips,
+                       capabilities=args.capabilities, days=args.days,
+                       start=start, seed=args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            dump(dataset, f)
+    else:
+        dump(dataset, sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
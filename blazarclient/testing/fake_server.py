@@ -0,0 +1,588 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""In-process fake of the Blazar REST API for tests and benchmarks.
+
+FakeBlazar is a WSGI application serving leases, hosts, host properties,
+floating IPs and host allocations from an in-memory store, with optional
+artificial latency and error rate. populate() fills the store with a
+generated dataset of any size, and serve() runs the application on a local
+port in a background thread::
+
+    app = fake_server.FakeBlazar(latency=0.01)
+    app.populate(hosts=100, leases=1000)
+    with fake_server.serve(app) as url:
+        blazar = client.Client(blazar_url=url, auth_token='token')
+        blazar.lease.list()
+
+It can also be run with ``python -m blazarclient.testing.fake_server``.
+
+Only the behaviour the client relies on is implemented: host reservations
+are allocated to free hosts matching their resource_properties, other
+reservation types are stored as they are, and lease statuses never change.
+"""
+
+import argparse
+import contextlib
+import random
+import re
+import socketserver
+import threading
+import time
+from urllib import parse
+import uuid
+from wsgiref import simple_server
+
+from oslo_serialization import jsonutils
+from oslo_utils import strutils
+from oslo_utils import timeutils
+
+from blazarclient import planning
+from blazarclient.testing import datasets
+from blazarclient import utils
+
+# Host fields which are not extra capabilities, that is host properties.
+HOST_FIELDS = ('id', 'hypervisor_hostname', 'hypervisor_type',
+               'hypervisor_version', 'vcpus', 'memory_mb', 'local_gb',
+               'cpu_info', 'service_name', 'availability_zone', 'trust_id',
+               'reservable', 'disabled', 'created_at', 'updated_at')
+
+_STATUS_TEXT = {200: 'OK', 201: 'Created', 202: 'Accepted',
+                204: 'No Content', 400: 'Bad Request', 404: 'Not Found',
+                405: 'Method Not Allowed', 409: 'Conflict',
+                500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class HTTPError(Exception):
+    """Error returned to the client with its status code."""
+
+    def __init__(self, code, message):
+        super(HTTPError, self).__init__(message)
+        self.code = code
+
+
+def _now():
+    return timeutils.utcnow().strftime(utils.LEASE_DATE_FORMAT)
+
+
+def _lease_date(value):
+    """Convert a request date to the format returned by the API."""
+    if value == 'now':
+        return _now()
+    try:
+        date = utils.parse_date(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, "Invalid date '%s'." % value)
+    return date.strftime(utils.LEASE_DATE_FORMAT)
+
+
+def _paginate(resources, query, marker_key='id'):
+    """Return a page of resources for the limit and marker parameters."""
+    if 'marker' in query:
+        for position, resource in enumerate(resources):
+            if str(resource[marker_key]) == query['marker']:
+                resources = resources[position + 1:]
+                break
+        else:
+            raise HTTPError(400, "Invalid marker '%s'." % query['marker'])
+    if 'limit' in query:
+        resources = resources[:int(query['limit'])]
+    return resources
+
+
+class FakeBlazar(object):
+    """WSGI application faking the Blazar API.
+
+    :param latency: seconds added to every response.
+    :param jitter: maximum random seconds added on top of latency.
+    :param error_rate: fraction of requests failing with error_code.
+    :param error_code: HTTP status of injected errors.
+    :param seed: seed of the latency and error generator.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_code=503, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.request_count = 0
+        self.leases = {}
+        self.hosts = {}
+        self.floatingips = {}
+        self.private_properties = set()
+        # Host IDs allocated to each host reservation ID.
+        self.allocations = {}
+        # Lease ID of each reservation ID, to find the reservation window.
+        self._reservation_leases = {}
+        self._next_host_id = 1
+        self._lock = threading.RLock()
+        self._random = random.Random(seed)
+        self._routes = [
+            (re.compile(pattern + '$'), methods) for pattern, methods in (
+                ('/leases', {'GET': self._list_leases,
+                             'POST': self._create_lease}),
+                ('/leases/(?P<id>[^/]+)', {'GET': self._get_lease,
+                                           'PUT': self._update_lease,
+                                           'DELETE': self._delete_lease}),
+                ('/os-hosts', {'GET': self._list_hosts,
+                               'POST': self._create_host}),
+                ('/os-hosts/allocations', {'GET': self._list_allocations}),
+                ('/os-hosts/properties', {'GET': self._list_properties}),
+                ('/os-hosts/properties/(?P<id>[^/]+)',
+                 {'PATCH': self._update_property}),
+                ('/os-hosts/(?P<id>[^/]+)', {'GET': self._get_host,
+                                             'PUT': self._update_host,
+                                             'DELETE': self._delete_host}),
+                ('/os-hosts/(?P<id>[^/]+)/allocation',
+                 {'GET': self._get_allocation}),
+                ('/floatingips', {'GET': self._list_floatingips,
+                                  'POST': self._create_floatingip}),
+                ('/floatingips/(?P<id>[^/]+)',
+                 {'GET': self._get_floatingip,
+                  'DELETE': self._delete_floatingip}),
+            )]
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.request_count += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+
+        try:
+            if failed:
+                raise HTTPError(self.error_code, 'Injected error.')
+            code, body = self._dispatch(environ)
+        except HTTPError as e:
+            code, body = e.code, {'error_code': e.code,
+                                  'error_message': str(e),
+                                  'error_name': _STATUS_TEXT.get(e.code)}
+        headers = []
+        payload = b''
+        if body is not None:
+            payload = jsonutils.dump_as_bytes(body)
+            headers.append(('Content-Type', 'application/json'))
+        headers.append(('Content-Length', str(len(payload))))
+        start_response('%d %s' % (code, _STATUS_TEXT.get(code, '')),
+                       headers)
+        return [payload]
+
+    def _dispatch(self, environ):
+        path = environ.get('PATH_INFO', '')
+        if path.startswith('/v1/'):
+            path = path[3:]
+        path = path.rstrip('/') or '/'
+        query = dict(parse.parse_qsl(environ.get('QUERY_STRING', '')))
+        method = environ['REQUEST_METHOD']
+        body = None
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        if length:
+            try:
+                body = jsonutils.loads(environ['wsgi.input'].read(length))
+            except ValueError:
+                raise HTTPError(400, 'Invalid JSON body.')
+
+        for pattern, methods in self._routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            if method not in methods:
+                raise HTTPError(405, 'Method %s not allowed.' % method)
+            with self._lock:
+                return methods[method](query=query, body=body,
+                                       **match.groupdict())
+        raise HTTPError(404, 'No resource at %s.' % path)
+
+    def populate(self, hosts=0, leases=0, floatingips=0, start=None,
+                 seed=0):
+        """Add a generated dataset to the store.
+
+        See blazarclient.testing.datasets.generate() for the arguments.
+        """
+        self.load(datasets.generate(hosts=hosts, leases=leases,
+                                    floatingips=floatingips, start=start,
+                                    seed=seed))
+
+    def load(self, dataset):
+        """Add a dataset to the store.
+
+        :param dataset: a dict of lists of hosts, leases, allocations and
+                        floating IPs, as returned by datasets.generate() or
+                        datasets.load().
+        """
+        with self._lock:
+            for host in dataset.get('hosts', ()):
+                self.hosts[str(host['id'])] = host
+                if str(host['id']).isdigit():
+                    self._next_host_id = max(self._next_host_id,
+                                             int(host['id']) + 1)
+            for lease in dataset.get('leases', ()):
+                self._store_lease(lease)
+            for floatingip in dataset.get('floatingips', ()):
+                self.floatingips[floatingip['id']] = floatingip
+            for allocation in dataset.get('allocations', ()):
+                for reservation in allocation['reservations']:
+                    self.allocations.setdefault(reservation['id'], []).append(
+                        str(allocation['resource_id']))
+
+    # Leases
+
+    def _find(self, resources, resource_id, kind):
+        try:
+            return resources[resource_id]
+        except KeyError:
+            raise HTTPError(404, '%s %s not found.' % (kind, resource_id))
+
+    def _store_lease(self, lease):
+        self.leases[lease['id']] = lease
+        for reservation in lease['reservations']:
+            self._reservation_leases[reservation['id']] = lease['id']
+
+    def _list_leases(self, query, body):
+        leases = list(self.leases.values())
+        for key in ('status', 'project_id', 'user_id'):
+            if key in query:
+                leases = [lease for lease in leases
+                          if lease[key] == query[key]]
+        if 'name_prefix' in query:
+            leases = [lease for lease in leases
+                      if (lease.get('name') or '').startswith(
+                          query['name_prefix'])]
+        if 'overlap_start' in query:
+            overlap_start = _lease_date(query['overlap_start'])
+            leases = [lease for lease in leases
+                      if lease['end_date'] > overlap_start]
+        if 'overlap_end' in query:
+            overlap_end = _lease_date(query['overlap_end'])
+            leases = [lease for lease in leases
+                      if lease['start_date'] < overlap_end]
+        return 200, {'leases': _paginate(leases, query)}
+
+    def _get_lease(self, query, body, id):
+        return 200, {'lease': self._find(self.leases, id, 'Lease')}
+
+    def _create_lease(self, query, body):
+        lease = self._add_lease((body or {}), allocate=True)
+        return 201, {'lease': lease}
+
+    def _add_lease(self, values, allocate=False):
+        lease_id = str(uuid.uuid4())
+        now = _now()
+        start_date = _lease_date(values.get('start_date', 'now'))
+        end_date = _lease_date(values.get('end_date'))
+        if end_date <= start_date:
+            raise HTTPError(400, 'The lease end must be after its start.')
+        reservations = []
+        for reservation in values.get('reservations') or []:
+            reservation = dict(reservation, id=str(uuid.uuid4()),
+                               lease_id=lease_id, status='pending',
+                               resource_id=str(uuid.uuid4()),
+                               missing_resources=False,
+                               resources_changed=False,
+                               created_at=now, updated_at=None)
+            reservations.append(reservation)
+        if allocate:
+            allocations = {}
+            for reservation in reservations:
+                if reservation.get('resource_type') == 'physical:host':
+                    allocations[reservation['id']] = self._allocate(
+                        reservation, start_date, end_date, allocations)
+            self.allocations.update(allocations)
+        lease = {
+            'id': lease_id, 'name': values.get('name'), 'status': 'PENDING',
+            'project_id': values.get('project_id', 'project'),
+            'user_id': values.get('user_id', 'user'),
+            'start_date': start_date, 'end_date': end_date,
+            'before_end_date': values.get('before_end_date'),
+            'trust_id': None, 'degraded': False,
+            'reservations': reservations,
+            'events': [dict(event, id=str(uuid.uuid4()), lease_id=lease_id,
+                            status='UNDONE')
+                       for event in values.get('events') or []],
+            'created_at': now, 'updated_at': None,
+        }
+        self._store_lease(lease)
+        return lease
+
+    def _allocate(self, reservation, start_date, end_date, pending):
+        """Return the IDs of free hosts for a host reservation."""
+        try:
+            count_min = int(reservation.get('min') or 1)
+            count_max = int(reservation.get('max') or count_min)
+        except ValueError:
+            raise HTTPError(400, 'min and max must be integers.')
+        busy = set()
+        for reservation_id, host_ids in list(self.allocations.items()) + \
+                list(pending.items()):
+            other = self._reservation_window(reservation_id)
+            if other is None or (other[0] < end_date and
+                                 other[1] > start_date):
+                busy.update(host_ids)
+        free = [host_id for host_id, host in self.hosts.items()
+                if host_id not in busy and planning.match_properties(
+                    host, reservation.get('resource_properties'))]
+        if len(free) < count_min:
+            raise HTTPError(409, 'Not enough hosts available.')
+        return free[:count_max]
+
+    def _reservation_window(self, reservation_id):
+        # Reservations of the lease being created are not stored yet, and
+        # are taken as overlapping.
+        lease = self.leases.get(self._reservation_leases.get(reservation_id))
+        if lease is None:
+            return None
+        return lease['start_date'], lease['end_date']
+
+    def _update_lease(self, query, body, id):
+        lease = self._find(self.leases, id, 'Lease')
+        body = body or {}
+        if 'name' in body:
+            lease['name'] = body['name']
+        for key in ('start_date', 'end_date'):
+            if key in body:
+                lease[key] = _lease_date(body[key])
+        if lease['end_date'] <= lease['start_date']:
+            raise HTTPError(400, 'The lease end must be after its start.')
+        reservations = {r['id']: r for r in lease['reservations']}
+        for values in body.get('reservations') or []:
+            reservation = self._find(reservations, values.get('id'),
+                                     'Reservation')
+            reservation.update(values)
+            reservation['updated_at'] = _now()
+        lease['updated_at'] = _now()
+        return 200, {'lease': lease}
+
+    def _delete_lease(self, query, body, id):
+        lease = self.leases.pop(self._find(self.leases, id, 'Lease')['id'])
+        for reservation in lease['reservations']:
+            self.allocations.pop(reservation['id'], None)
+            self._reservation_leases.pop(reservation['id'], None)
+        return 204, None
+
+    # Hosts and properties
+
+    def _list_hosts(self, query, body):
+        return 200, {'hosts': _paginate(list(self.hosts.values()), query)}
+
+    def _get_host(self, query, body, id):
+        return 200, {'host': self._find(self.hosts, id, 'Host')}
+
+    def _create_host(self, query, body):
+        if not (body or {}).get('name'):
+            raise HTTPError(400, 'A host name is required.')
+        return 201, {'host': self._add_host(body)}
+
+    def _add_host(self, values):
+        host_id = str(self._next_host_id)
+        self._next_host_id += 1
+        values = dict(values)
+        host = {'id': host_id,
+                'hypervisor_hostname': values.pop('name'),
+                'hypervisor_type': 'QEMU', 'hypervisor_version': 4002000,
+                'vcpus': values.pop('vcpus', 32),
+                'memory_mb': values.pop('memory_mb', 131072),
+                'local_gb': values.pop('local_gb', 1000),
+                'cpu_info': 'x86_64', 'service_name': values.pop(
+                    'service_name', 'compute'),
+                'availability_zone': values.pop('availability_zone', 'nova'),
+                'trust_id': str(uuid.uuid4()), 'reservable': True,
+                'disabled': False, 'created_at': _now(), 'updated_at': None}
+        host.update(values)
+        self.hosts[host_id] = host
+        return host
+
+    def _update_host(self, query, body, id):
+        host = self._find(self.hosts, id, 'Host')
+        for key, value in (body or {}).items():
+            if key in HOST_FIELDS:
+                raise HTTPError(400, "Host field '%s' cannot be "
+                                     "updated." % key)
+            host[key] = value
+        host['updated_at'] = _now()
+        return 200, {'host': host}
+
+    def _delete_host(self, query, body, id):
+        self._find(self.hosts, id, 'Host')
+        if any(id in host_ids for host_ids in self.allocations.values()):
+            raise HTTPError(409, 'Host %s is allocated.' % id)
+        del self.hosts[id]
+        return 204, None
+
+    def _properties(self):
+        values = {}
+        for host in self.hosts.values():
+            for key, value in host.items():
+                if key not in HOST_FIELDS:
+                    values.setdefault(key, set()).add(str(value))
+        return values
+
+    def _list_properties(self, query, body):
+        detail = strutils.bool_from_string(query.get('detail'))
+        include_private = strutils.bool_from_string(query.get('all'))
+        properties = []
+        for name, values in sorted(self._properties().items()):
+            private = name in self.private_properties
+            if private and not include_private:
+                continue
+            resource_property = {'property': name}
+            if detail:
+                resource_property.update(private=private,
+                                         values=sorted(values))
+            properties.append(resource_property)
+        return 200, {'resource_properties': properties}
+
+    def _update_property(self, query, body, id):
+        if id not in self._properties():
+            raise HTTPError(404, 'Property %s not found.' % id)
+        private = strutils.bool_from_string((body or {}).get('private'))
+        if private:
+            self.private_properties.add(id)
+        else:
+            self.private_properties.discard(id)
+        return 200, {'resource_property': {'property': id,
+                                           'private': private}}
+
+    # Allocations
+
+    def _host_allocations(self, query):
+        reservations = {}
+        for lease in self.leases.values():
+            for reservation in lease['reservations']:
+                if reservation['id'] not in self.allocations:
+                    continue
+                if query.get('lease_id', lease['id']) != lease['id'] or (
+                        query.get('reservation_id', reservation['id']) !=
+                        reservation['id']):
+                    continue
+                for host_id in self.allocations[reservation['id']]:
+                    reservations.setdefault(host_id, []).append({
+                        'id': reservation['id'], 'lease_id': lease['id'],
+                        'start_date': lease['start_date'],
+                        'end_date': lease['end_date']})
+        return [{'resource_id': host_id,
+                 'reservations': reservations.get(host_id, [])}
+                for host_id in self.hosts]
+
+    def _list_allocations(self, query, body):
+        return 200, {'allocations': _paginate(
+            self._host_allocations(query), query, marker_key='resource_id')}
+
+    def _get_allocation(self, query, body, id):
+        self._find(self.hosts, id, 'Host')
+        for allocation in self._host_allocations(query):
+            if allocation['resource_id'] == id:
+                return 200, {'allocation': allocation}
+
+    # Floating IPs
+
+    def _list_floatingips(self, query, body):
+        return 200, {'floatingips': _paginate(
+            list(self.floatingips.values()), query)}
+
+    def _get_floatingip(self, query, body, id):
+        return 200, {'floatingip': self._find(self.floatingips, id,
+                                              'Floating IP')}
+
+    def _create_floatingip(self, query=None, body=None):
+        body = body or {}
+        if not body.get('floating_network_id') or not body.get(
+                'floating_ip_address'):
+            raise HTTPError(400, 'A network and an address are required.')
+        floatingip = dict(body, id=str(uuid.uuid4()), subnet_id=None,
+                          reservable=True, created_at=_now(),
+                          updated_at=None)
+        self.floatingips[floatingip['id']] = floatingip
+        return 201, {'floatingip': floatingip}
+
+    def _delete_floatingip(self, query, body, id):
+        del self.floatingips[self._find(self.floatingips, id,
+                                        'Floating IP')['id']]
+        return 204, None
+
+
+class _QuietHandler(simple_server.WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _ThreadingServer(socketserver.ThreadingMixIn,
+                       simple_server.WSGIServer):
+    daemon_threads = True
+    # The default backlog of 5 drops the connections of concurrent clients,
+    # which then wait a second before connecting again.
+    request_queue_size = 128
+
+
+def make_server(app, host='127.0.0.1', port=0):
+    """Return a threaded WSGI server for app, not yet serving."""
+    return simple_server.make_server(host, port, app,
+                                     server_class=_ThreadingServer,
+                                     handler_class=_QuietHandler)
+
+
+@contextlib.contextmanager
+def serve(app, host='127.0.0.1', port=0):
+    """Serve app in a background thread, yielding its base URL.
+
+    Requests are handled in a thread each, so concurrent clients are
+    served concurrently.
+    """
+    server = make_server(app, host, port)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield 'http://%s:%d' % server.server_address[:2]
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--hosts', type=int, default=100)
+    parser.add_argument('--leases', type=int, default=1000)
+    parser.add_argument('--floatingips', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--dataset', default=None,
+                        help='JSON dataset to load instead of generating '
+                             'one, see blazarclient.testing.datasets')
+    args = parser.parse_args()
+
+    app = FakeBlazar(latency=args.latency, jitter=args.jitter,
+                     error_rate=args.error_rate, seed=args.seed)
+    if args.dataset:
+        app.load(datasets.load(args.dataset))
+    else:
+        app.populate(hosts=args.hosts, leases=args.leases,
+                     floatingips=args.floatingips)
+    server = make_server(app, args.host, args.port)
+    print('Serving a fake Blazar API on http://%s:%d' %
+          server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+
+from blazarclient import allocation_index
+from blazarclient import exception
+from blazarclient import tests
+
+
+def _reservation(res_id, start, end):
+    return {'id': res_id, 'lease_id': 'lease-' + res_id,
+            'start_date': start, 'end_date': end}
+
+
+ALLOCATIONS = [
+    {'resource_id': '1', 'reservations': [
+        _reservation('a', '2026-01-05T09:00:00.000000',
+                     '2026-01-05T18:00:00.000000'),
+        _reservation('b', '2026-01-07T00:00:00.000000',
+                     '2026-01-10T00:00:00.000000')]},
+    {'resource_id': '2', 'reservations': []},
+    {'resource_id': '3', 'reservations': [
+        _reservation('c', '2026-01-01T00:00:00.000000',
+                     '2026-02-01T00:00:00.000000'),
+        _reservation('d', '2026-01-02T00:00:00.000000',
+                     '2026-01-03T00:00:00.000000')]},
+]
+
+
+class IntervalIndexTestCase(tests.TestCase):
+
+    def test_overlapping_matches_linear_scan(self):
+        rand = random.Random(42)
+        intervals = []
+        for i in range(500):
+            start = rand.randint(0, 10000)
+            intervals.append((start, start + rand.randint(1, 500), i))
+        index = allocation_index.IntervalIndex(intervals)
+
+        for _ in range(200):
+            start = rand.randint(-100, 10500)
+            end = start + rand.randint(1, 1000)
+            expected = sorted(i for s, e, i in intervals
+                              if s < end and e > start)
+            self.assertEqual(expected,
+                             sorted(index.overlapping(start, end)))
+
+    def test_overlapping_is_half_open(self):
+        index = allocation_index.IntervalIndex([(10, 20, 'x')])
+
+        self.assertEqual([], list(index.overlapping(20, 30)))
+        self.assertEqual([], list(index.overlapping(0, 10)))
+        self.assertEqual(['x'], list(index.overlapping(19, 30)))
+
+    def test_empty(self):
+        index = allocation_index.IntervalIndex([])
+
+        self.assertEqual(0, len(index))
+        self.assertEqual([], list(index.overlapping(0, 10)))
+
+
+class AllocationIndexTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(AllocationIndexTestCase, self).setUp()
+        self.index = allocation_index.AllocationIndex(ALLOCATIONS)
+
+    def test_overlapping(self):
+        overlapping = self.index.overlapping('2026-01-05 12:00',
+                                             '2026-01-08 00:00')
+
+        self.assertEqual([('3', 'c'), ('1', 'a'), ('1', 'b')],
+                         [(r_id, r['id']) for r_id, r in overlapping])
+
+    def test_free(self):
+        self.assertEqual(['2'], self.index.free('2026-01-05 12:00',
+                                                '2026-01-08 00:00'))
+        self.assertEqual(['1', '2'], self.index.free('2026-01-02 00:00',
+                                                     '2026-01-04 00:00'))
+        self.assertEqual(['1', '2', '3'], self.index.free(
+            '2026-03-01 00:00', '2026-03-02 00:00'))
+
+    def test_free_nested_reservations(self):
+        # Reservation d is nested in c, so the running max end is needed.
+        self.assertEqual(['1', '2'], self.index.free('2026-01-04 00:00',
+                                                     '2026-01-05 00:00'))
+
+    def test_free_count(self):
+        self.assertEqual(['1'], self.index.free('2026-03-01 00:00',
+                                                '2026-03-02 00:00', count=1))
+
+    def test_free_invalid_window(self):
+        self.assertRaises(exception.BlazarClientException, self.index.free,
+                          '2026-03-02 00:00', '2026-03-01 00:00')
+
+    def test_is_free(self):
+        self.assertFalse(self.index.is_free('1', '2026-01-05 17:00',
+                                            '2026-01-05 19:00'))
+        self.assertTrue(self.index.is_free('1', '2026-01-05 18:00',
+                                           '2026-01-07 00:00'))
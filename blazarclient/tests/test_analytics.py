@@ -0,0 +1,118 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+from unittest import mock
+
+import testtools
+
+from blazarclient import analytics
+from blazarclient import exception
+from blazarclient import tests
+
+HOUR = 3600.0
+DAY = 24 * HOUR
+JAN_1 = (datetime.datetime(2026, 1, 1) -
+         datetime.datetime(1970, 1, 1)).total_seconds()
+
+ALLOCATIONS = [
+    {'resource_id': 1, 'reservations': [
+        {'start_date': '2026-01-01T00:00:00.000000',
+         'end_date': '2026-01-02T00:00:00.000000'},
+        {'start_date': '2026-01-03T12:00:00.000000',
+         'end_date': '2026-01-04T00:00:00.000000'}]},
+    {'resource_id': 2, 'reservations': [
+        {'start_date': '2026-01-01T12:00:00.000000',
+         'end_date': '2026-01-03T00:00:00.000000'}]},
+]
+
+
+@testtools.skipIf(analytics.numpy is None, 'NumPy is not installed')
+class UtilizationTestCase(tests.TestCase):
+
+    def test_to_timestamps(self):
+        self.assertEqual(
+            [JAN_1, JAN_1 + HOUR, JAN_1 + DAY],
+            list(analytics.to_timestamps([
+                '2026-01-01T00:00:00.000000', '2026-01-01 01:00',
+                datetime.datetime(2026, 1, 2)])))
+        self.assertEqual(
+            [JAN_1], list(analytics.to_timestamps(['2026-01-01T01:00+01:00'])))
+
+    def test_allocation_arrays(self):
+        arrays = analytics.allocation_arrays(ALLOCATIONS)
+
+        starts, ends, weights = arrays[None]
+        self.assertEqual([JAN_1, JAN_1 + 2.5 * DAY, JAN_1 + 0.5 * DAY],
+                         list(starts))
+        self.assertEqual([JAN_1 + DAY, JAN_1 + 3 * DAY, JAN_1 + 2 * DAY],
+                         list(ends))
+        self.assertEqual([1, 1, 1], list(weights))
+
+    def test_allocation_arrays_groups(self):
+        arrays = analytics.allocation_arrays(ALLOCATIONS, {'2': 'gpu'})
+
+        self.assertEqual(['gpu'], list(arrays))
+        self.assertEqual([JAN_1 + 0.5 * DAY], list(arrays['gpu'][0]))
+
+    def test_lease_arrays(self):
+        leases = [
+            {'start_date': '2026-01-01T00:00:00.000000',
+             'end_date': '2026-01-02T00:00:00.000000',
+             'reservations': [
+                 {'resource_type': 'physical:host', 'min': 1, 'max': 3},
+                 {'resource_type': 'virtual:instance', 'amount': 2}]},
+        ]
+
+        starts, ends, weights = analytics.lease_arrays(leases)
+
+        self.assertEqual([JAN_1], list(starts))
+        self.assertEqual([3], list(weights))
+        starts, ends, weights = analytics.lease_arrays(
+            leases, resource_type='virtual:instance')
+        self.assertEqual([2], list(weights))
+
+    def test_utilization(self):
+        starts, ends, weights = analytics.allocation_arrays(
+            ALLOCATIONS)[None]
+
+        times, reserved = analytics.utilization(
+            starts, ends, weights, JAN_1, JAN_1 + 4 * DAY, DAY)
+
+        self.assertEqual([JAN_1 + i * DAY for i in range(4)], list(times))
+        self.assertEqual([1.5, 1.0, 0.5, 0.0], list(reserved))
+
+    def test_utilization_partial_bins(self):
+        times, reserved = analytics.utilization(
+            [JAN_1 - DAY], [JAN_1 + 3 * HOUR], [2],
+            JAN_1, JAN_1 + 5 * HOUR, 2 * HOUR)
+
+        self.assertEqual([JAN_1, JAN_1 + 2 * HOUR, JAN_1 + 4 * HOUR],
+                         list(times))
+        self.assertEqual([2.0, 1.0, 0.0], list(reserved))
+
+    def test_utilization_empty(self):
+        times, reserved = analytics.utilization(
+            [], [], [], JAN_1, JAN_1 + DAY, HOUR)
+
+        self.assertEqual(24, len(times))
+        self.assertEqual(0, reserved.sum())
+
+    def test_utilization_invalid_window(self):
+        self.assertRaises(exception.BlazarClientException,
+                          analytics.utilization, [], [], [],
+                          JAN_1, JAN_1, HOUR)
+
+    @mock.patch.object(analytics, 'numpy', None)
+    def test_numpy_missing(self):
+        self.assertRaises(exception.BlazarClientException,
+                          analytics.allocation_arrays, ALLOCATIONS)
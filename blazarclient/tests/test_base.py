@@ -188,3 +188,53 @@ class BaseClientManagerTestCase(tests.TestCase):
                           blazar_url=None,
                           auth_token=self.auth_token,
                           session=None)
+
+    def _paged_manager(self, pages):
+        manager = base.BaseClientManager(blazar_url=self.blazar_url,
+                                         auth_token=self.auth_token,
+                                         session=None)
+        manager.request_manager = mock.Mock()
+        manager.request_manager.get.side_effect = [
+            (200, {'leases': page}) for page in pages]
+        return manager
+
+    def test_list_iter_pages(self):
+        manager = self._paged_manager([
+            [{'id': '1'}, {'id': '2'}],
+            [{'id': '3'}, {'id': '4'}],
+            [{'id': '5'}],
+        ])
+
+        leases = manager._list_iter('/leases', 'leases', page_size=2)
+
+        self.assertEqual(['1', '2', '3', '4', '5'],
+                         [lease['id'] for lease in leases])
+        manager.request_manager.get.assert_has_calls([
+            mock.call('/leases?limit=2'),
+            mock.call('/leases?limit=2&marker=2'),
+            mock.call('/leases?limit=2&marker=4'),
+        ])
+
+    def test_list_iter_is_lazy(self):
+        manager = self._paged_manager([
+            [{'id': '1'}, {'id': '2'}],
+            [{'id': '3'}],
+        ])
+
+        leases = manager._list_iter('/leases', 'leases', page_size=2)
+
+        self.assertEqual('1', next(leases)['id'])
+        self.assertEqual(1, manager.request_manager.get.call_count)
+
+    def test_list_iter_server_ignores_paging(self):
+        everything = [{'id': '1'}, {'id': '2'}]
+        manager = self._paged_manager([everything, everything])
+
+        leases = manager._list_iter('/leases?name=lease', 'leases',
+                                    page_size=2)
+
+        self.assertEqual(['1', '2'], [lease['id'] for lease in leases])
+        manager.request_manager.get.assert_has_calls([
+            mock.call('/leases?name=lease&limit=2'),
+            mock.call('/leases?name=lease&limit=2&marker=2'),
+        ])
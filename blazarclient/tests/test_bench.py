@@ -0,0 +1,158 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import os
+import tempfile
+from unittest import mock
+
+from keystoneauth1 import session
+from keystoneauth1 import token_endpoint
+from oslo_serialization import jsonutils
+
+from blazarclient import bench
+from blazarclient import exception
+from blazarclient.testing import fake_server
+from blazarclient import tests
+from blazarclient.v1 import client
+from blazarclient import version
+
+
+class BenchTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(BenchTestCase, self).setUp()
+        self.app = fake_server.FakeBlazar()
+        self.app.populate(hosts=5, leases=20)
+        server = fake_server.serve(self.app)
+        url = server.__enter__()
+        self.addCleanup(server.__exit__, None, None, None)
+        self.workload = bench.Workload(client.Client(
+            session=session.Session(auth=token_endpoint.Token(url, 'token'))))
+
+    def test_parse_mix(self):
+        self.assertEqual({'lease-list': 3.0, 'lease-create': 1.0},
+                         bench.parse_mix('lease-list=3, lease-create'))
+        self.assertRaises(exception.BlazarClientException,
+                          bench.parse_mix, 'lease-list=3,lease-explode')
+        self.assertRaises(exception.BlazarClientException,
+                          bench.parse_mix, 'lease-list=0')
+        self.assertRaises(exception.BlazarClientException,
+                          bench.parse_mix, 'lease-list=many')
+
+    def test_run(self):
+        mix = bench.parse_mix(bench.DEFAULT_MIX)
+        elapsed, samples = bench.run(self.workload, mix, concurrency=4,
+                                     duration=None, count=60)
+        self.assertEqual(60, len(samples))
+        self.assertLessEqual({name for name, latency, error in samples},
+                             set(mix))
+        self.assertEqual([None] * 60, [error for name, latency, error
+                                       in samples])
+
+        created = [lease for lease in self.app.leases.values()
+                   if lease['name'].startswith('blazar-bench')]
+        self.assertEqual(0, self.workload.clean_up())
+        self.assertTrue(all(lease['id'] not in self.app.leases
+                            for lease in created))
+        self.assertEqual(20, len(self.app.leases))
+
+    def test_lease_operations(self):
+        bench.run(self.workload, {'lease-create': 1}, concurrency=2,
+                  duration=None, count=5)
+        self.assertEqual(25, len(self.app.leases))
+        bench.run(self.workload, {'lease-update': 1}, concurrency=2,
+                  duration=None, count=5)
+        # Updates pick any lease of the run, maybe the same one twice.
+        self.assertIn(
+            len([lease for lease in self.app.leases.values()
+                 if lease['name'] == 'blazar-bench-updated']),
+            range(1, 6))
+        self.assertEqual(25, len(self.app.leases))
+        bench.run(self.workload, {'lease-delete': 1}, concurrency=2,
+                  duration=None, count=5)
+        self.assertEqual(20, len(self.app.leases))
+
+    def test_lease_show_ignores_leases_of_the_run(self):
+        existing = set(self.app.leases)
+        bench.run(self.workload, {'lease-create': 1}, concurrency=2,
+                  duration=None, count=5)
+        elapsed, samples = bench.run(
+            self.workload, {'lease-show': 1, 'lease-delete': 1},
+            concurrency=4, duration=None, count=40)
+        self.assertEqual([None] * 40, [error for name, latency, error
+                                       in samples])
+        self.assertEqual(existing, set(self.workload._lease_ids))
+
+    def test_errors(self):
+        self.app.error_rate = 1.0
+        elapsed, samples = bench.run(self.workload, {'lease-list': 1},
+                                     concurrency=2, duration=None, count=10)
+        summary = bench.summarize(elapsed, samples)
+        self.assertEqual(1.0, summary['total']['error_rate'])
+        self.assertEqual({'HTTP 503': 10}, summary['total']['error_types'])
+
+    def test_rate(self):
+        elapsed, samples = bench.run(self.workload, {'host-list': 1},
+                                     concurrency=4, rate=100.0,
+                                     duration=None, count=10)
+        self.assertEqual(10, len(samples))
+        # The last request is due 90 ms after the start.
+        self.assertGreaterEqual(elapsed, 0.09)
+
+    def test_duration(self):
+        elapsed, samples = bench.run(self.workload, {'host-list': 1},
+                                     concurrency=1, rate=50.0, duration=0.1)
+        # At most the requests due at 0, 20, 40, 60 and 80 ms are sent.
+        self.assertIn(len(samples), range(1, 6))
+
+    def test_summarize(self):
+        samples = [('lease-list', i / 100.0, None) for i in range(1, 101)]
+        samples.append(('lease-show', 2.0, 'HTTP 404'))
+        summary = bench.summarize(10.0, samples)
+        stats = summary['operations']['lease-list']
+        self.assertEqual(100, stats['requests'])
+        self.assertEqual(10.0, stats['throughput'])
+        self.assertEqual(0.0, stats['error_rate'])
+        self.assertEqual((0.5, 0.95, 0.99, 1.0),
+                         tuple(stats['latency'][key]
+                               for key in ('p50', 'p95', 'p99', 'max')))
+        self.assertEqual(101, summary['total']['requests'])
+        self.assertEqual(1, summary['total']['errors'])
+        self.assertEqual({'HTTP 404': 1}, summary['total']['error_types'])
+
+        stream = io.StringIO()
+        bench.report(summary, stream)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(['operation', 'lease-list', 'lease-show', 'total',
+                          'errors:'], [line.split()[0] for line in lines])
+
+    def test_metadata(self):
+        metadata = bench.metadata(size=10)
+        self.assertEqual(10, metadata['size'])
+        self.assertEqual(version.__version__, metadata['blazarclient'])
+        self.assertIn('python', metadata)
+
+    def test_main_self_test(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            with mock.patch('sys.stdout', new_callable=io.StringIO) as out:
+                self.assertEqual(0, bench.main(
+                    ['--self-test', '--self-test-size', '10',
+                     '--requests', '20', '--mix', 'lease-list,lease-show',
+                     '--output', path]))
+            with open(path) as f:
+                results = jsonutils.loads(f.read())
+        self.assertIn('lease-list', out.getvalue())
+        self.assertEqual(bench.RESULTS_FORMAT, results['format'])
+        self.assertEqual(20, results['results']['total']['requests'])
+        self.assertEqual(0, results['results']['total']['errors'])
@@ -13,11 +13,16 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import argparse
 from unittest import mock
 
+from cliff.formatters import table
+from stevedore import extension
 import testtools
 
 from blazarclient import command
+from blazarclient import exception
+from blazarclient import formatters
 from blazarclient import tests
 
 
@@ -91,6 +96,40 @@ class BlazarCommandTestCase(tests.TestCase):
 
         self.assertEqual(data_after, data_before)
 
+    def test_format_output_data_literal_strings(self):
+        data_before = {'key_dict': "{'key': 'value'}",
+                       'key_list': " ['1', {'a': 1}]",
+                       'key_none': 'None',
+                       'key_int': '42',
+                       'key_date': '2020-07-24 20:00',
+                       'key_invalid': '[not a literal',
+                       'key_unhashable': '{[1]: 2}'}
+        data_after = {'key_dict': '{"key": "value"}',
+                      'key_list': '1\n{"a": 1}',
+                      'key_none': '',
+                      'key_int': '42',
+                      'key_date': '2020-07-24 20:00',
+                      'key_invalid': '[not a literal',
+                      'key_unhashable': '{[1]: 2}'}
+
+        self.command.format_output_data(data_before)
+
+        self.assertEqual(data_after, data_before)
+
+    @mock.patch('ast.literal_eval')
+    def test_format_output_data_skips_plain_strings(self, literal_eval):
+        self.command.format_output_data({'name': 'lease-1',
+                                         'start_date': '2020-07-24 20:00'})
+        literal_eval.assert_not_called()
+
+    def test_format_output_data_indent(self):
+        self.command.json_indent = 4
+        data = {'key_dict': {'key': 'value'}}
+
+        self.command.format_output_data(data)
+
+        self.assertEqual('{\n    "key": "value"\n}', data['key_dict'])
+
 
 class CreateCommandTestCase(tests.TestCase):
     def setUp(self):
@@ -129,13 +168,94 @@ class DeleteCommandTestCase(tests.TestCase):
         self.delete_command = command.DeleteCommand(self.app, [])
 
 
-@testtools.skip("Under construction")
 class ListCommandTestCase(tests.TestCase):
     def setUp(self):
         super(ListCommandTestCase, self).setUp()
 
         self.app = mock.MagicMock()
         self.list_command = command.ListCommand(self.app, [])
+        self.list_command.list_columns = ['id', 'name']
+        self.list_command.resource = 'lease'
+
+    def test_setup_columns_from_iterator(self):
+        consumed = []
+
+        def records():
+            for i in range(3):
+                consumed.append(i)
+                yield {'id': str(i), 'name': 'lease-%d' % i, 'extra': i}
+
+        args = argparse.Namespace(columns=[])
+        columns, rows = self.list_command.setup_columns(records(), args)
+
+        self.assertEqual(['id', 'name'], columns)
+        self.assertEqual([0], consumed)
+        self.assertEqual([('0', 'lease-0'), ('1', 'lease-1'),
+                          ('2', 'lease-2')], list(rows))
+
+    def test_setup_columns_empty(self):
+        args = argparse.Namespace(columns=['id'])
+        columns, rows = self.list_command.setup_columns(iter([]), args)
+
+        self.assertEqual([], columns)
+        self.assertEqual([], args.columns)
+        self.assertEqual([], list(rows))
+
+    def test_retrieve_list_stream(self):
+        client = self.app.client_manager.reservation
+        client.lease.list_iter.return_value = iter([{'id': '1'}])
+        args = argparse.Namespace(sort_by='name', stream=True, page_size=10)
+
+        data = self.list_command.retrieve_list(args)
+
+        self.assertEqual([{'id': '1'}], list(data))
+        client.lease.list_iter.assert_called_once_with(page_size=10)
+        client.lease.list.assert_not_called()
+
+    def test_retrieve_list_limit(self):
+        client = self.app.client_manager.reservation
+        client.lease.list.return_value = [
+            {'id': str(i), 'name': 'lease-%d' % (i % 3)} for i in range(6)]
+        args = argparse.Namespace(sort_by='name:desc,id', limit=3)
+
+        data = self.list_command.retrieve_list(args)
+
+        self.assertEqual(['2', '5', '1'], [lease['id'] for lease in data])
+        client.lease.list.assert_called_once_with()
+
+    def test_retrieve_list_limit_stream(self):
+        client = self.app.client_manager.reservation
+        client.lease.list_iter.return_value = iter(
+            [{'id': str(i)} for i in range(6)])
+        args = argparse.Namespace(sort_by=None, stream=True, page_size=2,
+                                  limit=3)
+
+        data = self.list_command.retrieve_list(args)
+
+        self.assertEqual([{'id': '0'}, {'id': '1'}, {'id': '2'}], list(data))
+
+    def test_formatters(self):
+        list_command = command.ListCommand(self.app, [])
+
+        self.assertEqual(['csv', 'json', 'ndjson', 'stream-table', 'table',
+                          'value', 'yaml'],
+                         sorted(list_command._formatter_plugins.names()))
+        self.assertIsInstance(
+            list_command._formatter_plugins['stream-table'].obj,
+            formatters.StreamingTableFormatter)
+        self.assertIsInstance(list_command._formatter_plugins['table'].obj,
+                              table.TableFormatter)
+
+        # Other cliff applications do not offer the blazarclient formatters.
+        cliff_formatters = extension.ExtensionManager('cliff.formatter.list')
+        self.assertNotIn('stream-table', cliff_formatters.names())
+        self.assertNotIn('ndjson', cliff_formatters.names())
+
+    def test_args2body_invalid_sort_key(self):
+        args = argparse.Namespace(sort_by='name,unknown:desc')
+
+        self.assertRaises(exception.BlazarClientException,
+                          self.list_command.args2body, args)
 
 
 @testtools.skip("Under construction")
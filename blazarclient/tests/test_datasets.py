@@ -0,0 +1,119 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import io
+import os
+import tempfile
+
+from blazarclient import planning
+from blazarclient.testing import datasets
+from blazarclient.testing import fake_server
+from blazarclient import tests
+from blazarclient.v1.shell_commands import leases as lease_commands
+
+START = datetime.datetime(2030, 1, 1)
+
+
+class DatasetsTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(DatasetsTestCase, self).setUp()
+        self.dataset = datasets.generate(hosts=20, leases=300,
+                                         floatingips=5, start=START)
+
+    def test_sizes(self):
+        self.assertEqual(
+            {'hosts': 20, 'leases': 300, 'allocations': 20,
+             'floatingips': 5},
+            {name: len(resources)
+             for name, resources in self.dataset.items()})
+        self.assertEqual(
+            set(datasets.RESERVATION_TYPE_WEIGHTS),
+            {reservation['resource_type']
+             for lease in self.dataset['leases']
+             for reservation in lease['reservations']})
+
+    def test_deterministic(self):
+        self.assertEqual(self.dataset, datasets.generate(
+            hosts=20, leases=300, floatingips=5, start=START))
+        self.assertNotEqual(self.dataset, datasets.generate(
+            hosts=20, leases=300, floatingips=5, start=START, seed=1))
+
+    def test_reservations_have_create_keys(self):
+        for lease in self.dataset['leases']:
+            for reservation in lease['reservations']:
+                keys = lease_commands.CREATE_RESERVATION_KEYS[
+                    reservation['resource_type']]
+                self.assertLessEqual(
+                    {k for k, v in keys.items() if v is not None},
+                    set(reservation))
+
+    def test_allocations_are_consistent(self):
+        hosts = {host['id']: host for host in self.dataset['hosts']}
+        leases = {lease['id']: lease for lease in self.dataset['leases']}
+        reservations = {r['id']: r for lease in leases.values()
+                        for r in lease['reservations']}
+        counts = {}
+        for allocation in self.dataset['allocations']:
+            host = hosts[allocation['resource_id']]
+            windows = sorted((r['start_date'], r['end_date'])
+                             for r in allocation['reservations'])
+            for previous, following in zip(windows, windows[1:]):
+                self.assertLessEqual(previous[1], following[0])
+            for allocated in allocation['reservations']:
+                lease = leases[allocated['lease_id']]
+                self.assertEqual((lease['start_date'], lease['end_date']),
+                                 (allocated['start_date'],
+                                  allocated['end_date']))
+                reservation = reservations[allocated['id']]
+                self.assertTrue(planning.match_properties(
+                    host, reservation['resource_properties']))
+                counts[allocated['id']] = counts.get(allocated['id'], 0) + 1
+        for reservation in reservations.values():
+            if reservation['resource_type'] == 'physical:host':
+                self.assertEqual(reservation['max'],
+                                 counts.get(reservation['id'], 0))
+
+    def test_statuses(self):
+        for lease in self.dataset['leases']:
+            if lease['end_date'] <= START.isoformat():
+                self.assertEqual('TERMINATED', lease['status'])
+            elif lease['start_date'] <= START.isoformat():
+                self.assertEqual('ACTIVE', lease['status'])
+            else:
+                self.assertEqual('PENDING', lease['status'])
+
+    def test_without_hosts(self):
+        dataset = datasets.generate(hosts=0, leases=10, start=START)
+        self.assertNotIn('physical:host',
+                         {reservation['resource_type']
+                          for lease in dataset['leases']
+                          for reservation in lease['reservations']})
+
+    def test_dump_and_load(self):
+        stream = io.StringIO()
+        datasets.dump(self.dataset, stream)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'dataset.json')
+            with open(path, 'w') as f:
+                f.write(stream.getvalue())
+            self.assertEqual(self.dataset, datasets.load(path))
+
+    def test_load_into_fake_server(self):
+        app = fake_server.FakeBlazar()
+        app.load(self.dataset)
+        self.assertEqual(300, len(app.leases))
+        code, body = app._list_allocations({}, None)
+        self.assertEqual(self.dataset['allocations'], body['allocations'])
+        code, body = app._create_host({}, {'name': 'new'})
+        self.assertEqual('21', body['host']['id'])
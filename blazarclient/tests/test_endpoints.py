@@ -0,0 +1,204 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import socket
+import tempfile
+from unittest import mock
+
+from keystoneauth1 import exceptions as ks_exceptions
+from keystoneauth1 import plugin
+from keystoneauth1 import session
+
+from blazarclient import endpoints
+from blazarclient import mirror
+from blazarclient.osc import plugin as osc_plugin
+from blazarclient.testing import fake_server
+from blazarclient import tests
+from blazarclient.v1 import client
+
+
+class CatalogAuth(plugin.BaseAuthPlugin):
+    """Authentication counting the endpoint lookups in its catalog."""
+
+    auth_url = 'http://keystone/v3'
+
+    def __init__(self, url):
+        super(CatalogAuth, self).__init__()
+        self.url = url
+        self.lookups = 0
+
+    def get_token(self, session, **kwargs):
+        return 'token'
+
+    def get_endpoint(self, session, **kwargs):
+        self.lookups += 1
+        return self.url
+
+
+class EndpointCacheTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(EndpointCacheTestCase, self).setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'endpoints.json')
+        self.key = ('http://keystone/v3', 'RegionOne', 'public',
+                    'reservation', '1')
+
+    def test_make_key(self):
+        sess = session.Session(auth=CatalogAuth('http://blazar'))
+        self.assertEqual(self.key, endpoints.make_key(
+            sess, 'reservation', 'public', 'RegionOne', '1'))
+        self.assertEqual(
+            ('http://keystone/v3', '', 'internal,public', 'reservation', ''),
+            endpoints.make_key(sess, 'reservation', ['internal', 'public']))
+        self.assertIsNone(endpoints.make_key(session.Session(),
+                                             'reservation'))
+
+    def test_resolve(self):
+        cache = endpoints.EndpointCache()
+        resolver = mock.Mock(return_value='http://blazar/v1')
+        self.assertEqual('http://blazar/v1', cache.resolve(self.key, resolver))
+        self.assertEqual('http://blazar/v1', cache.resolve(self.key, resolver))
+        resolver.assert_called_once_with()
+
+        # Keys without an auth URL and empty endpoints are not cached.
+        cache.resolve(None, resolver)
+        self.assertEqual(2, resolver.call_count)
+        cache.resolve(self.key[:-1], mock.Mock(return_value=None))
+        self.assertIsNone(cache.get(self.key[:-1]))
+
+    def test_ttl(self):
+        cache = endpoints.EndpointCache(ttl=10)
+        with mock.patch('time.time', return_value=1000.0):
+            cache.set(self.key, 'http://blazar/v1')
+        with mock.patch('time.time', return_value=1009.0):
+            self.assertEqual('http://blazar/v1', cache.get(self.key))
+        with mock.patch('time.time', return_value=1010.0):
+            self.assertIsNone(cache.get(self.key))
+
+        cache = endpoints.EndpointCache(ttl=0)
+        resolver = mock.Mock(return_value='http://blazar/v1')
+        cache.resolve(self.key, resolver)
+        cache.resolve(self.key, resolver)
+        self.assertEqual(2, resolver.call_count)
+
+    def test_file(self):
+        endpoints.EndpointCache(path=self.path).set(self.key,
+                                                    'http://blazar/v1')
+        self.assertEqual(0o600, os.stat(self.path).st_mode & 0o777)
+
+        cache = endpoints.EndpointCache(path=self.path)
+        self.assertEqual('http://blazar/v1', cache.get(self.key))
+        cache.invalidate(self.key)
+        self.assertIsNone(endpoints.EndpointCache(path=self.path).get(
+            self.key))
+
+        with open(self.path, 'w') as f:
+            f.write('not json')
+        self.assertIsNone(cache.get(self.key))
+        cache.set(self.key, 'http://blazar/v1')
+        self.assertEqual('http://blazar/v1', endpoints.EndpointCache(
+            path=self.path).get(self.key))
+
+    @mock.patch.dict(os.environ, {'BLAZAR_ENDPOINT_CACHE_TTL': '60'})
+    def test_default_cache(self):
+        os.environ['BLAZAR_ENDPOINT_CACHE'] = self.path
+        with mock.patch.object(endpoints, '_default_cache', None):
+            cache = endpoints.default_cache()
+            self.assertIs(cache, endpoints.default_cache())
+        self.assertEqual(60, cache.ttl)
+        self.assertEqual(self.path, cache.path)
+
+
+class SessionClientEndpointTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(SessionClientEndpointTestCase, self).setUp()
+        self.app = fake_server.FakeBlazar()
+        server = fake_server.serve(self.app)
+        self.url = server.__enter__()
+        self.addCleanup(server.__exit__, None, None, None)
+        self.auth = CatalogAuth(self.url)
+        self.session = session.Session(auth=self.auth)
+
+    def test_cached_across_clients(self):
+        cache = endpoints.EndpointCache()
+        for i in range(3):
+            blazar_client = client.Client(session=self.session,
+                                          endpoint_cache=cache)
+            blazar_client.lease.list()
+            blazar_client.host.list()
+        self.assertEqual(1, self.auth.lookups)
+
+    def test_without_cache(self):
+        cache = endpoints.EndpointCache(ttl=0)
+        for i in range(3):
+            client.Client(session=self.session,
+                          endpoint_cache=cache).lease.list()
+        self.assertEqual(3, self.auth.lookups)
+
+    def test_endpoint_override(self):
+        blazar_client = client.Client(session=self.session,
+                                      endpoint_override=self.url,
+                                      endpoint_cache=endpoints.EndpointCache())
+        blazar_client.lease.list()
+        self.assertEqual(0, self.auth.lookups)
+
+    def test_endpoint_override_unchanged(self):
+        blazar_client = client.Client(session=self.session,
+                                      endpoint_cache=endpoints.EndpointCache())
+        source = mirror.source(blazar_client)
+        with mirror.Mirror(':memory:') as local:
+            local.sync(blazar_client)
+            # The cached endpoint does not change the source of the client.
+            self.assertIsNone(
+                blazar_client.lease.request_manager.endpoint_override)
+            self.assertEqual(source, mirror.source(blazar_client))
+            local.sync(blazar_client)
+        self.assertEqual(1, self.auth.lookups)
+
+    def test_invalidated_on_connect_failure(self):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            closed_url = 'http://127.0.0.1:%d' % s.getsockname()[1]
+        cache = endpoints.EndpointCache()
+        blazar_client = client.Client(session=self.session,
+                                      endpoint_cache=cache)
+        manager = blazar_client.lease.request_manager
+        key = endpoints.make_key(self.session, manager.service_type,
+                                 manager.interface, manager.region_name,
+                                 manager.version)
+        cache.set(key, closed_url)
+
+        self.assertRaises(ks_exceptions.ConnectFailure,
+                          blazar_client.lease.list)
+        self.assertIsNone(cache.get(key))
+        self.assertEqual([], blazar_client.lease.list())
+        self.assertEqual(self.url, cache.get(key))
+
+    def test_osc_plugin(self):
+        instance = mock.Mock()
+        instance._api_version = {'reservation': '1'}
+        instance.session = self.session
+        instance.interface = 'public'
+        instance._region_name = 'RegionOne'
+        instance.get_endpoint_for_service_type.return_value = self.url
+        with mock.patch.object(endpoints, '_default_cache',
+                               endpoints.EndpointCache()):
+            for i in range(3):
+                blazar_client = osc_plugin.make_client(instance)
+        instance.get_endpoint_for_service_type.assert_called_once_with(
+            'reservation', interface='public', region_name='RegionOne')
+        self.assertEqual(self.url,
+                         blazar_client.lease.request_manager.endpoint_override)
@@ -0,0 +1,180 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+from blazarclient import exception
+from blazarclient.testing import fake_server
+from blazarclient import tests
+from blazarclient.v1 import client
+
+
+class FakeBlazarTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(FakeBlazarTestCase, self).setUp()
+        self.app = fake_server.FakeBlazar()
+        server = fake_server.serve(self.app)
+        url = server.__enter__()
+        self.addCleanup(server.__exit__, None, None, None)
+        self.client = client.Client(blazar_url=url, auth_token='token')
+
+    def _create_lease(self, name='lease', count=1, start='2030-01-01 00:00',
+                      end='2030-01-02 00:00', properties=''):
+        return self.client.lease.create(
+            name, start, end,
+            [{'resource_type': 'physical:host', 'min': count, 'max': count,
+              'hypervisor_properties': '',
+              'resource_properties': properties}], [])
+
+    def test_host_crud(self):
+        host = self.client.host.create('compute-1', gpu='True')
+        self.assertEqual('compute-1', host['hypervisor_hostname'])
+        self.assertEqual('True', host['gpu'])
+
+        self.client.host.update(host['id'], {'rack': 'r1'})
+        self.assertEqual('r1', self.client.host.get(host['id'])['rack'])
+        self.assertEqual([host['id']],
+                         [h['id'] for h in self.client.host.list()])
+
+        self.client.host.delete(host['id'])
+        self.assertEqual([], self.client.host.list())
+        self.assertRaises(exception.BlazarClientException,
+                          self.client.host.get, host['id'])
+
+    def test_host_properties(self):
+        self.client.host.create('compute-1', gpu='True')
+        self.client.host.create('compute-2', gpu='False')
+        self.client.host.set_property('gpu', private=True)
+
+        properties = self.client.host.list_properties(detail=True, all=True)
+        self.assertEqual([{'property': 'gpu', 'private': True,
+                           'property_values': ['False', 'True']}],
+                         properties)
+        self.assertEqual([], self.client.host.list_properties())
+
+    def test_lease_allocates_matching_hosts(self):
+        hosts = [self.client.host.create('compute-1', gpu='True'),
+                 self.client.host.create('compute-2', gpu='True'),
+                 self.client.host.create('compute-3', gpu='False')]
+        first = self._create_lease(properties='["==", "$gpu", "True"]')
+        self.assertEqual('2030-01-01T00:00:00.000000', first['start_date'])
+
+        second = self._create_lease(properties='["==", "$gpu", "True"]')
+        allocations = self.client.allocation.list('os-hosts')
+        self.assertEqual(
+            {hosts[0]['id']: [first['id']], hosts[1]['id']: [second['id']],
+             hosts[2]['id']: []},
+            {a['resource_id']: [r['lease_id'] for r in a['reservations']]
+             for a in allocations})
+
+        error = self.assertRaises(exception.BlazarClientException,
+                                  self._create_lease,
+                                  properties='["==", "$gpu", "True"]')
+        self.assertEqual(409, error.kwargs['code'])
+
+        # Hosts are free again after the lease window.
+        self._create_lease(start='2030-01-02 00:00', end='2030-01-03 00:00',
+                           properties='["==", "$gpu", "True"]')
+
+    def test_lease_update_and_delete(self):
+        self.client.host.create('compute-1')
+        lease = self._create_lease()
+
+        updated = self.client.lease.update(lease['id'], name='renamed',
+                                           prolong_for='1d')
+        self.assertEqual('renamed', updated['name'])
+        self.assertEqual('2030-01-03T00:00:00.000000', updated['end_date'])
+
+        self.client.lease.delete(lease['id'])
+        self.assertEqual([], self.client.lease.list())
+        self.assertEqual([], self.client.allocation.list('os-hosts')[0][
+            'reservations'])
+
+    def test_lease_allocation_follows_updates(self):
+        self.client.host.create('compute-1')
+        lease = self._create_lease()
+        self.client.lease.update(lease['id'], prolong_for='1d')
+        error = self.assertRaises(exception.BlazarClientException,
+                                  self._create_lease,
+                                  start='2030-01-02 00:00',
+                                  end='2030-01-03 00:00')
+        self.assertEqual(409, error.kwargs['code'])
+
+        self.client.lease.delete(lease['id'])
+        self._create_lease(start='2030-01-02 00:00', end='2030-01-03 00:00')
+        self.assertEqual({}, {
+            reservation_id: lease_id for reservation_id, lease_id
+            in self.app._reservation_leases.items()
+            if lease_id not in self.app.leases})
+
+    def test_lease_list_name_prefix_null_names(self):
+        self.client.host.create('compute-1')
+        named = self._create_lease(name='class-a')
+        self.app.load({'leases': [
+            {'id': 'unnamed', 'name': None, 'reservations': []},
+            {'id': 'nameless', 'reservations': []}]})
+        self.assertEqual(
+            [named['id']],
+            [lease['id'] for lease in self.client.lease.list(
+                name_prefix='class')])
+
+    def test_lease_list_filters_and_pages(self):
+        self.app.populate(hosts=10, leases=25)
+        leases = self.client.lease.list()
+        self.assertEqual(25, len(leases))
+        self.assertEqual(
+            [lease['id'] for lease in leases],
+            [lease['id'] for lease in self.client.lease.list_iter(
+                page_size=7)])
+
+        window_start = datetime.datetime.utcnow() + datetime.timedelta(
+            days=10)
+        window_end = window_start + datetime.timedelta(days=1)
+        overlapping = self.client.lease.list(overlap_start=window_start,
+                                             overlap_end=window_end)
+        self.assertEqual(
+            sorted(lease['id'] for lease in leases
+                   if lease['start_date'] < window_end.isoformat() and
+                   lease['end_date'] > window_start.isoformat()),
+            sorted(lease['id'] for lease in overlapping))
+
+    def test_floatingips(self):
+        floatingip = self.client.floatingip.create('public', '172.24.4.10')
+        self.assertEqual(floatingip,
+                         self.client.floatingip.get(floatingip['id']))
+        self.assertEqual([floatingip], self.client.floatingip.list())
+        self.client.floatingip.delete(floatingip['id'])
+        self.assertEqual([], self.client.floatingip.list())
+
+    def test_populate_is_deterministic(self):
+        other = fake_server.FakeBlazar()
+        self.app.populate(hosts=5, leases=5, floatingips=3, seed=1)
+        other.populate(hosts=5, leases=5, floatingips=3, seed=1)
+        self.assertEqual(
+            [host['gpu'] for host in self.app.hosts.values()],
+            [host['gpu'] for host in other.hosts.values()])
+        self.assertEqual(5, len(self.client.allocation.list('os-hosts')))
+        self.assertEqual(3, len(self.client.floatingip.list()))
+
+    def test_injected_errors(self):
+        self.app.error_rate = 1.0
+        error = self.assertRaises(exception.BlazarClientException,
+                                  self.client.lease.list)
+        self.assertEqual(503, error.kwargs['code'])
+        self.assertEqual(1, self.app.request_count)
+
+    def test_unknown_route(self):
+        error = self.assertRaises(exception.BlazarClientException,
+                                  self.client.lease.request_manager.get,
+                                  '/unknown')
+        self.assertEqual(404, error.kwargs['code'])
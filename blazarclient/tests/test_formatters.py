@@ -0,0 +1,153 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+import io
+
+from blazarclient import exception
+from blazarclient import formatters
+from blazarclient import tests
+
+
+class StreamingTableFormatterTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(StreamingTableFormatterTestCase, self).setUp()
+        self.formatter = formatters.StreamingTableFormatter()
+        self.stdout = io.StringIO()
+
+    def _args(self, sample_rows=formatters.DEFAULT_SAMPLE_ROWS,
+              column_widths=None):
+        return argparse.Namespace(sample_rows=sample_rows,
+                                  column_widths=column_widths or [])
+
+    def test_emit_list(self):
+        data = [('1', 'host-1', 16), ('22', 'h2', 4)]
+
+        self.formatter.emit_list(['id', 'name', 'vcpus'], data, self.stdout,
+                                 self._args())
+
+        self.assertEqual(
+            '+----+--------+-------+\n'
+            '| id | name   | vcpus |\n'
+            '+----+--------+-------+\n'
+            '| 1  | host-1 |    16 |\n'
+            '| 22 | h2     |     4 |\n'
+            '+----+--------+-------+\n',
+            self.stdout.getvalue())
+
+    def test_emit_list_aligns_numbers_after_none(self):
+        data = [('1', None), ('2', 16), ('3', 4)]
+
+        self.formatter.emit_list(['id', 'vcpus'], data, self.stdout,
+                                 self._args())
+
+        self.assertEqual(
+            '+----+-------+\n'
+            '| id | vcpus |\n'
+            '+----+-------+\n'
+            '| 1  |  None |\n'
+            '| 2  |    16 |\n'
+            '| 3  |     4 |\n'
+            '+----+-------+\n',
+            self.stdout.getvalue())
+
+    def test_emit_list_wraps_rows_after_sample(self):
+        data = [('1', 'a'), ('2', 'abcdef'), ('3', 'x\ny')]
+
+        self.formatter.emit_list(['id', 'name'], data, self.stdout,
+                                 self._args(sample_rows=1))
+
+        self.assertEqual(
+            '+----+------+\n'
+            '| id | name |\n'
+            '+----+------+\n'
+            '| 1  | a    |\n'
+            '| 2  | abcd |\n'
+            '|    | ef   |\n'
+            '| 3  | x    |\n'
+            '|    | y    |\n'
+            '+----+------+\n',
+            self.stdout.getvalue())
+
+    def test_emit_list_declared_widths(self):
+        self.formatter.emit_list(['id', 'name'], [('1', 'abc')], self.stdout,
+                                 self._args(column_widths=['name=2']))
+
+        self.assertEqual(
+            '+----+----+\n'
+            '| id | na |\n'
+            '|    | me |\n'
+            '+----+----+\n'
+            '| 1  | ab |\n'
+            '|    | c  |\n'
+            '+----+----+\n',
+            self.stdout.getvalue())
+
+    def test_emit_list_consumes_data_lazily(self):
+        def rows():
+            for i in range(5):
+                self.assertLess(len(self.stdout.getvalue().splitlines()),
+                                i + 4)
+                yield (str(i),)
+
+        self.formatter.emit_list(['id'], rows(), self.stdout,
+                                 self._args(sample_rows=1))
+
+        self.assertEqual(9, len(self.stdout.getvalue().splitlines()))
+
+    def test_emit_list_empty(self):
+        self.formatter.emit_list(['id'], [], self.stdout, self._args())
+
+        self.assertEqual('\n', self.stdout.getvalue())
+
+    def test_emit_list_invalid_width(self):
+        self.assertRaises(exception.BlazarClientException,
+                          self.formatter.emit_list, ['id'], [('1',)],
+                          self.stdout, self._args(column_widths=['id=x']))
+
+
+class NDJSONFormatterTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(NDJSONFormatterTestCase, self).setUp()
+        self.formatter = formatters.NDJSONFormatter()
+        self.stdout = io.StringIO()
+
+    def test_emit_list(self):
+        data = [('1', 'lease-1', [{'id': 'r1'}]), ('2', None, [])]
+
+        self.formatter.emit_list(['id', 'name', 'reservations'], data,
+                                 self.stdout, argparse.Namespace())
+
+        self.assertEqual(
+            '{"id": "1", "name": "lease-1", "reservations": [{"id": "r1"}]}\n'
+            '{"id": "2", "name": null, "reservations": []}\n',
+            self.stdout.getvalue())
+
+    def test_emit_list_writes_each_row_when_produced(self):
+        def rows():
+            for i in range(3):
+                self.assertEqual(i, self.stdout.getvalue().count('\n'))
+                yield (i,)
+
+        self.formatter.emit_list(['id'], rows(), self.stdout,
+                                 argparse.Namespace())
+
+        self.assertEqual('{"id": 0}\n{"id": 1}\n{"id": 2}\n',
+                         self.stdout.getvalue())
+
+    def test_emit_list_empty(self):
+        self.formatter.emit_list(['id'], [], self.stdout,
+                                 argparse.Namespace())
+
+        self.assertEqual('', self.stdout.getvalue())
@@ -0,0 +1,213 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from unittest import mock
+
+import fixtures
+from keystoneauth1 import session
+from keystoneauth1 import token_endpoint
+
+from blazarclient import exception
+from blazarclient import mirror
+from blazarclient import tests
+from blazarclient.v1 import client as blazar_client
+
+LEASES = [
+    {'id': 'l1', 'name': 'class-a', 'status': 'ACTIVE', 'project_id': 'p1',
+     'user_id': 'u1', 'start_date': '2026-01-01T00:00:00.000000',
+     'end_date': '2026-01-08T00:00:00.000000',
+     'created_at': '2025-12-01 10:00:00', 'updated_at': None},
+    {'id': 'l2', 'name': 'class-b', 'status': 'PENDING', 'project_id': 'p2',
+     'user_id': 'u1', 'start_date': '2026-02-01T00:00:00.000000',
+     'end_date': '2026-02-08T00:00:00.000000',
+     'created_at': '2025-12-02 10:00:00', 'updated_at': None},
+    {'id': 'l3', 'name': 'other', 'status': 'ACTIVE', 'project_id': 'p1',
+     'user_id': 'u2', 'start_date': '2026-01-05T00:00:00.000000',
+     'end_date': '2026-03-01T00:00:00.000000',
+     'created_at': '2025-12-03 10:00:00', 'updated_at': None},
+]
+HOSTS = [
+    {'id': 1, 'hypervisor_hostname': 'compute-1',
+     'created_at': '2025-01-01 00:00:00', 'updated_at': None},
+    {'id': 2, 'hypervisor_hostname': 'compute-2',
+     'created_at': '2025-01-01 00:00:00', 'updated_at': None},
+]
+ALLOCATIONS = [
+    {'resource_id': 1, 'reservations': [
+        {'id': 'r1', 'lease_id': 'l1',
+         'start_date': '2026-01-01T00:00:00.000000',
+         'end_date': '2026-01-08T00:00:00.000000'},
+        {'id': 'r3', 'lease_id': 'l3',
+         'start_date': '2026-01-05T00:00:00.000000',
+         'end_date': '2026-03-01T00:00:00.000000'}]},
+    {'resource_id': 2, 'reservations': [
+        {'id': 'r2', 'lease_id': 'l2',
+         'start_date': '2026-02-01T00:00:00.000000',
+         'end_date': '2026-02-08T00:00:00.000000'}]},
+]
+
+
+def _client(leases=LEASES, hosts=HOSTS, allocations=ALLOCATIONS,
+            source=None):
+    client = mock.Mock()
+    if source is not None:
+        client.lease.request_manager = blazar_client.Client(
+            blazar_url=source, auth_token='token').lease.request_manager
+    client.lease.list_iter.side_effect = lambda **kw: iter(leases)
+    client.host.list_iter.side_effect = lambda **kw: iter(hosts)
+    client.allocation.list_iter.side_effect = (
+        lambda resource, **kw: iter(allocations))
+    return client
+
+
+class MirrorSyncTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(MirrorSyncTestCase, self).setUp()
+        self.mirror = mirror.Mirror(':memory:')
+        self.addCleanup(self.mirror.close)
+
+    def test_sync(self):
+        client = _client()
+
+        stats = self.mirror.sync(client, page_size=10)
+
+        self.assertEqual({'added': 3, 'updated': 0, 'deleted': 0,
+                          'unchanged': 0}, stats['lease'])
+        self.assertEqual(2, stats['host']['added'])
+        self.assertEqual(2, stats['allocation']['added'])
+        client.lease.list_iter.assert_called_once_with(page_size=10)
+        client.allocation.list_iter.assert_called_once_with(
+            'os-hosts', page_size=10)
+
+    def test_sync_incremental(self):
+        self.mirror.sync(_client())
+        leases = [dict(LEASES[0], updated_at='2026-01-02 00:00:00',
+                       status='TERMINATED'), LEASES[1]]
+        allocations = [ALLOCATIONS[0]]
+
+        stats = self.mirror.sync(
+            _client(leases=leases, allocations=allocations))
+
+        self.assertEqual({'added': 0, 'updated': 1, 'deleted': 1,
+                          'unchanged': 1}, stats['lease'])
+        self.assertEqual({'added': 0, 'updated': 0, 'deleted': 0,
+                          'unchanged': 2}, stats['host'])
+        self.assertEqual({'added': 0, 'updated': 0, 'deleted': 1,
+                          'unchanged': 1}, stats['allocation'])
+        self.assertEqual('TERMINATED', self.mirror.lease.get('l1')['status'])
+        self.assertEqual([], self.mirror.allocation.list(
+            'os-hosts', reservation_id='r2'))
+
+    def test_sync_collections(self):
+        client = _client()
+
+        stats = self.mirror.sync(client, collections=['host'])
+
+        self.assertEqual(['host'], list(stats))
+        client.lease.list_iter.assert_not_called()
+
+
+class MirrorManagersTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(MirrorManagersTestCase, self).setUp()
+        self.mirror = mirror.Mirror(':memory:')
+        self.addCleanup(self.mirror.close)
+        self.mirror.sync(_client())
+
+    def _ids(self, records):
+        return [record['id'] for record in records]
+
+    def test_lease_list(self):
+        self.assertEqual(LEASES, self.mirror.lease.list())
+        self.assertEqual(['l1', 'l3', 'l2'], self._ids(
+            self.mirror.lease.list(sort_by='status')))
+
+    def test_lease_list_filters(self):
+        lease = self.mirror.lease
+        self.assertEqual(['l1', 'l3'], self._ids(lease.list(status='active')))
+        self.assertEqual(['l3'], self._ids(lease.list(project_id='p1',
+                                                      user_id='u2')))
+        self.assertEqual(['l1', 'l2'], self._ids(
+            lease.list(name_prefix='class')))
+        self.assertEqual([], self._ids(lease.list(name_prefix='CLASS')))
+        self.assertEqual(['l2', 'l3'], self._ids(lease.list(
+            overlap_start='2026-01-10 00:00',
+            overlap_end='2026-02-02 00:00')))
+
+    def test_get(self):
+        self.assertEqual(HOSTS[1], self.mirror.host.get(2))
+        self.assertRaises(exception.BlazarClientException,
+                          self.mirror.lease.get, 'missing')
+
+    def test_allocation_list_filters(self):
+        allocation = self.mirror.allocation
+        self.assertEqual(ALLOCATIONS, allocation.list('os-hosts'))
+        self.assertEqual(
+            [{'resource_id': 1, 'reservations': [
+                ALLOCATIONS[0]['reservations'][1]]}],
+            allocation.list('os-hosts', lease_id='l3'))
+        self.assertEqual([], allocation.list('os-hosts', lease_id='l3',
+                                             reservation_id='r1'))
+
+    def test_allocation_get(self):
+        allocation = self.mirror.allocation
+        self.assertEqual(ALLOCATIONS[1], allocation.get('os-hosts', 2))
+        self.assertEqual([], allocation.get('os-hosts', 2,
+                                            lease_id='l1')['reservations'])
+
+
+class MirrorPathTestCase(tests.TestCase):
+
+    def test_default_path(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, 'db')
+        self.useFixture(fixtures.EnvironmentVariable('BLAZAR_MIRROR', path))
+
+        local_mirror = mirror.Mirror()
+        local_mirror.close()
+
+        self.assertEqual(path, mirror.default_path())
+        self.assertTrue(os.path.exists(path))
+
+    def test_default_path_per_source(self):
+        self.useFixture(fixtures.EnvironmentVariable('BLAZAR_MIRROR'))
+        source = mirror.source(blazar_client.Client(
+            session=session.Session(auth=token_endpoint.Token(
+                'http://blazar-1', 'token')),
+            region_name='RegionOne'))
+        other = dict(source, endpoint='http://blazar-2')
+
+        self.assertEqual({'endpoint': 'http://blazar-1',
+                          'region': 'RegionOne', 'project': None}, source)
+        self.assertEqual(os.path.expanduser(mirror.DEFAULT_PATH),
+                         mirror.default_path())
+        self.assertNotEqual(mirror.default_path(source),
+                            mirror.default_path(other))
+        self.assertEqual(mirror.default_path(source),
+                         mirror.default_path(dict(source)))
+
+    def test_source_mismatch(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, 'db')
+        with mirror.Mirror(path) as local_mirror:
+            local_mirror.sync(_client(source='http://blazar-1'))
+            self.assertEqual('http://blazar-1',
+                             local_mirror.source['endpoint'])
+            self.assertRaises(exception.BlazarClientException,
+                              local_mirror.sync,
+                              _client(source='http://blazar-2'))
+
+        mirror.Mirror(path, source={'endpoint': 'http://blazar-1',
+                                    'project': None}).close()
+        self.assertRaises(exception.BlazarClientException, mirror.Mirror,
+                          path, source={'endpoint': 'http://blazar-2'})
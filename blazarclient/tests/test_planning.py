@@ -0,0 +1,162 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import random
+
+from blazarclient import exception
+from blazarclient import planning
+from blazarclient import tests
+
+HOSTS = [
+    {'id': '1', 'hypervisor_hostname': 'compute-1', 'vcpus': 16,
+     'gpu': 'True'},
+    {'id': '2', 'hypervisor_hostname': 'compute-2', 'vcpus': 32,
+     'gpu': 'False'},
+    {'id': '3', 'hypervisor_hostname': 'compute-3', 'vcpus': 64},
+]
+
+
+def _allocation(resource_id, *windows):
+    return {'resource_id': resource_id, 'reservations': [
+        {'id': '%s-%d' % (resource_id, i), 'lease_id': 'l',
+         'start_date': start, 'end_date': end}
+        for i, (start, end) in enumerate(windows)]}
+
+
+class MatchPropertiesTestCase(tests.TestCase):
+
+    def test_empty_expression(self):
+        self.assertTrue(planning.match_properties(HOSTS[0], ''))
+        self.assertTrue(planning.match_properties(HOSTS[0], None))
+
+    def test_comparisons(self):
+        host = HOSTS[1]
+        self.assertTrue(planning.match_properties(
+            host, '["==", "$gpu", "False"]'))
+        self.assertTrue(planning.match_properties(
+            host, ['=', '$hypervisor_hostname', 'compute-2']))
+        self.assertTrue(planning.match_properties(
+            host, ['>=', '$vcpus', '17']))
+        self.assertFalse(planning.match_properties(
+            host, ['<', '$vcpus', '4']))
+        self.assertFalse(planning.match_properties(
+            host, ['==', '$missing', 'value']))
+        self.assertTrue(planning.match_properties(
+            host, ['in', '$hypervisor_hostname', 'compute']))
+
+    def test_boolean_operators(self):
+        expression = ['and', ['>=', '$vcpus', '32'],
+                      ['or', ['==', '$gpu', 'True'],
+                       ['not', ['==', '$gpu', 'False']]]]
+        self.assertEqual(['3'], [h['id'] for h in HOSTS
+                                 if planning.match_properties(h, expression)])
+
+    def test_invalid_expression(self):
+        self.assertRaises(exception.BlazarClientException,
+                          planning.match_properties, HOSTS[0], '[==')
+        self.assertRaises(exception.BlazarClientException,
+                          planning.match_properties, HOSTS[0],
+                          ['~', '$vcpus', '1'])
+
+
+class EarliestSlotTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(EarliestSlotTestCase, self).setUp()
+        self.allocations = [
+            _allocation('1', ('2026-01-01 00:00', '2026-01-03 00:00')),
+            _allocation('2', ('2026-01-01 00:00', '2026-01-02 00:00'),
+                        ('2026-01-02 12:00', '2026-01-05 00:00')),
+            _allocation('3', ('2026-01-02 06:00', '2026-01-02 18:00')),
+        ]
+
+    def _slot(self, count, hours, **kwargs):
+        kwargs.setdefault('not_before', '2026-01-01 00:00')
+        return planning.earliest_slot(HOSTS, self.allocations, count,
+                                      hours * 3600, **kwargs)
+
+    def test_one_host(self):
+        start, end, hosts = self._slot(1, 6)
+        self.assertEqual(datetime.datetime(2026, 1, 1), start)
+        self.assertEqual(datetime.datetime(2026, 1, 1, 6), end)
+        self.assertEqual(['3'], hosts)
+
+    def test_gap_too_short(self):
+        # Host 2 is free for 12 hours on Jan 2 but host 3 only until
+        # 06:00, and host 1 is busy until Jan 3.
+        start, end, hosts = self._slot(2, 12)
+        self.assertEqual(datetime.datetime(2026, 1, 3), start)
+        self.assertEqual(datetime.datetime(2026, 1, 3, 12), end)
+        self.assertEqual(['1', '3'], sorted(hosts))
+
+    def test_all_hosts(self):
+        start, end, hosts = self._slot(3, 1)
+        self.assertEqual(datetime.datetime(2026, 1, 5), start)
+        self.assertEqual(['1', '2', '3'], hosts)
+
+    def test_resource_properties(self):
+        start, end, hosts = self._slot(
+            1, 1, resource_properties='["==", "$gpu", "True"]')
+        self.assertEqual(datetime.datetime(2026, 1, 3), start)
+        self.assertEqual(['1'], hosts)
+
+    def test_not_after(self):
+        self.assertIsNone(self._slot(3, 1, not_after='2026-01-04 00:00'))
+
+    def test_not_enough_hosts(self):
+        self.assertIsNone(self._slot(4, 1))
+
+    def test_rounds_to_the_minute(self):
+        start, end, hosts = self._slot(
+            1, 1, not_before=datetime.datetime(2026, 1, 1, 0, 0, 30))
+        self.assertEqual(datetime.datetime(2026, 1, 1, 0, 1), start)
+
+    def test_invalid_arguments(self):
+        self.assertRaises(exception.BlazarClientException, self._slot, 0, 1)
+        self.assertRaises(exception.BlazarClientException, self._slot, 1, 0)
+
+    def test_matches_brute_force(self):
+        rand = random.Random(7)
+        base = datetime.datetime(2026, 1, 1)
+        hosts = [{'id': str(i)} for i in range(8)]
+        allocations = []
+        for host in hosts:
+            windows = []
+            for _ in range(6):
+                start = base + datetime.timedelta(hours=rand.randint(0, 200))
+                end = start + datetime.timedelta(hours=rand.randint(1, 30))
+                windows.append((start.isoformat(), end.isoformat()))
+            allocations.append(_allocation(host['id'], *windows))
+
+        def busy(host_id, start, end):
+            for reservation in allocations[int(host_id)]['reservations']:
+                if (datetime.datetime.fromisoformat(
+                        reservation['start_date']) < end and
+                        start < datetime.datetime.fromisoformat(
+                            reservation['end_date'])):
+                    return True
+            return False
+
+        for count in range(1, 6):
+            hours = rand.randint(1, 24)
+            start, end, host_ids = planning.earliest_slot(
+                hosts, allocations, count, hours * 3600, base)
+            expected = base
+            while sum(not busy(h['id'], expected,
+                               expected + datetime.timedelta(hours=hours))
+                      for h in hosts) < count:
+                expected += datetime.timedelta(hours=1)
+            self.assertEqual(expected, start)
+            self.assertEqual(count, len(host_ids))
+            for host_id in host_ids:
+                self.assertFalse(busy(host_id, start, end))
@@ -0,0 +1,161 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import tempfile
+from unittest import mock
+
+from keystoneauth1 import session
+from keystoneauth1 import token_endpoint
+from oslo_serialization import jsonutils
+
+from blazarclient import exception
+from blazarclient import recording
+from blazarclient.testing import datasets
+from blazarclient.testing import fake_server
+from blazarclient import tests
+from blazarclient.v1 import client
+
+
+class RecordingTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(RecordingTestCase, self).setUp()
+        self.app = fake_server.FakeBlazar()
+        self.app.load(datasets.generate(hosts=5, leases=20))
+        server = fake_server.serve(self.app)
+        self.url = server.__enter__()
+        self.addCleanup(server.__exit__, None, None, None)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'recording.jsonl')
+
+    def _entries(self):
+        with open(self.path) as f:
+            return [jsonutils.loads(line) for line in f]
+
+    def _record(self, blazar_client):
+        leases = blazar_client.lease.list()
+        lease = blazar_client.lease.get(leases[0]['id'])
+        host = blazar_client.host.create('compute-new', password='secret')
+        self.assertRaises(exception.BlazarClientException,
+                          blazar_client.lease.get, 'missing')
+        return leases, lease, host
+
+    def test_record_and_replay(self):
+        recorder = recording.Recorder(self.path)
+        leases, lease, host = self._record(client.Client(
+            blazar_url=self.url, auth_token='token', recorder=recorder))
+
+        entries = self._entries()
+        self.assertEqual(
+            [('GET', '/leases'), ('GET', '/leases/%s' % lease['id']),
+             ('POST', '/os-hosts'), ('GET', '/leases/missing')],
+            [(e['method'], e['url'].partition('?')[0]) for e in entries])
+        self.assertEqual(200, entries[0]['status'])
+        self.assertEqual(404, entries[3]['status'])
+        self.assertTrue(all(e['elapsed'] > 0 for e in entries))
+
+        # Responses are replayed as recorded, that is redacted.
+        replay = client.Client(
+            replay=recording.Replay(self.path, latency='zero'))
+        self.assertEqual(recording.redact([leases, lease, host]),
+                         list(self._record(replay)))
+
+    def test_record_with_session(self):
+        recorder = recording.Recorder(self.path)
+        blazar_client = client.Client(
+            session=session.Session(
+                auth=token_endpoint.Token(self.url, 'token')),
+            recorder=recorder)
+        leases = blazar_client.lease.list()
+
+        replay = client.Client(
+            replay=recording.Replay(self.path, latency='zero'))
+        self.assertEqual(recording.redact(leases), replay.lease.list())
+
+    def test_redaction(self):
+        recorder = recording.Recorder(self.path)
+        self._record(client.Client(
+            blazar_url=self.url, auth_token='token', recorder=recorder))
+
+        with open(self.path) as f:
+            text = f.read()
+        self.assertNotIn('secret', text)
+        self.assertNotIn('token', text.replace('"auth_token"', ''))
+        for entry in self._entries():
+            self.assertNotIn('x-auth-token',
+                             [k.lower() for k in entry['headers']])
+        lease = jsonutils.loads(self._entries()[1]['body'])['lease']
+        self.assertEqual(recording.REDACTED, lease['trust_id'])
+        self.assertEqual(recording.REDACTED,
+                         self._entries()[2]['request_body']['password'])
+
+    def test_redact(self):
+        self.assertEqual(
+            {'name': 'lease', 'Password': recording.REDACTED,
+             'reservations': [{'trust_id': recording.REDACTED, 'min': 1}]},
+            recording.redact(
+                {'name': 'lease', 'Password': 'p',
+                 'reservations': [{'trust_id': 't', 'min': 1}]}))
+
+    @mock.patch('time.sleep')
+    def test_replay_latency(self, sleep):
+        client.Client(blazar_url=self.url, auth_token='token',
+                      recorder=recording.Recorder(self.path)).lease.list()
+        elapsed = self._entries()[0]['elapsed']
+
+        replay = client.Client(replay=recording.Replay(self.path))
+        replay.lease.list()
+        sleep.assert_called_once_with(elapsed)
+
+        sleep.reset_mock()
+        replay = client.Client(
+            replay=recording.Replay(self.path, latency='zero'))
+        replay.lease.list()
+        sleep.assert_not_called()
+
+    def test_replay_order(self):
+        blazar_client = client.Client(blazar_url=self.url,
+                                      auth_token='token',
+                                      recorder=recording.Recorder(self.path))
+        host = blazar_client.host.create('compute-new')
+        blazar_client.host.update(host['id'], {'rack': 'r1'})
+        blazar_client.host.get(host['id'])
+        blazar_client.host.update(host['id'], {'rack': 'r2'})
+        blazar_client.host.get(host['id'])
+
+        replay = client.Client(
+            replay=recording.Replay(self.path, latency='zero'))
+        self.assertEqual('r1', replay.host.get(host['id'])['rack'])
+        self.assertEqual('r2', replay.host.get(host['id'])['rack'])
+        # The last response is served again once they are exhausted.
+        self.assertEqual('r2', replay.host.get(host['id'])['rack'])
+
+    def test_replay_unknown_request(self):
+        with open(self.path, 'w'):
+            pass
+        replay = client.Client(
+            replay=recording.Replay(self.path, latency='zero'))
+        error = self.assertRaises(exception.BlazarClientException,
+                                  replay.lease.get, 'missing')
+        self.assertEqual(404, error.kwargs['code'])
+        self.assertIn('No recorded response to GET /leases/missing',
+                      str(error))
+
+    def test_invalid_recording(self):
+        with open(self.path, 'w') as f:
+            f.write('{"method": "GET", "url": "/leases"}\nnot json\n')
+        self.assertRaises(exception.BlazarClientException,
+                          recording.Replay, self.path)
+        self.assertRaises(exception.BlazarClientException,
+                          recording.Replay, self.path, latency='slow')
@@ -0,0 +1,134 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import pickle
+from unittest import mock
+
+from oslo_serialization import jsonutils
+
+from blazarclient import records
+from blazarclient import tests
+from blazarclient import utils
+from blazarclient.v1 import leases
+
+
+def _lease():
+    return {
+        'id': 'l1', 'name': 'lease-1', 'status': ''.join(['ACT', 'IVE']),
+        'start_date': '2026-01-01T00:00:00.000000',
+        'end_date': '2026-01-02T00:00:00+01:00',
+        'reservations': [{'id': 'r1', 'resource_type': 'physical:host',
+                          'min': 1, 'max': 2, 'custom': 'value'}],
+        'events': [{'event_type': 'start_lease'}],
+        'unknown_key': 42,
+    }
+
+
+class RecordTestCase(tests.TestCase):
+
+    def test_mapping(self):
+        lease = records.Lease(_lease())
+
+        self.assertEqual(_lease(), lease)
+        self.assertEqual(_lease(), lease.to_dict())
+        self.assertEqual(len(_lease()), len(lease))
+        self.assertEqual('lease-1', lease['name'])
+        self.assertEqual(42, lease['unknown_key'])
+        self.assertIsNone(lease.get('trust_id'))
+        self.assertNotIn('trust_id', lease)
+        self.assertRaises(KeyError, lambda: lease['trust_id'])
+
+    def test_attributes(self):
+        lease = records.Lease(_lease())
+
+        self.assertEqual('l1', lease.id)
+        self.assertEqual(42, lease.unknown_key)
+        self.assertRaises(AttributeError, getattr, lease, 'trust_id')
+        self.assertEqual(('l1', 'lease-1', 42, ''), utils.get_item_properties(
+            lease, ['id', 'name', 'unknown_key', 'trust_id']))
+
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(records.Lease(_lease()), '__dict__'))
+
+    def test_set_and_delete(self):
+        lease = records.Lease(_lease())
+
+        lease['name'] = 'renamed'
+        lease['other'] = 'value'
+        del lease['unknown_key']
+        del lease['events']
+
+        self.assertEqual('renamed', lease.name)
+        self.assertEqual('value', lease['other'])
+        self.assertNotIn('unknown_key', lease)
+        self.assertNotIn('events', lease)
+        self.assertRaises(KeyError, lease.__delitem__, 'events')
+
+    def test_nested_and_interned(self):
+        first = records.Lease(_lease())
+        second = records.Lease(_lease())
+
+        reservation = first['reservations'][0]
+        self.assertIsInstance(reservation, records.Reservation)
+        self.assertEqual('value', reservation['custom'])
+        self.assertIs(first.status, second.status)
+        self.assertIs(reservation.resource_type,
+                      second.reservations[0].resource_type)
+        # Events have no record type and are kept as dicts.
+        self.assertEqual([{'event_type': 'start_lease'}], first.events)
+
+    def test_get_datetime(self):
+        lease = records.Lease(_lease())
+
+        self.assertEqual(datetime.datetime(2026, 1, 1),
+                         lease.get_datetime('start_date'))
+        self.assertEqual(datetime.datetime(2026, 1, 1, 23),
+                         lease.get_datetime('end_date'))
+        self.assertIsNone(lease.get_datetime('before_end_date'))
+        self.assertIs(lease.get_datetime('start_date'),
+                      lease.get_datetime('start_date'))
+
+        lease['start_date'] = '2026-01-01T12:00:00.000000'
+        self.assertEqual(datetime.datetime(2026, 1, 1, 12),
+                         lease.get_datetime('start_date'))
+
+    def test_serialization(self):
+        lease = records.Lease(_lease())
+
+        self.assertEqual(_lease(), jsonutils.loads(utils.dumps(lease)))
+        self.assertEqual(_lease(), pickle.loads(pickle.dumps(lease)))
+
+
+class ManagerRecordsTestCase(tests.TestCase):
+
+    def _manager(self, **kwargs):
+        manager = leases.LeaseClientManager(
+            blazar_url='http://blazar', auth_token='token', session=None,
+            **kwargs)
+        manager.request_manager = mock.Mock()
+        manager.request_manager.get.return_value = (
+            200, {'leases': [_lease()], 'lease': _lease()})
+        return manager
+
+    def test_default_dicts(self):
+        manager = self._manager()
+
+        self.assertIs(dict, type(manager.list()[0]))
+        self.assertIs(dict, type(manager.get('l1')))
+
+    def test_compact_records(self):
+        manager = self._manager(compact_records=True)
+
+        self.assertIsInstance(manager.list(sort_by='name')[0], records.Lease)
+        self.assertIsInstance(manager.get('l1'), records.Lease)
+        self.assertIsInstance(next(iter(manager.list_iter())), records.Lease)
@@ -15,6 +15,7 @@
 
 import io
 import re
+import subprocess
 import sys
 
 import fixtures
@@ -87,6 +88,17 @@ class BlazarShellTestCase(tests.TestCase):
                             testtools.matchers.MatchesRegex(
                                 r, re.DOTALL | re.MULTILINE))
 
+    def test_startup_imports(self):
+        # Modules needed by a few commands only are imported by them.
+        output = subprocess.check_output([
+            sys.executable, '-c',
+            'import sys; import blazarclient.shell; '
+            'print(" ".join(sorted(sys.modules)))'])
+        modules = output.decode().split()
+        for module in ('numpy', 'blazarclient.analytics', 'sqlite3',
+                       'blazarclient.mirror', 'yaml'):
+            self.assertNotIn(module, modules)
+
     @testtools.skip('lol')
     def test_authenticate_user(self):
         obj = shell.BlazarShell()
@@ -0,0 +1,255 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import json
+import random
+
+from blazarclient import exception
+from blazarclient import records
+from blazarclient import tests
+from blazarclient import utils
+
+LEASES = [
+    {'id': '1', 'name': 'b', 'vcpus': 8,
+     'end_date': '2026-01-10T00:00:00.000000'},
+    {'id': '2', 'name': 'a', 'vcpus': 16,
+     'end_date': '2026-01-09 12:00'},
+    {'id': '3', 'name': 'b', 'vcpus': None,
+     'end_date': '2026-01-09T00:00:00+00:00'},
+    {'id': '4', 'name': None, 'vcpus': 2,
+     'end_date': None},
+]
+
+
+class SortRecordsTestCase(tests.TestCase):
+
+    def _ids(self, records):
+        return [record['id'] for record in records]
+
+    def test_parse_sort_keys(self):
+        self.assertEqual([('name', False), ('end_date', True),
+                          ('id', False)],
+                         utils.parse_sort_keys('name, end_date:DESC,id:asc'))
+        for sort_by in ('', 'name:up', 'name,,id', ':desc'):
+            self.assertRaises(exception.BlazarClientException,
+                              utils.parse_sort_keys, sort_by)
+
+    def test_sort_dates(self):
+        # Date strings in different formats are compared as dates.
+        self.assertEqual(['3', '2', '1', '4'], self._ids(
+            utils.sort_records(LEASES, 'end_date')))
+        self.assertEqual(['1', '2', '3', '4'], self._ids(
+            utils.sort_records(LEASES, 'end_date:desc')))
+
+    def test_sort_numbers_and_none(self):
+        self.assertEqual(['4', '1', '2', '3'], self._ids(
+            utils.sort_records(LEASES, 'vcpus')))
+        self.assertEqual(['2', '1', '4', '3'], self._ids(
+            utils.sort_records(LEASES, 'vcpus:desc')))
+
+    def test_sort_multiple_keys(self):
+        self.assertEqual(['2', '1', '3', '4'], self._ids(
+            utils.sort_records(LEASES, 'name,vcpus:desc')))
+        self.assertEqual(['1', '3', '2', '4'], self._ids(
+            utils.sort_records(LEASES, 'name:desc,end_date:desc')))
+
+    def test_sort_missing_key(self):
+        self.assertEqual(['1', '2', '3', '4'], self._ids(
+            utils.sort_records(LEASES, 'missing')))
+
+    def test_sort_limit(self):
+        self.assertEqual(['3', '2'], self._ids(
+            utils.sort_records(LEASES, 'end_date', limit=2)))
+        self.assertEqual(['1', '3', '2'], self._ids(
+            utils.sort_records(LEASES, 'name:desc,id', limit=3)))
+        self.assertEqual([], utils.sort_records(LEASES, 'id', limit=0))
+
+
+class FormatNestedTestCase(tests.TestCase):
+
+    def test_format_nested(self):
+        self.assertEqual('{"a": 1}', utils.format_nested({'a': 1}))
+        self.assertEqual('{"a": 1}\nb', utils.format_nested([{'a': 1}, 'b']))
+
+    def test_format_nested_records(self):
+        lease = records.Lease({'id': '1', 'name': 'a', 'reservations': [
+            {'id': 'r1', 'min': 1}]})
+        host = records.Host({'id': '2', 'hypervisor_hostname': 'compute-1'})
+
+        self.assertEqual(
+            {'id': '1', 'name': 'a', 'reservations': [{'id': 'r1', 'min': 1}]},
+            json.loads(utils.format_nested(lease)))
+        self.assertEqual(
+            [{'id': 'r1', 'min': 1},
+             {'id': '2', 'hypervisor_hostname': 'compute-1'}],
+            [json.loads(line) for line in utils.format_nested(
+                [lease['reservations'][0], host]).splitlines()])
+
+
+class DatesTestCase(tests.TestCase):
+
+    def test_parse_date(self):
+        self.assertEqual(datetime.datetime(2026, 3, 4, 5, 6),
+                         utils.parse_date('2026-03-04 05:06'))
+        self.assertEqual(datetime.datetime(2026, 3, 4, 5, 6, 7, 8),
+                         utils.parse_lease_date('2026-03-04T05:06:07.000008'))
+
+    def test_parse_date_matches_strptime(self):
+        for value, date_format in (
+                ('2026-3-4 5:06', utils.API_DATE_FORMAT),
+                ('2026-03-04T05:06:07.5', utils.LEASE_DATE_FORMAT),
+                ('04/03/2026', '%d/%m/%Y')):
+            self.assertEqual(
+                datetime.datetime.strptime(value, date_format),
+                utils.parse_date(value, date_format))
+
+    def test_parse_invalid_date(self):
+        for value in ('2026-02-30 00:00', '2026-03-04 05:06:07',
+                      '2026-03-04T05:06', ''):
+            self.assertRaises(ValueError, utils.parse_date, value)
+
+    def test_format_api_date(self):
+        self.assertEqual('0999-01-02 03:04', utils.format_api_date(
+            datetime.datetime(999, 1, 2, 3, 4, 59)))
+
+    def test_to_timestamp(self):
+        self.assertEqual(0.0, utils.to_timestamp(
+            '1970-01-01T00:00:00.000000'))
+        self.assertEqual(60.0, utils.to_timestamp(
+            '1970-01-01 00:01'))
+        self.assertEqual(3600.0, utils.to_timestamp(
+            datetime.datetime(1970, 1, 1, 2, 0, tzinfo=datetime.timezone(
+                datetime.timedelta(hours=1)))))
+
+    def test_to_timestamp_invalid(self):
+        self.assertRaises(exception.BlazarClientException,
+                          utils.to_timestamp, 'monday')
+
+    def test_shift_dates(self):
+        dates = ['2026-01-31T23:30:00.000000', '2026-03-01T00:00:00.000000',
+                 '2026-01-31T23:30:00.000000']
+        self.assertEqual(
+            ['2026-02-01 00:30', '2026-03-01 01:00', '2026-02-01 00:30'],
+            utils.shift_dates(dates, datetime.timedelta(hours=1)))
+        self.assertEqual(['2026-02-28 00:00'],
+                         utils.shift_dates(dates[1:2], '-1d'))
+        self.assertEqual(['2026-01-01 12:00'],
+                         utils.shift_dates(['2026-01-01 00:00'], '12h',
+                                           utils.API_DATE_FORMAT))
+
+    def test_shift_invalid_dates(self):
+        self.assertRaises(ValueError, utils.shift_dates, ['2026-01-01'],
+                          datetime.timedelta(hours=1))
+        self.assertRaises(exception.BlazarClientException,
+                          utils.shift_dates, ['2026-01-01 00:00'], '1w',
+                          utils.API_DATE_FORMAT)
+
+
+class SplitKeyValuesTestCase(tests.TestCase):
+
+    def test_split(self):
+        self.assertEqual(
+            [('min', '1'), ('max', '2'),
+             ('resource_properties', '["and", ["==", "$a", "x,max=3"], '
+                                     '["==", "$b", "{\\"]"]]'),
+             ('required_floatingips', '["1.1.1.1", "2.2.2.2"]'),
+             ('before_end', 'default')],
+            utils.split_key_values(
+                'min=1, max=2,resource_properties=["and", '
+                '["==", "$a", "x,max=3"], ["==", "$b", "{\\"]"]],'
+                'required_floatingips=["1.1.1.1", "2.2.2.2"],'
+                'before_end=default'))
+        self.assertEqual([], utils.split_key_values(''))
+        self.assertEqual([('a', 'b=c'), ('d', '')],
+                         utils.split_key_values('a=b=c,d='))
+
+    def test_split_unbracketed_commas(self):
+        # Forms accepted by the former regex parser, where text without
+        # '=' belongs to the previous value.
+        self.assertEqual(
+            [('min', '1'), ('resource_properties', '$a,b , c'),
+             ('max', '2')],
+            utils.split_key_values('min=1,resource_properties=$a,b , c,'
+                                   'max=2', keys=('min', 'max',
+                                                  'resource_properties')))
+        self.assertEqual(
+            [('resource_properties', '[==,$a,b,c]'), ('before_end', 'a,b')],
+            utils.split_key_values(
+                'resource_properties=[==,$a,b,c],before_end=a,b'))
+
+    def test_split_invalid(self):
+        for text in ('min', 'min=1,', '=1', 'min=[1,max=2', 'min=1]',
+                     'min="1', 'min=1,,max=2'):
+            self.assertRaises(ValueError, utils.split_key_values, text)
+        self.assertRaises(ValueError, utils.split_key_values,
+                          'min=1,mix=2', keys=('min', 'max'))
+
+    def test_split_fuzz(self):
+        rand = random.Random(0)
+        alphabet = ',="[]{}\\ :$ab'
+
+        def random_json(level=0):
+            if level > 2 or rand.random() < 0.3:
+                return ''.join(rand.choice(alphabet)
+                               for i in range(rand.randint(0, 8)))
+            if rand.random() < 0.5:
+                return [random_json(level + 1)
+                        for i in range(rand.randint(0, 3))]
+            return {random_json(3): random_json(level + 1)
+                    for i in range(rand.randint(0, 3))}
+
+        for i in range(500):
+            pairs = []
+            for j in range(rand.randint(1, 6)):
+                key = 'key%d' % j
+                kind = rand.random()
+                if kind < 0.3:
+                    value = str(rand.randint(-100, 100))
+                elif kind < 0.4:
+                    value = ''.join(rand.choice('ab=:$ ')
+                                    for k in range(rand.randint(0, 5)))
+                else:
+                    value = json.dumps(random_json())
+                pairs.append((key, value))
+            text = ','.join('%s=%s' % pair for pair in pairs)
+            self.assertEqual(pairs, utils.split_key_values(text))
+
+    def _scan_pieces(self, text):
+        # Reference split using only the character scanner.
+        pieces = []
+        start = 0
+        while True:
+            end = utils._scan_key_value(text, start)
+            pieces.append(text[start:end])
+            if end == len(text):
+                return pieces
+            start = end + 1
+
+    def test_split_fuzz_errors(self):
+        rand = random.Random(1)
+        for i in range(5000):
+            text = ''.join(rand.choice('k=v,"[]{}\\1 ')
+                           for j in range(rand.randint(1, 14)))
+            try:
+                pairs = utils.split_key_values(text)
+            except ValueError:
+                continue
+            expected = []
+            for piece in self._scan_pieces(text):
+                key, sep, value = piece.partition('=')
+                if sep:
+                    expected.append((key.strip(), value))
+                else:
+                    expected[-1] = (expected[-1][0],
+                                    '%s,%s' % (expected[-1][1], piece))
+            self.assertEqual(expected, pairs)
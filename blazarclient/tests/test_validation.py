@@ -0,0 +1,139 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+import fixtures
+
+from blazarclient import exception
+from blazarclient import tests
+from blazarclient import validation
+
+
+def _lease(**kwargs):
+    values = {
+        'name': 'lease-1', 'start': 'now', 'end': '2030-01-02 00:00',
+        'before_end': None, 'events': [],
+        'reservations': [
+            {'resource_type': 'physical:host', 'min': 1, 'max': 2,
+             'hypervisor_properties': '',
+             'resource_properties': '["==", "$gpu", "True"]'},
+            {'resource_type': 'virtual:instance', 'vcpus': 2,
+             'memory_mb': 2048, 'disk_gb': 0, 'amount': 1,
+             'affinity': 'None', 'resource_properties': ''},
+            {'resource_type': 'virtual:floatingip', 'amount': 1,
+             'network_id': 'net', 'required_floatingips': ['1.2.3.4']},
+            {'resource_type': 'flavor:instance', 'flavor_id': 'f1',
+             'amount': 2, 'affinity': False},
+            {'resource_type': 'custom', 'anything': 1},
+        ],
+    }
+    values.update(kwargs)
+    return values
+
+
+class ValidationTestCase(tests.TestCase):
+
+    def test_valid_lease(self):
+        self.assertEqual([], validation.find_errors('lease', _lease()))
+        self.assertEqual([], validation.find_errors('lease', _lease(
+            start=datetime.datetime(2030, 1, 1), before_end='2030-01-01 12:00',
+            events=[{'event_type': 'notification',
+                     'event_date': '2030-01-01 06:00'}])))
+
+    def test_reservation_errors(self):
+        values = _lease()
+        values['reservations'][0].update(min=3, resource_properties='[bad')
+        values['reservations'][1].update(vcpus='', affinity=[])
+        values['reservations'][3].update(amount=0)
+        values['reservations'].append('physical:host')
+
+        self.assertEqual([
+            ('reservations[0].resource_properties',
+             'must be a JSON filter expression: Expecting value: line 1 '
+             'column 2 (char 1)'),
+            ('reservations[0].max', 'must not be less than min'),
+            ('reservations[1].vcpus', 'is required'),
+            ('reservations[1].affinity',
+             'must be of type string or boolean or null'),
+            ('reservations[3].amount', 'must be at least 1'),
+            ('reservations[5]', 'must be of type object'),
+        ], validation.find_errors('lease', values))
+
+    def test_lease_errors(self):
+        self.assertEqual([
+            ('name', 'is required'),
+            ('end', 'must be a date of the form YYYY-MM-DD HH:MM'),
+            ('events[0].event_type', 'is required'),
+            ('before_end', 'must not be less than start'),
+        ], validation.find_errors('lease', _lease(
+            name='', start='2030-01-01 00:00', end='2030-01-02',
+            before_end='2029-12-31 00:00',
+            events=[{'event_date': '2030-01-01 00:00'}])))
+        self.assertEqual([('', 'must be of type object')],
+                         validation.find_errors('lease', ['lease']))
+
+    def test_update_errors(self):
+        self.assertEqual([], validation.find_errors('lease-update', {
+            'prolong_for': '2d', 'end_date': '2030-01-01 00:00',
+            'reservations': [{'id': 'r1', 'min': 1, 'max': 1}]}))
+        self.assertEqual([
+            ('prolong_for', 'must match ^(\\d+)([s|m|h|d])$'),
+            ('reservations[0].id', 'is required'),
+            ('reservations[0].max', 'must not be less than min'),
+        ], validation.find_errors('lease-update', {
+            'prolong_for': '2 days',
+            'reservations': [{'min': 2, 'max': 1}]}))
+
+    def test_integer_strings(self):
+        values = _lease()
+        values['reservations'][0].update(min='1', max=' 2 ')
+        values['reservations'][1].update(amount='3')
+        self.assertEqual([], validation.find_errors('lease', values))
+
+        values['reservations'][0].update(min='3', max='one')
+        values['reservations'][1].update(amount='0')
+        self.assertEqual([
+            ('reservations[0].max', 'must be of type integer'),
+            ('reservations[1].amount', 'must be at least 1'),
+        ], validation.find_errors('lease', values))
+        values['reservations'][0].update(max='2')
+        values['reservations'][1].update(amount=1)
+        self.assertEqual(
+            [('reservations[0].max', 'must not be less than min')],
+            validation.find_errors('lease', values))
+
+    def test_unknown_keys(self):
+        logger = self.useFixture(fixtures.FakeLogger(
+            name='blazarclient.validation'))
+        values = _lease(extra=1)
+        values['reservations'][1].update(extra=1)
+
+        self.assertEqual([], validation.find_errors('lease', values))
+        self.assertEqual(
+            'reservations[1].extra is not a known key, it is sent to the '
+            'API as is.\n'
+            'extra is not a known key, it is sent to the API as is.\n',
+            logger.output)
+
+    def test_validate(self):
+        validation.validate('lease', _lease())
+        e = self.assertRaises(exception.InvalidLeaseParameters,
+                              validation.validate, 'lease', _lease(name=''))
+        self.assertIsInstance(e, exception.IncorrectLease)
+        self.assertEqual([('name', 'is required')], e.kwargs['errors'])
+        self.assertEqual('Invalid lease parameters:\nname: is required',
+                         str(e))
+
+    def test_validators_are_compiled_once(self):
+        self.assertIs(validation.get_validator('lease'),
+                      validation.get_validator('lease'))
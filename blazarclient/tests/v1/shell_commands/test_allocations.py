@@ -0,0 +1,138 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+from unittest import mock
+
+import testtools
+
+from blazarclient import analytics
+from blazarclient import shell
+from blazarclient import tests
+from blazarclient.v1.shell_commands import allocations
+
+
+class ListFreeResourcesTest(tests.TestCase):
+
+    def setUp(self):
+        super(ListFreeResourcesTest, self).setUp()
+        self.allocation_manager = mock.Mock()
+        self.allocation_manager.list.return_value = [
+            {'resource_id': '1', 'reservations': [
+                {'id': 'r1', 'lease_id': 'l1',
+                 'start_date': '2026-01-05T09:00:00.000000',
+                 'end_date': '2026-01-09T18:00:00.000000'}]},
+            {'resource_id': '2', 'reservations': []},
+            {'resource_id': '3', 'reservations': []},
+        ]
+        mock_client = mock.Mock()
+        mock_client.allocation = self.allocation_manager
+
+        blazar_shell = shell.BlazarShell()
+        blazar_shell.client = mock_client
+        self.command = allocations.ListFreeResources(blazar_shell,
+                                                     mock.Mock())
+
+    def _get_data(self, argv):
+        args = self.command.get_parser('allocation-free').parse_args(argv)
+        columns, data = self.command.get_data(args)
+        return columns, list(data)
+
+    def test_list_free_resources(self):
+        columns, data = self._get_data([
+            'host', '--start-date', '2026-01-05 09:00',
+            '--end-date', '2026-01-09 18:00'])
+
+        self.assertEqual(['resource_id'], columns)
+        self.assertEqual([('2',), ('3',)], data)
+        self.allocation_manager.list.assert_called_once_with(
+            resource='os-hosts')
+
+    def test_list_free_resources_count(self):
+        columns, data = self._get_data([
+            'host', '--start', '2026-01-10 00:00', '--end', '2026-01-11 00:00',
+            '--count', '2'])
+
+        self.assertEqual([('1',), ('2',)], data)
+
+    @mock.patch.object(shell.BlazarShell, 'authenticate_user')
+    def test_list_free_resources_from_shell(self, authenticate_user):
+        # The global --endpoint-type option must not take --end.
+        blazar_shell = shell.BlazarShell()
+        blazar_shell.client = mock.Mock(allocation=self.allocation_manager)
+        blazar_shell.stdout = io.StringIO()
+
+        self.assertEqual(0, blazar_shell.run([
+            'allocation-free', 'host', '--start', '2026-01-05 09:00',
+            '--end', '2026-01-09 18:00', '-f', 'value']))
+        self.assertEqual('2\n3\n', blazar_shell.stdout.getvalue())
+        self.assertFalse(blazar_shell.options.endpoint_type)
+
+
+@testtools.skipIf(analytics.numpy is None, 'NumPy is not installed')
+class ListUtilizationTest(tests.TestCase):
+
+    def setUp(self):
+        super(ListUtilizationTest, self).setUp()
+        mock_client = mock.Mock()
+        mock_client.host.list.return_value = [
+            {'id': '1', 'gpu': 'True'},
+            {'id': '2', 'gpu': 'False'},
+        ]
+        mock_client.allocation.list.return_value = [
+            {'resource_id': '1', 'reservations': [
+                {'id': 'r1', 'lease_id': 'l1',
+                 'start_date': '2026-01-01T00:00:00.000000',
+                 'end_date': '2026-01-01T12:00:00.000000'}]},
+            {'resource_id': '2', 'reservations': [
+                {'id': 'r2', 'lease_id': 'l2',
+                 'start_date': '2026-01-01T06:00:00.000000',
+                 'end_date': '2026-01-02T00:00:00.000000'}]},
+        ]
+        self.allocation_manager = mock_client.allocation
+
+        blazar_shell = shell.BlazarShell()
+        blazar_shell.client = mock_client
+        self.command = allocations.ListUtilization(blazar_shell, mock.Mock())
+
+    def _get_data(self, argv):
+        args = self.command.get_parser('utilization').parse_args(argv)
+        columns, data = self.command.get_data(args)
+        return columns, list(data)
+
+    def test_list_utilization(self):
+        columns, data = self._get_data(['--resolution', '12h'])
+
+        self.assertEqual(['time', 'reserved', 'capacity', 'utilization'],
+                         columns)
+        self.assertEqual([('2026-01-01 00:00', 1.5, 2, 0.75),
+                          ('2026-01-01 12:00', 1.0, 2, 0.5)], data)
+        self.allocation_manager.list.assert_called_once_with(
+            resource='os-hosts')
+
+    def test_list_utilization_group_by(self):
+        columns, data = self._get_data([
+            '--group-by', 'gpu', '--start-date', '2026-01-01 00:00',
+            '--end-date', '2026-01-01 12:00'])
+
+        self.assertEqual(['group', 'time', 'reserved', 'capacity',
+                          'utilization'], columns)
+        self.assertEqual([('False', '2026-01-01 00:00', 0.5, 1, 0.5),
+                          ('True', '2026-01-01 00:00', 1.0, 1, 1.0)], data)
+
+    def test_list_utilization_no_reservations(self):
+        self.allocation_manager.list.return_value = []
+
+        columns, data = self._get_data([])
+
+        self.assertEqual([], columns)
+        self.assertEqual([], data)
@@ -15,11 +15,17 @@
 
 import argparse
 from datetime import datetime
+import io
+import os
 from unittest import mock
 
+import fixtures
+
 from blazarclient import exception
+from blazarclient import mirror
 from blazarclient import shell
 from blazarclient import tests
+from blazarclient.v1 import leases as leases_v1
 from blazarclient.v1.shell_commands import leases
 
 mock_time = mock.Mock(return_value=datetime(2020, 6, 8))
@@ -28,6 +34,13 @@ FIRST_LEASE = 'd1e43d6d-8f6f-4c2e-b0a9-2982b39dc698'
 SECOND_LEASE = '424d21c3-45a2-448a-81ad-32eddc888375'
 
 
+def _lease_manager():
+    manager = leases_v1.LeaseClientManager(
+        blazar_url='http://blazar', auth_token='token', session=None)
+    manager.request_manager = mock.Mock()
+    return manager
+
+
 @mock.patch('oslo_utils.timeutils.utcnow', mock_time)
 class CreateLeaseTestCase(tests.TestCase):
 
@@ -223,6 +236,100 @@ class CreateLeaseTestCase(tests.TestCase):
         }
         self.assertDictEqual(self.cl.args2body(args), expected)
 
+    def test_create_invalid_reservation_params(self):
+        args = argparse.Namespace(
+            start='2030-07-24 20:00',
+            end='2030-08-09 22:30',
+            before_end=None,
+            events=[],
+            name='lease-test',
+            reservations=[
+                'resource_type=physical:host,min=3,max=2,'
+                'resource_properties=["==", "$gpu",]',
+            ],
+            physical_reservations=[],
+            from_file=None
+        )
+        manager = _lease_manager()
+        self.cl.app.client = mock.Mock(lease=manager)
+
+        e = self.assertRaises(exception.InvalidLeaseParameters,
+                              self.cl.get_data, args)
+
+        self.assertEqual(
+            ['reservations[0].resource_properties', 'reservations[0].max'],
+            [location for location, message in e.kwargs['errors']])
+        manager.request_manager.post.assert_not_called()
+
+    def test_args2body_json_values_with_commas(self):
+        args = argparse.Namespace(
+            start='2030-07-24 20:00',
+            end='2030-08-09 22:30',
+            before_end=None,
+            events=[],
+            name='lease-test',
+            reservations=[
+                'resource_type=physical:host,min=1,max=2,'
+                'resource_properties=["in", "$rack", "r1,max=3"]',
+                'resource_type=virtual:floatingip,network_id=net,'
+                'required_floatingips=["1.1.1.1", "2.2.2.2"]',
+                'resource_type=custom:resource,amount=3',
+            ],
+            physical_reservations=[]
+        )
+
+        self.assertEqual([
+            {'resource_type': 'physical:host', 'min': 1, 'max': 2,
+             'resource_properties': '["in", "$rack", "r1,max=3"]',
+             'hypervisor_properties': ''},
+            {'resource_type': 'virtual:floatingip', 'network_id': 'net',
+             'required_floatingips': ['1.1.1.1', '2.2.2.2'], 'amount': 1},
+            {'resource_type': 'custom:resource', 'amount': 3},
+        ], self.cl.args2body(args)['reservations'])
+
+    def test_args2body_former_forms(self):
+        # Forms accepted by the former regex parser.
+        args = argparse.Namespace(
+            start='2030-07-24 20:00',
+            end='2030-08-09 22:30',
+            before_end=None,
+            events=[],
+            name='lease-test',
+            reservations=[
+                'resource_type=physical:host,min=1,max=2,'
+                'resource_properties=["==","$a","b,c"]',
+                'resource_type=virtual:floatingip,network_id=net,a,amount=2',
+            ],
+            physical_reservations=[
+                'min=1,max=2,hypervisor_properties=$a,b,before_end=default',
+            ]
+        )
+
+        self.assertEqual([
+            {'min': 1, 'max': 2, 'hypervisor_properties': '$a,b',
+             'before_end': 'default', 'resource_properties': '',
+             'resource_type': 'physical:host'},
+            {'resource_type': 'physical:host', 'min': 1, 'max': 2,
+             'resource_properties': '["==","$a","b,c"]',
+             'hypervisor_properties': ''},
+            {'resource_type': 'virtual:floatingip', 'network_id': 'net,a',
+             'amount': 2, 'required_floatingips': []},
+        ], self.cl.args2body(args)['reservations'])
+
+    def test_args2body_unbalanced_json(self):
+        args = argparse.Namespace(
+            start='2030-07-24 20:00',
+            end='2030-08-09 22:30',
+            before_end=None,
+            events=[],
+            name='lease-test',
+            reservations=[],
+            physical_reservations=[
+                'min=1,max=2,resource_properties=["==", "$a", "b"'
+            ]
+        )
+        self.assertRaises(exception.IncorrectLease, self.cl.args2body, args)
+
 
 class UpdateLeaseTestCase(tests.TestCase):
 
@@ -312,6 +419,271 @@ class UpdateLeaseTestCase(tests.TestCase):
 
         self.assertDictEqual(self.cl.args2body(args), expected)
 
+    def test_update_invalid_params(self):
+        args = argparse.Namespace(
+            id=FIRST_LEASE,
+            name=None,
+            prolong_for='1 hour',
+            reduce_by=None,
+            end_date=None,
+            defer_by=None,
+            advance_by=None,
+            start_date=None,
+            reservation=['id=798379a6-194c-45dc-ba34-1b5171d5552f,min=0']
+        )
+        manager = _lease_manager()
+        self.cl.app.client = mock.Mock(lease=manager)
+
+        e = self.assertRaises(exception.InvalidLeaseParameters,
+                              self.cl.run, args)
+
+        self.assertEqual(
+            ['prolong_for', 'reservations[0].min'],
+            [location for location, message in e.kwargs['errors']])
+        manager.request_manager.get.assert_not_called()
+
+    def test_args2body_json_values_with_commas(self):
+        args = argparse.Namespace(
+            name=None,
+            prolong_for=None,
+            reduce_by=None,
+            end_date=None,
+            defer_by=None,
+            advance_by=None,
+            start_date=None,
+            reservation=[
+                'id=798379a6-194c-45dc-ba34-1b5171d5552f,'
+                'required_floatingips=["1.1.1.1", "2.2.2.2"],'
+                'resource_properties=["==", "$a", "b,id=c"]'
+            ]
+        )
+        expected = {
+            'reservations': [
+                {
+                    'id': '798379a6-194c-45dc-ba34-1b5171d5552f',
+                    'required_floatingips': ['1.1.1.1', '2.2.2.2'],
+                    'resource_properties': '["==", "$a", "b,id=c"]'
+                }
+            ]
+        }
+
+        self.assertDictEqual(expected, self.cl.args2body(args))
+
+    def test_args2body_duplicated_params(self):
+        args = argparse.Namespace(
+            name=None,
+            prolong_for=None,
+            reduce_by=None,
+            end_date=None,
+            defer_by=None,
+            advance_by=None,
+            start_date=None,
+            reservation=['id=798379a6-194c-45dc-ba34-1b5171d5552f,'
+                         'max=2,max=3']
+        )
+        self.assertRaises(exception.DuplicatedLeaseParameters,
+                          self.cl.args2body, args)
+
+
+class ListLeasesTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(ListLeasesTestCase, self).setUp()
+        self.mock_lease_manager = mock.Mock()
+        mock_client = mock.Mock()
+        mock_client.lease = self.mock_lease_manager
+
+        blazar_shell = shell.BlazarShell()
+        blazar_shell.client = mock_client
+        self.list_leases = leases.ListLeases(blazar_shell, mock.Mock())
+
+    def test_list_leases_with_filters(self):
+        self.mock_lease_manager.list.return_value = [
+            {'id': FIRST_LEASE, 'name': 'first-lease'},
+        ]
+        args = self.list_leases.get_parser('lease-list').parse_args([
+            '--status', 'ACTIVE', '--project-id', 'p1',
+            '--name-prefix', 'first', '--overlap-start', '2020-07-24 20:00',
+        ])
+
+        columns, data = self.list_leases.get_data(args)
+
+        self.assertEqual([(FIRST_LEASE, 'first-lease')], list(data))
+        self.mock_lease_manager.list.assert_called_once_with(
+            sort_by='name', status='ACTIVE', project_id='p1',
+            name_prefix='first', overlap_start='2020-07-24 20:00')
+
+    def test_list_leases_from_mirror(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, 'db')
+        self.useFixture(fixtures.EnvironmentVariable('BLAZAR_MIRROR', path))
+        local_mirror = mirror.Mirror(path)
+        client = mock.Mock()
+        client.lease.list_iter.return_value = iter([
+            {'id': FIRST_LEASE, 'name': 'first-lease', 'status': 'ACTIVE'},
+            {'id': SECOND_LEASE, 'name': 'second-lease', 'status': 'ERROR'},
+        ])
+        local_mirror.sync(client, collections=['lease'])
+        local_mirror.close()
+        args = self.list_leases.get_parser('lease-list').parse_args([
+            '--from-mirror', '--status', 'ACTIVE', '-f', 'value'])
+
+        self.list_leases.app.stdout = io.StringIO()
+
+        self.assertEqual(0, self.list_leases.run(args))
+
+        self.assertEqual('%s first-lease\n' % FIRST_LEASE,
+                         self.list_leases.app.stdout.getvalue())
+        self.mock_lease_manager.list.assert_not_called()
+        # The mirror is closed once the command ran.
+        self.assertIsNone(self.list_leases._mirror)
+
+    def test_list_leases_from_missing_mirror(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, 'db')
+        self.useFixture(fixtures.EnvironmentVariable('BLAZAR_MIRROR', path))
+        args = self.list_leases.get_parser('lease-list').parse_args([
+            '--from-mirror'])
+
+        self.assertRaises(exception.BlazarClientException,
+                          self.list_leases.get_data, args)
+
+
+class FindLeaseSlotTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(FindLeaseSlotTestCase, self).setUp()
+        self.mock_lease_manager = mock.Mock()
+        mock_client = mock.Mock()
+        mock_client.lease = self.mock_lease_manager
+
+        blazar_shell = shell.BlazarShell()
+        blazar_shell.client = mock_client
+        self.find_slot = leases.FindLeaseSlot(blazar_shell, mock.Mock())
+
+    def test_find_slot(self):
+        self.mock_lease_manager.find_slot.return_value = {
+            'start_date': '2020-07-24 20:00', 'end_date': '2020-07-25 20:00',
+            'hosts': ['1', '2']}
+        args = self.find_slot.get_parser('lease-find-slot').parse_args([
+            '--count', '2', '--duration', '1d',
+            '--not-before', '2020-07-24 00:00'])
+
+        columns, data = self.find_slot.get_data(args)
+
+        self.assertEqual(('end_date', 'hosts', 'start_date'), columns)
+        self.assertEqual(('2020-07-25 20:00', '1\n2', '2020-07-24 20:00'),
+                         data)
+        self.mock_lease_manager.find_slot.assert_called_once_with(
+            2, '1d', resource_properties=None,
+            not_before='2020-07-24 00:00', not_after=None)
+
+    def test_find_slot_not_found(self):
+        self.mock_lease_manager.find_slot.return_value = None
+        args = self.find_slot.get_parser('lease-find-slot').parse_args([
+            '--count', '2', '--duration', '1d'])
+
+        self.assertRaises(exception.BlazarClientException,
+                          self.find_slot.get_data, args)
+
+
+class CreateLeaseFromFileTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(CreateLeaseFromFileTestCase, self).setUp()
+        self.mock_lease_manager = mock.Mock()
+        mock_client = mock.Mock()
+        mock_client.lease = self.mock_lease_manager
+
+        blazar_shell = shell.BlazarShell()
+        blazar_shell.client = mock_client
+        self.create_lease = leases.CreateLease(blazar_shell, mock.Mock())
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'leases.yaml')
+
+    def _parse_args(self, *args):
+        return self.create_lease.get_parser('lease-create').parse_args(
+            ['--from-file', self.path] + list(args))
+
+    def test_create_from_file(self):
+        with open(self.path, 'w') as f:
+            f.write("""
+leases:
+  - name: class-a
+    start: 2020-07-24 20:00
+    end: 2020-07-25 20:00
+    reservations:
+      - resource_type: physical:host
+        min: 1
+        max: 2
+  - name: class-b
+    start: now
+    end: 2020-07-25 20:00
+    reservations:
+      - {resource_type: virtual:floatingip, network_id: net}
+""")
+        self.mock_lease_manager.create_many.return_value = [
+            {'index': 0, 'name': 'class-a', 'lease': {'id': FIRST_LEASE},
+             'error': None, 'attempts': 1},
+            {'index': 1, 'name': 'class-b', 'lease': None,
+             'error': 'ERROR: conflict', 'attempts': 2},
+        ]
+        args = self._parse_args('--concurrency', '16', '--retries', '1')
+
+        columns, data = self.create_lease.get_data(args)
+
+        self.assertEqual(('created', 'failed', 'leases'), columns)
+        self.assertEqual(1, data[0])
+        self.assertEqual(1, data[1])
+        self.assertEqual(
+            '{"index": 0, "name": "class-a", "id": "%s"}\n'
+            '{"index": 1, "name": "class-b", "error": "ERROR: conflict"}'
+            % FIRST_LEASE, data[2])
+        self.assertEqual(1, self.create_lease.failed_leases)
+        self.mock_lease_manager.create_many.assert_called_once_with(
+            [{'name': 'class-a', 'start': '2020-07-24 20:00',
+              'end': '2020-07-25 20:00',
+              'reservations': [{'resource_type': 'physical:host',
+                                'min': 1, 'max': 2,
+                                'hypervisor_properties': '',
+                                'resource_properties': ''}]},
+             {'name': 'class-b', 'start': 'now', 'end': '2020-07-25 20:00',
+              'reservations': [{'resource_type': 'virtual:floatingip',
+                                'network_id': 'net', 'amount': 1,
+                                'required_floatingips': []}]}],
+            concurrency=16, retries=1)
+
+    def test_create_from_json_list(self):
+        with open(self.path, 'w') as f:
+            f.write('[{"name": "a", "start": "now", "end": "2020-07-25 20:00",'
+                    ' "reservations": [{"resource_type": "custom"}]}]')
+        self.mock_lease_manager.create_many.return_value = []
+
+        self.create_lease.get_data(self._parse_args())
+
+        leases_values = self.mock_lease_manager.create_many.call_args[0][0]
+        self.assertEqual([{'resource_type': 'custom'}],
+                         leases_values[0]['reservations'])
+
+    def test_create_from_invalid_file(self):
+        for content in ('leases: [', 'name: a', ''):
+            with open(self.path, 'w') as f:
+                f.write(content)
+            self.assertRaises(exception.BlazarClientException,
+                              self.create_lease.get_data, self._parse_args())
+        os.remove(self.path)
+        self.assertRaises(exception.BlazarClientException,
+                          self.create_lease.get_data, self._parse_args())
+        self.mock_lease_manager.create_many.assert_not_called()
+
+    def test_create_from_file_with_name(self):
+        self.assertRaises(exception.BlazarClientException,
+                          self.create_lease.get_data,
+                          self._parse_args('lease-1'))
+
+    def test_create_without_name(self):
+        args = self.create_lease.get_parser('lease-create').parse_args([])
+        self.assertRaises(exception.BlazarClientException,
+                          self.create_lease.get_data, args)
+
 
 class ShowLeaseTestCase(tests.TestCase):
 
@@ -0,0 +1,50 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from unittest import mock
+
+import fixtures
+
+from blazarclient import shell
+from blazarclient import tests
+from blazarclient.v1.shell_commands import mirror
+
+
+class SyncMirrorTest(tests.TestCase):
+
+    def setUp(self):
+        super(SyncMirrorTest, self).setUp()
+        self.client = mock.Mock()
+        self.client.lease.list_iter.return_value = iter([
+            {'id': 'l1', 'name': 'lease-1',
+             'created_at': '2026-01-01 00:00:00'}])
+        self.client.host.list_iter.return_value = iter([
+            {'id': 1, 'hypervisor_hostname': 'compute-1'}])
+
+        blazar_shell = shell.BlazarShell()
+        blazar_shell.client = self.client
+        self.command = mirror.SyncMirror(blazar_shell, mock.Mock())
+
+    def test_sync(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, 'db')
+        args = self.command.get_parser('sync').parse_args([
+            '--path', path, '--resource', 'lease', '--resource', 'host',
+            '--page-size', '50'])
+
+        columns, data = self.command.get_data(args)
+
+        self.assertEqual(mirror.SYNC_COLUMNS, columns)
+        self.assertEqual([('lease', 1, 0, 0, 0), ('host', 1, 0, 0, 0)], data)
+        self.assertTrue(os.path.exists(path))
+        self.client.lease.list_iter.assert_called_once_with(page_size=50)
+        self.client.allocation.list_iter.assert_not_called()
@@ -0,0 +1,116 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from blazarclient import tests
+from blazarclient.v1 import allocations
+
+
+def _allocations():
+    return [
+        {'resource_id': '1', 'reservations': [
+            {'id': 'r1', 'lease_id': 'l1'},
+            {'id': 'r2', 'lease_id': 'l2'}]},
+        {'resource_id': '2', 'reservations': []},
+        {'resource_id': '3', 'reservations': [
+            {'id': 'r1', 'lease_id': 'l1'},
+            {'id': 'r3', 'lease_id': 'l3'}]},
+    ]
+
+
+class FilterAllocationsTestCase(tests.TestCase):
+
+    def test_no_filter(self):
+        data = _allocations()
+        self.assertIs(data, allocations.filter_allocations(data))
+
+    def test_filter_by_lease(self):
+        self.assertEqual(
+            [{'resource_id': '1',
+              'reservations': [{'id': 'r1', 'lease_id': 'l1'}]},
+             {'resource_id': '3',
+              'reservations': [{'id': 'r1', 'lease_id': 'l1'}]}],
+            allocations.filter_allocations(_allocations(), lease_id='l1'))
+
+    def test_filter_by_reservation(self):
+        self.assertEqual(
+            [{'resource_id': '3',
+              'reservations': [{'id': 'r3', 'lease_id': 'l3'}]}],
+            allocations.filter_allocations(_allocations(),
+                                           reservation_id='r3'))
+
+    def test_filter_by_lease_and_reservation(self):
+        self.assertEqual([], allocations.filter_allocations(
+            _allocations(), lease_id='l1', reservation_id='r3'))
+
+    def test_filter_with_index(self):
+        data = _allocations()
+        index = allocations.index_reservations(data)
+
+        self.assertEqual(['1'], [a['resource_id'] for a in
+                                 allocations.filter_allocations(
+                                     data, lease_id='l2', index=index)])
+        self.assertEqual([], allocations.filter_allocations(
+            data, lease_id='unknown', index=index))
+
+
+class AllocationClientManagerTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(AllocationClientManagerTestCase, self).setUp()
+        self.manager = allocations.AllocationClientManager(
+            blazar_url='http://blazar', auth_token='token', session=None)
+        self.manager.request_manager = mock.Mock()
+
+    def test_list_with_filters(self):
+        self.manager.request_manager.get.return_value = (
+            200, {'allocations': _allocations()})
+
+        ret = self.manager.list('os-hosts', lease_id='l1',
+                                reservation_id='r1')
+
+        self.assertEqual(['1', '3'], [a['resource_id'] for a in ret])
+        self.manager.request_manager.get.assert_called_once_with(
+            '/os-hosts/allocations?lease_id=l1&reservation_id=r1')
+
+    def test_list_without_filters(self):
+        self.manager.request_manager.get.return_value = (
+            200, {'allocations': _allocations()})
+
+        ret = self.manager.list('os-hosts')
+
+        self.assertEqual(3, len(ret))
+        self.manager.request_manager.get.assert_called_once_with(
+            '/os-hosts/allocations')
+
+    def test_list_iter_with_filters(self):
+        self.manager.request_manager.get.return_value = (
+            200, {'allocations': _allocations()})
+
+        ret = self.manager.list_iter('os-hosts', page_size=10,
+                                     lease_id='l3')
+
+        self.assertEqual(['3'], [a['resource_id'] for a in ret])
+        self.manager.request_manager.get.assert_called_once_with(
+            '/os-hosts/allocations?lease_id=l3&limit=10')
+
+    def test_get_with_filters(self):
+        self.manager.request_manager.get.return_value = (
+            200, {'allocation': _allocations()[0]})
+
+        ret = self.manager.get('os-hosts', '1', lease_id='l2')
+
+        self.assertEqual([{'id': 'r2', 'lease_id': 'l2'}],
+                         ret['reservations'])
+        self.manager.request_manager.get.assert_called_once_with(
+            '/os-hosts/1/allocation?lease_id=l2')
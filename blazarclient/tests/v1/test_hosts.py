@@ -0,0 +1,87 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from blazarclient import exception
+from blazarclient import tests
+from blazarclient.v1 import hosts
+
+
+def _properties():
+    return [
+        {'property': 'gpu', 'private': False, 'values': ['True', 'False']},
+        {'property': 'rack', 'private': False, 'values': ['r1']},
+    ]
+
+
+class ComputeHostClientManagerPropertyTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(ComputeHostClientManagerPropertyTestCase, self).setUp()
+        self.manager = hosts.ComputeHostClientManager(
+            blazar_url='http://blazar', auth_token='token', session=None)
+        self.manager.request_manager = mock.Mock()
+        self.get = self.manager.request_manager.get
+        self.get.side_effect = lambda url: (
+            200, {'resource_properties': _properties()})
+        self.now = self.patch(hosts.time, 'monotonic')
+        self.now.return_value = 1000.0
+
+    def test_get_property(self):
+        self.assertEqual({'property': 'gpu', 'private': False,
+                          'property_values': ['True', 'False']},
+                         self.manager.get_property('gpu'))
+        self.assertEqual('rack', self.manager.get_property('rack')['property'])
+        self.get.assert_called_once_with('/os-hosts/properties?detail=True')
+
+    def test_get_property_returns_copies(self):
+        self.manager.get_property('gpu')['private'] = ''
+
+        self.assertFalse(self.manager.get_property('gpu')['private'])
+
+    def test_get_property_ttl(self):
+        self.manager.get_property('gpu')
+        self.now.return_value += hosts.PROPERTY_CATALOG_TTL
+
+        self.manager.get_property('gpu')
+
+        self.assertEqual(2, self.get.call_count)
+
+    def test_get_property_missing(self):
+        self.manager.get_property('gpu')
+
+        self.assertRaises(exception.ResourcePropertyNotFound,
+                          self.manager.get_property, 'missing')
+        # The cached catalog is refreshed once before giving up.
+        self.assertEqual(2, self.get.call_count)
+
+    def test_set_property_invalidates(self):
+        self.manager.request_manager.patch.return_value = (
+            200, {'resource_property': {'property': 'gpu', 'private': True}})
+        self.manager.get_property('gpu')
+
+        self.manager.set_property('gpu', True)
+        self.manager.get_property('gpu')
+
+        self.assertEqual(2, self.get.call_count)
+        self.manager.request_manager.patch.assert_called_once_with(
+            '/os-hosts/properties/gpu', body={'private': True})
+
+    def test_host_update_invalidates(self):
+        self.manager.request_manager.put.return_value = (200, {'host': {}})
+        self.manager.get_property('gpu')
+
+        self.manager.update('1', {'rack': 'r2'})
+        self.manager.get_property('gpu')
+
+        self.assertEqual(2, self.get.call_count)
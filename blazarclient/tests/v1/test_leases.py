@@ -0,0 +1,268 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+from unittest import mock
+
+import requests
+
+from blazarclient import exception
+from blazarclient import tests
+from blazarclient.v1 import leases
+
+LEASES = [
+    {'id': '1', 'name': 'class-a', 'status': 'ACTIVE', 'project_id': 'p1',
+     'user_id': 'u1', 'start_date': '2026-01-01T00:00:00.000000',
+     'end_date': '2026-01-08T00:00:00.000000'},
+    {'id': '2', 'name': 'class-b', 'status': 'PENDING', 'project_id': 'p2',
+     'user_id': 'u1', 'start_date': '2026-02-01T00:00:00.000000',
+     'end_date': '2026-02-08T00:00:00.000000'},
+    {'id': '3', 'name': 'other', 'status': 'ACTIVE', 'project_id': 'p1',
+     'user_id': 'u2', 'start_date': '2026-01-05T00:00:00.000000',
+     'end_date': '2026-03-01T00:00:00.000000'},
+]
+
+
+class LeaseClientManagerListTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(LeaseClientManagerListTestCase, self).setUp()
+        self.manager = leases.LeaseClientManager(
+            blazar_url='http://blazar', auth_token='token', session=None)
+        self.manager.request_manager = mock.Mock()
+        self.manager.request_manager.get.return_value = (
+            200, {'leases': [dict(lease) for lease in LEASES]})
+
+    def _ids(self, leases):
+        return [lease['id'] for lease in leases]
+
+    def test_list_without_filters(self):
+        self.assertEqual(['1', '2', '3'], self._ids(self.manager.list()))
+        self.manager.request_manager.get.assert_called_once_with('/leases')
+
+    def test_list_filters_query_string(self):
+        self.manager.list(status='ACTIVE', project_id='p1', user_id='u1',
+                          name_prefix='class',
+                          overlap_start='2026-01-02 00:00',
+                          overlap_end=datetime.datetime(2026, 1, 3))
+
+        self.manager.request_manager.get.assert_called_once_with(
+            '/leases?status=ACTIVE&project_id=p1&user_id=u1'
+            '&name_prefix=class&overlap_start=2026-01-02+00%3A00'
+            '&overlap_end=2026-01-03+00%3A00')
+
+    def test_list_filters_locally(self):
+        self.assertEqual(['1', '3'],
+                         self._ids(self.manager.list(status='active')))
+        self.assertEqual(['1', '3'],
+                         self._ids(self.manager.list(project_id='p1')))
+        self.assertEqual(['3'], self._ids(self.manager.list(user_id='u2')))
+        self.assertEqual(['1', '2'],
+                         self._ids(self.manager.list(name_prefix='class')))
+
+    def test_list_overlap_window(self):
+        self.assertEqual(['3'], self._ids(self.manager.list(
+            overlap_start='2026-01-08 00:00',
+            overlap_end='2026-02-01 00:00')))
+        self.assertEqual(['2', '3'], self._ids(self.manager.list(
+            overlap_start='2026-02-07 00:00')))
+        self.assertEqual(['1'], self._ids(self.manager.list(
+            overlap_end='2026-01-05 00:00')))
+
+    def test_list_filters_null_values(self):
+        self.manager.request_manager.get.return_value = (200, {'leases': [
+            {'id': '4', 'name': None, 'status': None,
+             'start_date': None, 'end_date': None},
+            {'id': '5'},
+        ] + [dict(lease) for lease in LEASES]})
+
+        self.assertEqual(['1', '3'],
+                         self._ids(self.manager.list(status='active')))
+        self.assertEqual(['1', '2'],
+                         self._ids(self.manager.list(name_prefix='class')))
+        self.assertEqual(['4', '5', '3'], self._ids(self.manager.list(
+            overlap_start='2026-01-08 00:00',
+            overlap_end='2026-02-01 00:00')))
+
+    def test_list_filters_and_sort(self):
+        self.assertEqual(['1', '2'], self._ids(self.manager.list(
+            user_id='u1', sort_by='status')))
+
+    def test_list_invalid_date(self):
+        self.assertRaises(exception.BlazarClientException,
+                          self.manager.list, overlap_start='tomorrow')
+        self.manager.request_manager.get.assert_not_called()
+
+    def test_list_iter_filters(self):
+        leases = self.manager.list_iter(page_size=10, status='PENDING')
+
+        self.assertEqual(['2'], self._ids(leases))
+        self.manager.request_manager.get.assert_called_once_with(
+            '/leases?status=PENDING&limit=10')
+
+
+class LeaseClientManagerFindSlotTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(LeaseClientManagerFindSlotTestCase, self).setUp()
+        self.manager = leases.LeaseClientManager(
+            blazar_url='http://blazar', auth_token='token', session=None)
+        self.manager.request_manager = mock.Mock()
+        responses = {
+            '/os-hosts': {'hosts': [{'id': '1'}, {'id': '2'}]},
+            '/os-hosts/allocations': {'allocations': [
+                {'resource_id': 1, 'reservations': [
+                    {'id': 'r1', 'lease_id': 'l1',
+                     'start_date': '2026-01-01T00:00:00.000000',
+                     'end_date': '2026-01-02T00:00:00.000000'}]},
+            ]},
+        }
+        self.manager.request_manager.get.side_effect = (
+            lambda url: (200, responses[url]))
+
+    def test_find_slot(self):
+        slot = self.manager.find_slot(2, '12h', not_before='2026-01-01 00:00')
+
+        self.assertEqual({'start_date': '2026-01-02 00:00',
+                          'end_date': '2026-01-02 12:00',
+                          'hosts': ['1', '2']}, slot)
+
+    def test_find_slot_timedelta(self):
+        slot = self.manager.find_slot(
+            1, datetime.timedelta(hours=1),
+            not_before=datetime.datetime(2026, 1, 1))
+
+        self.assertEqual({'start_date': '2026-01-01 00:00',
+                          'end_date': '2026-01-01 01:00',
+                          'hosts': ['2']}, slot)
+
+    def test_find_slot_not_found(self):
+        self.assertIsNone(self.manager.find_slot(
+            2, 3600, not_before='2026-01-01 00:00',
+            not_after='2026-01-01 12:00'))
+
+
+class LeaseClientManagerCreateManyTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(LeaseClientManagerCreateManyTestCase, self).setUp()
+        self.manager = leases.LeaseClientManager(
+            blazar_url='http://blazar', auth_token='token', session=None)
+        self.manager.request_manager = mock.Mock()
+        self.manager.request_manager.post.side_effect = (
+            lambda url, body: (200, {'lease': dict(body, id=body['name'])}))
+        self.sleep = self.patch(leases.time, 'sleep')
+
+    def _lease(self, name, **kwargs):
+        values = {'name': name, 'start': '2026-01-01 00:00',
+                  'end': datetime.datetime(2026, 1, 2),
+                  'reservations': [{'resource_type': 'physical:host',
+                                    'min': 1, 'max': 1}]}
+        values.update(kwargs)
+        return values
+
+    def test_create_many(self):
+        find_errors = self.patch(leases.validation, 'find_errors')
+        find_errors.return_value = []
+        validate = self.patch(leases.validation, 'validate')
+
+        results = self.manager.create_many(
+            [self._lease('lease-%d' % i) for i in range(20)], concurrency=4)
+
+        # Each lease is validated once, before any is submitted.
+        self.assertEqual(20, find_errors.call_count)
+        validate.assert_not_called()
+
+        self.assertEqual(['lease-%d' % i for i in range(20)],
+                         [result['lease']['id'] for result in results])
+        self.assertEqual(list(range(20)),
+                         [result['index'] for result in results])
+        self.assertEqual(20, self.manager.request_manager.post.call_count)
+        self.manager.request_manager.post.assert_any_call(
+            '/leases', body={
+                'name': 'lease-0', 'start_date': '2026-01-01 00:00',
+                'end_date': '2026-01-02 00:00',
+                'reservations': [{'resource_type': 'physical:host',
+                                  'min': 1, 'max': 1}],
+                'events': [], 'before_end_date': None})
+
+    def test_create_many_validates_first(self):
+        leases_values = [
+            self._lease('ok'),
+            self._lease('bad-date', end='tomorrow'),
+            self._lease('reversed', start='2026-01-03 00:00'),
+            self._lease('', reservations=[{'min': 1}], extra=True),
+        ]
+
+        e = self.assertRaises(exception.InvalidLeaseParameters,
+                              self.manager.create_many, leases_values)
+
+        self.assertEqual([
+            ('leases[1].end', 'must be a date of the form YYYY-MM-DD HH:MM'),
+            ('leases[2].end', 'must not be less than start'),
+            ('leases[3].name', 'is required'),
+            ('leases[3].reservations[0].resource_type', 'is required'),
+            ('leases[3].extra', 'is not a known key'),
+        ], e.kwargs['errors'])
+        self.assertIn('leases[2].end: must not be less than start', str(e))
+        self.manager.request_manager.post.assert_not_called()
+
+    def test_create_many_unknown_keys(self):
+        e = self.assertRaises(
+            exception.InvalidLeaseParameters, self.manager.create_many,
+            [self._lease('ok'), self._lease('typo', before_end_date=None)])
+
+        self.assertEqual([('leases[1].before_end_date', 'is not a known key')],
+                         e.kwargs['errors'])
+        self.manager.request_manager.post.assert_not_called()
+
+    def test_create_many_reports_failures(self):
+        def post(url, body):
+            if body['name'] == 'taken':
+                raise exception.BlazarClientException('conflict', code=409)
+            return 200, {'lease': dict(body, id=body['name'])}
+        self.manager.request_manager.post.side_effect = post
+
+        results = self.manager.create_many(
+            [self._lease('a'), self._lease('taken'), self._lease('b')],
+            retries=3)
+
+        self.assertEqual(['a', None, 'b'],
+                         [result['lease'] and result['lease']['id']
+                          for result in results])
+        self.assertEqual({'index': 1, 'name': 'taken', 'lease': None,
+                          'error': 'conflict', 'attempts': 1}, results[1])
+        self.sleep.assert_not_called()
+
+    def test_create_many_retries_transient_errors(self):
+        self.manager.request_manager.post.side_effect = [
+            exception.BlazarClientException('unavailable', code=503),
+            requests.ConnectionError('reset'),
+            (200, {'lease': {'id': 'l1'}}),
+        ]
+
+        results = self.manager.create_many(
+            [self._lease('a')], retries=2, retry_delay=0.5)
+
+        self.assertEqual({'id': 'l1'}, results[0]['lease'])
+        self.assertEqual(3, results[0]['attempts'])
+        self.sleep.assert_has_calls([mock.call(0.5), mock.call(1.0)])
+
+    def test_create_many_retries_exhausted(self):
+        self.manager.request_manager.post.side_effect = (
+            exception.BlazarClientException('unavailable', code=503))
+
+        results = self.manager.create_many([self._lease('a')], retries=1)
+
+        self.assertIsNone(results[0]['lease'])
+        self.assertEqual('unavailable', results[0]['error'])
+        self.assertEqual(2, results[0]['attempts'])
@@ -13,7 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections.abc
 import datetime
+import functools
+import heapq
+import json as stdlib_json
 import os
 import re
 
@@ -26,6 +30,23 @@ ELAPSED_TIME_REGEX = r'^(\d+)([s|m|h|d])$'
 
 LEASE_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
 API_DATE_FORMAT = '%Y-%m-%d %H:%M'
+EPOCH = datetime.datetime(1970, 1, 1)
+
+# Anchored patterns of the date formats above, parsed without strptime.
+_DATE_PATTERNS = {
+    LEASE_DATE_FORMAT: re.compile(
+        r'(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)\.(\d{6})\Z', re.ASCII),
+    API_DATE_FORMAT: re.compile(
+        r'(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d)\Z', re.ASCII),
+}
+DATE_CACHE_SIZE = 4096
+
+# Characters changing how commas are read in 'key=value,...' strings.
+_KEY_VALUE_DELIMITERS = re.compile(r'[,"\\\[\]{}]')
+_JSON_DECODER = stdlib_json.JSONDecoder()
+
+SORT_DIRECTIONS = ('asc', 'desc')
+DATE_KEY_SUFFIXES = ('_date', '_at')
 
 
 def env(*args, **kwargs):
@@ -59,14 +80,277 @@ def to_primitive(value):
         return value
 
 
+@functools.lru_cache(maxsize=None)
+def _json_encoder(indent):
+    # NOTE: json.dumps() builds a new encoder on every call when any option
+    #       is passed, which dominates the cost of dumping many small values.
+    return stdlib_json.JSONEncoder(indent=indent, default=json.to_primitive)
+
+
 def dumps(value, indent=None):
     try:
-        return json.dumps(value, indent=indent)
+        return _json_encoder(indent).encode(value)
     except TypeError:
         pass
     return json.dumps(to_primitive(value))
 
 
+def format_nested(value, indent=None):
+    """Return a display string for a list or a mapping in a single pass.
+
+    Mappings, such as dicts and blazarclient.records records, are dumped as
+    JSON. Lists are rendered one element per line, with mapping elements
+    dumped as JSON and any other element converted with str().
+    """
+    if isinstance(value, collections.abc.Mapping):
+        return dumps(dict(value), indent=indent)
+    return '\n'.join(dumps(dict(i), indent=indent)
+                     if isinstance(i, collections.abc.Mapping) else str(i)
+                     for i in value)
+
+
+def _parse_date(value, date_format):
+    pattern = _DATE_PATTERNS.get(date_format)
+    match = pattern and pattern.match(value)
+    if match:
+        return datetime.datetime(*map(int, match.groups()))
+    return datetime.datetime.strptime(value, date_format)
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(value, date_format=API_DATE_FORMAT):
+    """Parse a date string into a naive datetime.
+
+    LEASE_DATE_FORMAT and API_DATE_FORMAT strings are parsed with a
+    precompiled pattern, about three times faster than strptime(), and
+    the most recent results are cached. Any other format, or a string
+    which is not in the canonical form of its format, goes through
+    strptime().
+
+    :raises: ValueError if the string does not match the format.
+    """
+    return _parse_date(value, date_format)
+
+
+def parse_lease_date(value):
+    """Parse a date returned by the API, such as a lease start_date."""
+    return parse_date(value, LEASE_DATE_FORMAT)
+
+
+def format_api_date(date):
+    """Format a datetime as API_DATE_FORMAT, without strftime()."""
+    return '%04d-%02d-%02d %02d:%02d' % (date.year, date.month, date.day,
+                                         date.hour, date.minute)
+
+
+def to_timestamp(value):
+    """Convert a datetime or an ISO 8601 date string to UTC seconds.
+
+    Naive datetimes and strings without an offset are taken as UTC, like
+    every date returned by the Blazar API.
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            raise exception.BlazarClientException(
+                _("Invalid date '%s'.") % value)
+    elif isinstance(value, (int, float)):
+        return float(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH).total_seconds()
+
+
+def shift_dates(dates, delta, date_format=LEASE_DATE_FORMAT):
+    """Shift many date strings by the same delta at once.
+
+    Each distinct date is parsed and shifted once, so batches of leases
+    sharing their dates cost one parse per date.
+
+    :param dates: iterable of date strings in date_format.
+    :param delta: a timedelta, or an elapsed time such as '2d' or '-12h'.
+    :returns: the list of shifted dates, in API_DATE_FORMAT.
+    :raises: ValueError if a date does not match date_format.
+    """
+    if not isinstance(delta, datetime.timedelta):
+        positive = not delta.startswith('-')
+        delta = from_elapsed_time_to_delta(delta.lstrip('+-'),
+                                           pos_sign=positive)
+    shifted = {}
+    result = []
+    for date in dates:
+        value = shifted.get(date)
+        if value is None:
+            value = shifted[date] = format_api_date(
+                _parse_date(date, date_format) + delta)
+        result.append(value)
+    return result
+
+
+def _scan_key_value(text, start):
+    """Return the end of the key=value pair starting at start."""
+    depth = 0
+    in_string = False
+    skip = -1
+    for match in _KEY_VALUE_DELIMITERS.finditer(text, start):
+        char = match.group()
+        position = match.start()
+        if position == skip:
+            continue
+        if in_string:
+            if char == '"':
+                in_string = False
+            elif char == '\\':
+                skip = position + 1
+        elif char == '"':
+            in_string = True
+        elif char in '[{':
+            depth += 1
+        elif char in ']}':
+            depth -= 1
+            if depth < 0:
+                raise ValueError(_("Unbalanced '%(char)s' at position "
+                                   "%(position)d.") %
+                                 {'char': char, 'position': position})
+        elif char == ',' and not depth:
+            return position
+    if in_string or depth:
+        raise ValueError(_('Unterminated string or bracket.'))
+    return len(text)
+
+
+def split_key_values(text, keys=None):
+    """Split a 'key=value,key=value' string into (key, value) pairs.
+
+    The string is read once, left to right. Commas inside brackets, braces
+    or double-quoted strings do not separate pairs, so values can be JSON
+    documents such as resource_properties filters. As with the former
+    parser, text without '=' between two commas belongs to the previous
+    value, so 'a=b,c,d=e' gives ('a', 'b,c') and ('d', 'e'). Keys are
+    stripped of surrounding spaces, values are kept as they are.
+
+    :param keys: optional collection of the valid keys.
+    :returns: the list of (key, value) tuples, in order.
+    :raises: ValueError for a first pair without '=', an empty pair, an
+             unknown key, or an unbalanced bracket or quote.
+    """
+    pairs = []
+    length = len(text)
+    start = 0
+    while text:
+        # Plain values end at the next comma and JSON values are skipped
+        # by the JSON decoder, anything else is scanned character by
+        # character.
+        end = None
+        equal = text.find('=', start)
+        if equal != -1 and not _KEY_VALUE_DELIMITERS.search(text, start,
+                                                            equal):
+            if text.startswith(('[', '{', '"'), equal + 1):
+                try:
+                    end = _JSON_DECODER.raw_decode(text, equal + 1)[1]
+                except (ValueError, RecursionError):
+                    pass
+                else:
+                    if end != length and text[end] != ',':
+                        end = None
+            else:
+                comma = text.find(',', equal)
+                if comma == -1:
+                    comma = length
+                if not _KEY_VALUE_DELIMITERS.search(text, equal, comma):
+                    end = comma
+        if end is None:
+            end = _scan_key_value(text, start)
+
+        key, sep, value = text[start:end].partition('=')
+        key = key.strip()
+        if not sep and key and pairs:
+            pairs[-1] = (pairs[-1][0], '%s,%s' % (pairs[-1][1],
+                                                  text[start:end]))
+        elif not sep or not key:
+            raise ValueError(_("'%s' is not of the form key=value.") %
+                             text[start:end])
+        elif keys is not None and key not in keys:
+            raise ValueError(_("Unknown key '%s'.") % key)
+        else:
+            pairs.append((key, value))
+        if end == length:
+            break
+        start = end + 1
+    return pairs
+
+
+def parse_sort_keys(sort_by):
+    """Parse a '<key>[:asc|desc],...' sort specification.
+
+    :returns: a list of (key, descending) tuples.
+    """
+    keys = []
+    for part in sort_by.split(','):
+        key, _sep, direction = part.strip().partition(':')
+        direction = direction.strip().lower() or 'asc'
+        if not key or direction not in SORT_DIRECTIONS:
+            raise exception.BlazarClientException(
+                _("Invalid sort key '%s', must be of the form "
+                  "<key>[:asc|desc].") % part)
+        keys.append((key, direction == 'desc'))
+    return keys
+
+
+class _Descending(object):
+    """Wrapper inverting the order of a value which cannot be negated."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+def _sort_value(key, value, descending):
+    # Values are ranked by type so that they are always comparable: numbers
+    # and dates first, then strings, and missing values last.
+    if value is None:
+        return (2,)
+    if isinstance(value, str) and key.endswith(DATE_KEY_SUFFIXES):
+        try:
+            value = to_timestamp(value)
+        except exception.BlazarClientException:
+            pass
+    if isinstance(value, (int, float)):
+        return (0, -value if descending else value)
+    value = str(value)
+    return (1, _Descending(value) if descending else value)
+
+
+def sort_records(records, sort_by, limit=None):
+    """Sort records on one or more typed keys.
+
+    Dates are parsed and compared as dates, numbers as numbers, and missing
+    or None values come last in either direction. Each record key is built
+    once. With a limit, only the first records are selected with a heap, in
+    O(n log limit).
+
+    :param sort_by: sort specification, see parse_sort_keys().
+    :param limit: number of records to return, all of them by default.
+    """
+    keys = parse_sort_keys(sort_by)
+
+    def sort_key(record):
+        return tuple(_sort_value(key, record.get(key), descending)
+                     for key, descending in keys)
+
+    if limit is None:
+        return sorted(records, key=sort_key)
+    return heapq.nsmallest(limit, records, key=sort_key)
+
+
 def get_item_properties(item, fields, mixed_case_fields=None, formatters=None):
     """Return a tuple containing the item properties.
 
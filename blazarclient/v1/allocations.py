@@ -13,22 +13,121 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+from urllib import parse
+
 from blazarclient import base
+from blazarclient import records
+from blazarclient import utils
+
+
+def index_reservations(allocations):
+    """Index the reservations of allocations by lease and reservation ID.
+
+    Returns two dicts mapping lease IDs and reservation IDs to lists of
+    (allocation position, reservation) pairs, in allocation order.
+    """
+    by_lease = collections.defaultdict(list)
+    by_reservation = collections.defaultdict(list)
+    for position, allocation in enumerate(allocations):
+        for reservation in allocation['reservations']:
+            by_lease[reservation['lease_id']].append((position, reservation))
+            by_reservation[reservation['id']].append((position, reservation))
+    return by_lease, by_reservation
+
+
+def filter_allocations(allocations, lease_id=None, reservation_id=None,
+                       index=None):
+    """Return the allocations having reservations matching the filters.
+
+    Only matching reservations are kept and resources without any are
+    dropped. index is the result of index_reservations() for allocations,
+    and is built when not given.
+    """
+    if lease_id is None and reservation_id is None:
+        return allocations
+    by_lease, by_reservation = index or index_reservations(allocations)
+    if reservation_id is not None:
+        matches = by_reservation.get(reservation_id, [])
+        if lease_id is not None:
+            matches = [(position, reservation)
+                       for position, reservation in matches
+                       if reservation['lease_id'] == lease_id]
+    else:
+        matches = by_lease.get(lease_id, [])
+
+    reservations = collections.defaultdict(list)
+    for position, reservation in matches:
+        reservations[position].append(reservation)
+    filtered = []
+    for position in sorted(reservations):
+        allocation = dict(allocations[position])
+        allocation['reservations'] = reservations[position]
+        filtered.append(allocation)
+    return filtered
+
+
+def _filter_query(url, lease_id, reservation_id):
+    query = [(k, v) for k, v in (('lease_id', lease_id),
+                                 ('reservation_id', reservation_id))
+             if v is not None]
+    if query:
+        url += '?' + parse.urlencode(query)
+    return url
 
 
 class AllocationClientManager(base.BaseClientManager):
     """Manager for the ComputeHost connected requests."""
 
-    def get(self, resource, resource_id):
-        """Get allocation for resource identified by type and ID."""
-        resp, body = self.request_manager.get(
-            '/%s/%s/allocation' % (resource, resource_id))
-        return body['allocation']
+    record_class = records.Allocation
+
+    def get(self, resource, resource_id, lease_id=None, reservation_id=None):
+        """Get allocation for resource identified by type and ID.
+
+        The reservations can be filtered by lease and reservation ID. The
+        filters are sent to the server and applied again to the response.
+        """
+        resp, body = self.request_manager.get(_filter_query(
+            '/%s/%s/allocation' % (resource, resource_id),
+            lease_id, reservation_id))
+        allocation = body['allocation']
+        if lease_id is not None or reservation_id is not None:
+            allocation['reservations'] = [
+                r for r in allocation['reservations']
+                if (lease_id is None or r['lease_id'] == lease_id) and
+                (reservation_id is None or r['id'] == reservation_id)]
+        return self._record(allocation)
 
-    def list(self, resource, sort_by=None):
-        """List allocations for all resources of a type."""
-        resp, body = self.request_manager.get('/%s/allocations' % resource)
-        allocations = body['allocations']
+    def list(self, resource, sort_by=None, lease_id=None,
+             reservation_id=None):
+        """List allocations for all resources of a type.
+
+        With lease or reservation ID filters, only the resources having
+        matching reservations are returned. The filters are sent to the
+        server and applied again to the response, so they also work with
+        servers ignoring them.
+        """
+        resp, body = self.request_manager.get(_filter_query(
+            '/%s/allocations' % resource, lease_id, reservation_id))
+        allocations = filter_allocations(body['allocations'],
+                                         lease_id=lease_id,
+                                         reservation_id=reservation_id)
         if sort_by:
-            allocations = sorted(allocations, key=lambda alloc: alloc[sort_by])
-        return allocations
+            allocations = utils.sort_records(allocations, sort_by)
+        return self._records(allocations)
+
+    def list_iter(self, resource, page_size=base.DEFAULT_PAGE_SIZE,
+                  lease_id=None, reservation_id=None):
+        """Iterate over allocations for all resources of a type.
+
+        Accepts the same filters as list().
+        """
+        allocations = self._list_iter(
+            _filter_query('/%s/allocations' % resource, lease_id,
+                          reservation_id),
+            'allocations', page_size=page_size, marker_key='resource_id')
+        for allocation in allocations:
+            filtered = filter_allocations([allocation], lease_id=lease_id,
+                                          reservation_id=reservation_id)
+            if filtered:
+                yield self._record(filtered[0])
@@ -42,7 +42,7 @@ class Client(object):
         self.auth_token = auth_token
         self.session = session
 
-        if not self.session:
+        if not self.session and kwargs.get('replay') is None:
             logging.warning('Use a keystoneauth session object for the '
                             'authentication. The authentication with '
                             'blazar_url and auth_token is deprecated.')
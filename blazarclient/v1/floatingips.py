@@ -14,6 +14,7 @@
 # limitations under the License.
 
 from blazarclient import base
+from blazarclient import utils
 
 
 class FloatingIPClientManager(base.BaseClientManager):
@@ -43,5 +44,10 @@ class FloatingIPClientManager(base.BaseClientManager):
         resp, body = self.request_manager.get('/floatingips')
         floatingips = body['floatingips']
         if sort_by:
-            floatingips = sorted(floatingips, key=lambda fip: fip[sort_by])
+            floatingips = utils.sort_records(floatingips, sort_by)
         return floatingips
+
+    def list_iter(self, page_size=base.DEFAULT_PAGE_SIZE):
+        """Iterate over all floating IPs, fetching them one page at a time."""
+        return self._list_iter('/floatingips', 'floatingips',
+                               page_size=page_size)
@@ -13,25 +13,42 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 from blazarclient import base
 from blazarclient import exception
 from blazarclient.i18n import _
+from blazarclient import records
+from blazarclient import utils
+
+PROPERTY_CATALOG_TTL = 60
 
 
 class ComputeHostClientManager(base.BaseClientManager):
     """Manager for the ComputeHost connected requests."""
 
+    record_class = records.Host
+    # Seconds during which the property catalog used by get_property() is
+    # reused. Set to 0 to always fetch it again.
+    property_catalog_ttl = PROPERTY_CATALOG_TTL
+
+    def __init__(self, *args, **kwargs):
+        super(ComputeHostClientManager, self).__init__(*args, **kwargs)
+        self._property_catalog = None
+        self._property_catalog_expiry = 0
+
     def create(self, name, **kwargs):
         """Creates host from values passed."""
         values = {'name': name}
         values.update(**kwargs)
         resp, body = self.request_manager.post('/os-hosts', body=values)
+        self.invalidate_property_catalog()
         return body['host']
 
     def get(self, host_id):
         """Describe host specifications such as name and details."""
         resp, body = self.request_manager.get('/os-hosts/%s' % host_id)
-        return body['host']
+        return self._record(body['host'])
 
     def update(self, host_id, values):
         """Update attributes of the host."""
@@ -40,18 +57,27 @@ class ComputeHostClientManager(base.BaseClientManager):
         resp, body = self.request_manager.put(
             '/os-hosts/%s' % host_id, body=values
         )
+        self.invalidate_property_catalog()
         return body['host']
 
     def delete(self, host_id):
         """Delete host with specified ID."""
         resp, body = self.request_manager.delete('/os-hosts/%s' % host_id)
+        self.invalidate_property_catalog()
 
     def list(self, sort_by=None):
         """List all hosts."""
         resp, body = self.request_manager.get('/os-hosts')
         hosts = body['hosts']
         if sort_by:
-            hosts = sorted(hosts, key=lambda host: host[sort_by])
+            hosts = utils.sort_records(hosts, sort_by)
+        return self._records(hosts)
+
+    def list_iter(self, page_size=base.DEFAULT_PAGE_SIZE):
+        """Iterate over all hosts, fetching them one page at a time."""
+        hosts = self._list_iter('/os-hosts', 'hosts', page_size=page_size)
+        if self.compact_records:
+            hosts = map(self._record, hosts)
         return hosts
 
     def list_properties(self, detail=False, all=False, sort_by=None):
@@ -75,21 +101,50 @@ class ComputeHostClientManager(base.BaseClientManager):
                 del p['values']
 
         if sort_by:
-            resource_properties = sorted(resource_properties,
-                                         key=lambda rp: rp[sort_by])
+            resource_properties = utils.sort_records(resource_properties,
+                                                     sort_by)
         return resource_properties
 
     def get_property(self, property_name):
-        resource_property = [
-            x for x in self.list_properties(detail=True)
-            if x['property'] == property_name]
-        if not resource_property:
+        """Describe a host property with its values.
+
+        Properties are looked up in a catalog of all of them, indexed by
+        name and kept for property_catalog_ttl seconds. A property missing
+        from a cached catalog is looked up again in a fresh one.
+        """
+        fetched = self._property_catalog_expired()
+        catalog = self._get_property_catalog()
+        if property_name not in catalog and not fetched:
+            self.invalidate_property_catalog()
+            catalog = self._get_property_catalog()
+        if property_name not in catalog:
             raise exception.ResourcePropertyNotFound()
-        return resource_property[0]
+        # Callers such as format_output_data() modify the returned dict.
+        return dict(catalog[property_name])
 
     def set_property(self, property_name, private):
         data = {'private': private}
         resp, body = self.request_manager.patch(
             '/os-hosts/properties/%s' % property_name, body=data)
+        self.invalidate_property_catalog()
 
         return body['resource_property']
+
+    def invalidate_property_catalog(self):
+        """Drop the cached property catalog."""
+        self._property_catalog = None
+
+    def _property_catalog_expired(self):
+        return (self._property_catalog is None or
+                time.monotonic() >= self._property_catalog_expiry)
+
+    def _get_property_catalog(self):
+        # NOTE: The API has no endpoint describing a single property, so the
+        #       catalog is built from the detailed property list.
+        if self._property_catalog_expired():
+            self._property_catalog = {
+                resource_property['property']: resource_property
+                for resource_property in self.list_properties(detail=True)}
+            self._property_catalog_expiry = (
+                time.monotonic() + self.property_catalog_ttl)
+        return self._property_catalog
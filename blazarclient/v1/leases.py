@@ -13,18 +13,59 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from concurrent import futures
+import datetime
+import time
+from urllib import parse
+
+from keystoneauth1 import exceptions as ks_exceptions
 from oslo_utils import timeutils
+import requests
 
 from blazarclient import base
+from blazarclient import exception
 from blazarclient.i18n import _
+from blazarclient import planning
+from blazarclient import records
 from blazarclient import utils
+from blazarclient import validation
+
+DEFAULT_CONCURRENCY = 8
+# Errors after which a lease is submitted again by create_many().
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+RETRY_EXCEPTIONS = (requests.ConnectionError, ks_exceptions.ConnectFailure)
+
+
+def _normalize_lease(values):
+    values = dict(values)
+    for key in ('start', 'end', 'before_end'):
+        if isinstance(values.get(key), datetime.datetime):
+            values[key] = utils.format_api_date(values[key])
+    values.setdefault('events', [])
+    return values
 
 
 class LeaseClientManager(base.BaseClientManager):
     """Manager for the lease connected requests."""
 
+    record_class = records.Lease
+
     def create(self, name, start, end, reservations, events, before_end=None):
-        """Creates lease from values passed."""
+        """Creates lease from values passed.
+
+        :raises: InvalidLeaseParameters if the values fail local
+                 validation, see blazarclient.validation.
+        """
+        validation.validate('lease', {
+            'name': name, 'start': start, 'end': end,
+            'reservations': reservations, 'events': events,
+            'before_end': before_end})
+        return self._create(name, start, end, reservations, events,
+                            before_end=before_end)
+
+    def _create(self, name, start, end, reservations, events,
+                before_end=None):
+        """Creates lease from values already validated."""
         values = {'name': name, 'start_date': start, 'end_date': end,
                   'reservations': reservations, 'events': events,
                   'before_end_date': before_end}
@@ -32,17 +73,104 @@ class LeaseClientManager(base.BaseClientManager):
         resp, body = self.request_manager.post('/leases', body=values)
         return body['lease']
 
+    def create_many(self, leases, concurrency=DEFAULT_CONCURRENCY, retries=0,
+                    retry_delay=1.0):
+        """Create many leases, submitting several of them at a time.
+
+        Every lease is validated locally before the first one is
+        submitted, so that a typo, including in the name of a key, does
+        not leave a batch half created.
+
+        :param leases: list of dicts of create() arguments, that is name,
+                       start, end, reservations and optionally events and
+                       before_end. Dates are datetimes or 'YYYY-MM-DD HH:MM'
+                       strings.
+        :param concurrency: maximum number of requests in flight.
+        :param retries: number of times a lease is submitted again after a
+                        connection failure or an HTTP 429, 502, 503 or 504
+                        error.
+        :param retry_delay: seconds before the first retry, doubled after
+                            each one.
+        :returns: a list with a dict per lease, in order, holding its index,
+                  name, the created lease or None, the error message or
+                  None, and the number of attempts.
+        :raises: InvalidLeaseParameters listing the problems of every
+                 invalid lease, if any.
+        """
+        leases = list(leases)
+        known_keys = validation.SCHEMAS['lease']['properties']
+        errors = []
+        for index, values in enumerate(leases):
+            errors.extend(('leases[%d].%s' % (index, location) if location
+                           else 'leases[%d]' % index, message)
+                          for location, message
+                          in validation.find_errors('lease', values))
+            # Unlike in the API body, which may take keys of newer API
+            # versions, create() has no argument for unknown keys.
+            errors.extend(('leases[%d].%s' % (index, key),
+                           _('is not a known key'))
+                          for key in values if key not in known_keys)
+        if errors:
+            raise exception.InvalidLeaseParameters(
+                _('Invalid leases, none was created:\n%s') % '\n'.join(
+                    '%s: %s' % error for error in errors),
+                errors=errors)
+        if concurrency < 1:
+            raise exception.BlazarClientException(
+                _('The concurrency must be positive.'))
+
+        def submit(item):
+            index, values = item
+            return self._create_with_retries(index, _normalize_lease(values),
+                                             retries, retry_delay)
+
+        with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(submit, enumerate(leases)))
+
+    def _create_with_retries(self, index, values, retries, retry_delay):
+        result = {'index': index, 'name': values['name'], 'lease': None,
+                  'error': None, 'attempts': 0}
+        while True:
+            result['attempts'] += 1
+            try:
+                result['lease'] = self._create(**values)
+                return result
+            except RETRY_EXCEPTIONS as e:
+                result['error'] = str(e)
+            except exception.BlazarClientException as e:
+                result['error'] = str(e)
+                if e.kwargs.get('code') not in RETRY_STATUS_CODES:
+                    return result
+            except (requests.RequestException,
+                    ks_exceptions.ClientException) as e:
+                result['error'] = str(e)
+                return result
+            if result['attempts'] > retries:
+                return result
+            time.sleep(retry_delay * 2 ** (result['attempts'] - 1))
+
     def get(self, lease_id):
         """Describes lease specifications such as name, status and locked
         condition.
         """
         resp, body = self.request_manager.get('/leases/%s' % lease_id)
-        return body['lease']
+        return self._record(body['lease'])
 
     def update(self, lease_id, name=None, prolong_for=None, reduce_by=None,
                end_date=None, advance_by=None, defer_by=None, start_date=None,
                reservations=None):
-        """Update attributes of the lease."""
+        """Update attributes of the lease.
+
+        :raises: InvalidLeaseParameters if the values fail local
+                 validation, see blazarclient.validation.
+        """
+        validation.validate('lease-update', {
+            key: value for key, value in (
+                ('name', name), ('prolong_for', prolong_for),
+                ('reduce_by', reduce_by), ('end_date', end_date),
+                ('advance_by', advance_by), ('defer_by', defer_by),
+                ('start_date', start_date), ('reservations', reservations))
+            if value})
         values = {}
         if name:
             values['name'] = name
@@ -54,8 +182,8 @@ class LeaseClientManager(base.BaseClientManager):
         if lease_end_date_change:
             lease = self.get(lease_id)
             if end_date:
-                date = timeutils.parse_strtime(end_date, utils.API_DATE_FORMAT)
-                values['end_date'] = date.strftime(utils.API_DATE_FORMAT)
+                values['end_date'] = utils.format_api_date(
+                    utils.parse_date(end_date))
             else:
                 self._add_lease_date(values, lease, 'end_date',
                                      lease_end_date_change,
@@ -65,9 +193,8 @@ class LeaseClientManager(base.BaseClientManager):
             if lease is None:
                 lease = self.get(lease_id)
             if start_date:
-                date = timeutils.parse_strtime(start_date,
-                                               utils.API_DATE_FORMAT)
-                values['start_date'] = date.strftime(utils.API_DATE_FORMAT)
+                values['start_date'] = utils.format_api_date(
+                    utils.parse_date(start_date))
             else:
                 self._add_lease_date(values, lease, 'start_date',
                                      lease_start_date_change,
@@ -86,18 +213,137 @@ class LeaseClientManager(base.BaseClientManager):
         """Deletes lease with specified ID."""
         resp, body = self.request_manager.delete('/leases/%s' % lease_id)
 
-    def list(self, sort_by=None):
-        """List all leases."""
-        resp, body = self.request_manager.get('/leases')
+    def list(self, sort_by=None, status=None, project_id=None, user_id=None,
+             name_prefix=None, overlap_start=None, overlap_end=None):
+        """List all leases.
+
+        Leases can be filtered by status, project, user, name prefix, and
+        by overlap with the window between overlap_start and overlap_end
+        (datetimes or 'YYYY-MM-DD HH:MM' strings). Filters are sent to the
+        server as query parameters and applied again to the response, so
+        they also work with servers ignoring them.
+        """
+        url, match = self._filtered_url(
+            status=status, project_id=project_id, user_id=user_id,
+            name_prefix=name_prefix, overlap_start=overlap_start,
+            overlap_end=overlap_end)
+        resp, body = self.request_manager.get(url)
         leases = body['leases']
+        if match:
+            leases = [lease for lease in leases if match(lease)]
         if sort_by:
-            leases = sorted(leases, key=lambda lease: lease[sort_by])
+            leases = utils.sort_records(leases, sort_by)
+        return self._records(leases)
+
+    def list_iter(self, page_size=base.DEFAULT_PAGE_SIZE, **filters):
+        """Iterate over all leases, fetching them one page at a time.
+
+        Accepts the same filters as list().
+        """
+        url, match = self._filtered_url(**filters)
+        leases = self._list_iter(url, 'leases', page_size=page_size)
+        if match:
+            leases = filter(match, leases)
+        if self.compact_records:
+            leases = map(self._record, leases)
         return leases
 
+    def _filtered_url(self, status=None, project_id=None, user_id=None,
+                      name_prefix=None, overlap_start=None,
+                      overlap_end=None):
+        """Return the lease list URL and a local filter for the filters."""
+        overlap_start = self._parse_filter_date(overlap_start)
+        overlap_end = self._parse_filter_date(overlap_end)
+        query = [(k, v) for k, v in (
+            ('status', status),
+            ('project_id', project_id),
+            ('user_id', user_id),
+            ('name_prefix', name_prefix),
+            ('overlap_start', overlap_start and
+             utils.format_api_date(overlap_start)),
+            ('overlap_end', overlap_end and
+             utils.format_api_date(overlap_end)),
+        ) if v is not None]
+        if not query:
+            return '/leases', None
+
+        # Values may be missing or null, leases without dates are left to
+        # the filtering of the API.
+        def match(lease):
+            if status is not None and (
+                    (lease.get('status') or '').upper() != status.upper()):
+                return False
+            if project_id is not None and lease.get(
+                    'project_id') != project_id:
+                return False
+            if user_id is not None and lease.get('user_id') != user_id:
+                return False
+            if name_prefix is not None and not (
+                    lease.get('name') or '').startswith(name_prefix):
+                return False
+            start_date = lease.get('start_date')
+            if (overlap_end is not None and start_date and
+                    utils.parse_lease_date(start_date) >= overlap_end):
+                return False
+            end_date = lease.get('end_date')
+            if (overlap_start is not None and end_date and
+                    utils.parse_lease_date(end_date) <= overlap_start):
+                return False
+            return True
+
+        return '/leases?%s' % parse.urlencode(query), match
+
+    @staticmethod
+    def _parse_filter_date(date):
+        if date is None or isinstance(date, datetime.datetime):
+            return date
+        try:
+            return utils.parse_date(date)
+        except ValueError:
+            raise exception.BlazarClientException(
+                _("Invalid date '%s', must be of the form "
+                  "'YYYY-MM-DD HH:MM'.") % date)
+
+    def find_slot(self, host_count, duration, resource_properties=None,
+                  not_before=None, not_after=None):
+        """Find the earliest window where enough hosts are free.
+
+        Hosts and their allocations are fetched once and searched locally.
+
+        :param host_count: number of hosts to reserve.
+        :param duration: length of the lease, as a timedelta, a number of
+                         seconds or a string such as '2d' or '12h'.
+        :param resource_properties: optional expression selecting hosts,
+                                    as used by host reservations.
+        :param not_before: earliest start, defaults to the current time.
+        :param not_after: latest start, unbounded by default.
+        :returns: a dict with the start_date and end_date of the window
+                  and the IDs of the free hosts, or None.
+        """
+        if isinstance(duration, datetime.timedelta):
+            duration = duration.total_seconds()
+        elif not isinstance(duration, (int, float)):
+            duration = utils.from_elapsed_time_to_seconds(duration)
+        if not_before is None:
+            not_before = timeutils.utcnow()
+
+        resp, body = self.request_manager.get('/os-hosts')
+        hosts = body['hosts']
+        resp, body = self.request_manager.get('/os-hosts/allocations')
+        slot = planning.earliest_slot(
+            hosts, body['allocations'], host_count, duration,
+            self._parse_filter_date(not_before),
+            not_after=self._parse_filter_date(not_after),
+            resource_properties=resource_properties)
+        if slot is None:
+            return None
+        start, end, host_ids = slot
+        return {'start_date': utils.format_api_date(start),
+                'end_date': utils.format_api_date(end),
+                'hosts': host_ids}
+
     def _add_lease_date(self, values, lease, key, delta_date, positive_delta):
         delta_sec = utils.from_elapsed_time_to_delta(
             delta_date,
             pos_sign=positive_delta)
-        date = timeutils.parse_strtime(lease[key],
-                                       utils.LEASE_DATE_FORMAT)
-        values[key] = (date + delta_sec).strftime(utils.API_DATE_FORMAT)
+        values[key], = utils.shift_dates([lease[key]], delta_sec)
@@ -13,8 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import datetime
 import logging
 
+from blazarclient import allocation_index
 from blazarclient import command
 from blazarclient import utils
 
@@ -28,6 +31,7 @@ class ShowAllocations(command.ShowCommand):
     id_pattern = RESOURCE_ID_PATTERN
     name_key = 'hypervisor_hostname'
     log = logging.getLogger(__name__ + '.ShowHostAllocation')
+    allow_mirror = True
 
     def get_parser(self, prog_name):
         parser = super(ShowAllocations, self).get_parser(prog_name)
@@ -58,7 +62,7 @@ class ShowAllocations(command.ShowCommand):
 
     def get_data(self, parsed_args):
         self.log.debug('get_data(%s)' % parsed_args)
-        blazar_client = self.get_client()
+        blazar_client = self.get_reader(parsed_args)
         resource_manager = getattr(blazar_client, self.resource)
 
         if self.allow_names:
@@ -72,16 +76,9 @@ class ShowAllocations(command.ShowCommand):
             res_id = parsed_args.id
 
         data = resource_manager.get(
-            self.args2body(parsed_args)['resource'], res_id)
-
-        if parsed_args.lease_id is not None:
-            data['reservations'] = list(
-                filter(lambda d: d['lease_id'] == parsed_args.lease_id,
-                       data['reservations']))
-        if parsed_args.reservation_id is not None:
-            data['reservations'] = list(
-                filter(lambda d: d['id'] == parsed_args.reservation_id,
-                       data['reservations']))
+            self.args2body(parsed_args)['resource'], res_id,
+            lease_id=parsed_args.lease_id,
+            reservation_id=parsed_args.reservation_id)
 
         self.format_output_data(data)
         return list(zip(*sorted(data.items())))
@@ -97,6 +94,7 @@ class ListAllocations(command.ListCommand):
     """List allocations for all resources of a type."""
     resource = 'allocation'
     log = logging.getLogger(__name__ + '.ListHostAllocations')
+    allow_mirror = True
     list_columns = ['resource_id', 'reservations']
 
     def get_parser(self, prog_name):
@@ -111,39 +109,177 @@ class ListAllocations(command.ListCommand):
             '--reservation-id',
             dest='reservation_id',
             default=None,
-            help='Show only allocations with specific reservation_id'
+            help='Show only resources with allocations for a specific '
+                 'reservation_id'
         )
         parser.add_argument(
             '--lease-id',
             dest='lease_id',
             default=None,
-            help='Show only allocations with specific lease_id'
+            help='Show only resources with allocations for a specific '
+                 'lease_id'
         )
         parser.add_argument(
             '--sort-by', metavar="<allocation_column>",
-            help='column name used to sort result',
+            help='columns used to sort result, as '
+                 '<column>[:asc|desc],...',
             default='resource_id'
         )
         return parser
 
+    def args2body(self, parsed_args):
+        params = super(ListAllocations, self).args2body(parsed_args)
+        if parsed_args.resource_type == 'host':
+            params.update(dict(resource='os-hosts'))
+        if parsed_args.lease_id is not None:
+            params['lease_id'] = parsed_args.lease_id
+        if parsed_args.reservation_id is not None:
+            params['reservation_id'] = parsed_args.reservation_id
+        return params
+
+
+class ListFreeResources(command.ListCommand):
+    """List resources without allocations during a time window."""
+    resource = 'allocation'
+    log = logging.getLogger(__name__ + '.ListFreeResources')
+    allow_mirror = True
+    list_columns = ['resource_id']
+    allow_stream = False
+    allow_limit = False
+
+    def get_parser(self, prog_name):
+        parser = super(ListFreeResources, self).get_parser(prog_name)
+        parser.add_argument(
+            'resource_type',
+            choices=['host'],
+            help='Show free resources of a resource type'
+        )
+        parser.add_argument(
+            '--start', '--start-date',
+            dest='start',
+            required=True,
+            help='Time (YYYY-MM-DD HH:MM) UTC TZ for the start of the window'
+        )
+        parser.add_argument(
+            '--end', '--end-date',
+            dest='end',
+            required=True,
+            help='Time (YYYY-MM-DD HH:MM) UTC TZ for the end of the window'
+        )
+        parser.add_argument(
+            '--count', metavar='<count>',
+            type=int,
+            default=None,
+            help='Show at most this many free resources'
+        )
+        return parser
+
     def get_data(self, parsed_args):
         self.log.debug('get_data(%s)' % parsed_args)
-        data = self.retrieve_list(parsed_args)
-
-        for resource in data:
-            if parsed_args.lease_id is not None:
-                resource['reservations'] = list(
-                    filter(lambda d: d['lease_id'] == parsed_args.lease_id,
-                           resource['reservations']))
-            if parsed_args.reservation_id is not None:
-                resource['reservations'] = list(
-                    filter(lambda d: d['id'] == parsed_args.reservation_id,
-                           resource['reservations']))
+        blazar_client = self.get_reader(parsed_args)
+        resource_manager = getattr(blazar_client, self.resource)
+        allocations = resource_manager.list(**self.args2body(parsed_args))
 
-        return self.setup_columns(data, parsed_args)
+        index = allocation_index.AllocationIndex(allocations)
+        free = index.free(parsed_args.start, parsed_args.end,
+                          count=parsed_args.count)
+        if parsed_args.count is not None and len(free) < parsed_args.count:
+            self.log.warning('Only %d of the %d requested %ss are free.',
+                             len(free), parsed_args.count,
+                             parsed_args.resource_type)
+        return self.setup_columns([{'resource_id': resource_id}
+                                   for resource_id in free], parsed_args)
 
     def args2body(self, parsed_args):
-        params = super(ListAllocations, self).args2body(parsed_args)
+        params = {}
         if parsed_args.resource_type == 'host':
             params.update(dict(resource='os-hosts'))
         return params
+
+
+class ListUtilization(command.ListCommand):
+    """List the reserved hosts over time, binned at a resolution."""
+    resource = 'allocation'
+    log = logging.getLogger(__name__ + '.ListUtilization')
+    allow_mirror = True
+    list_columns = ['group', 'time', 'reserved', 'capacity', 'utilization']
+    allow_stream = False
+    allow_limit = False
+
+    def get_parser(self, prog_name):
+        parser = super(ListUtilization, self).get_parser(prog_name)
+        parser.add_argument(
+            '--start-date',
+            dest='start',
+            default=None,
+            help='Time (YYYY-MM-DD HH:MM) UTC TZ for the start of the '
+                 'series (default: start of the first reservation)'
+        )
+        parser.add_argument(
+            '--end-date',
+            dest='end',
+            default=None,
+            help='Time (YYYY-MM-DD HH:MM) UTC TZ for the end of the '
+                 'series (default: end of the last reservation)'
+        )
+        parser.add_argument(
+            '--resolution', metavar='<resolution>',
+            default='1d',
+            help='Width of the time bins, e.g. 30m, 1h or 1d '
+                 '(default: 1d)'
+        )
+        parser.add_argument(
+            '--group-by', metavar='<host_property>',
+            dest='group_by',
+            default=None,
+            help='Host property, such as an extra capability tagging the '
+                 'aggregate of the hosts, used to group the series'
+        )
+        return parser
+
+    def get_data(self, parsed_args):
+        # NOTE: Imported here, as NumPy takes longer to import than the
+        #       rest of the CLI.
+        from blazarclient import analytics
+
+        self.log.debug('get_data(%s)' % parsed_args)
+        blazar_client = self.get_reader(parsed_args)
+        resolution = utils.from_elapsed_time_to_seconds(
+            parsed_args.resolution)
+        hosts = blazar_client.host.list()
+        groups = {str(host['id']): host.get(parsed_args.group_by)
+                  if parsed_args.group_by else None for host in hosts}
+        capacity = collections.Counter(groups.values())
+        arrays = analytics.allocation_arrays(
+            blazar_client.allocation.list(resource='os-hosts'), groups)
+
+        start = parsed_args.start and utils.to_timestamp(
+            parsed_args.start)
+        end = parsed_args.end and utils.to_timestamp(
+            parsed_args.end)
+        if start is None:
+            start = min([starts.min() for starts, ends, weights
+                         in arrays.values() if len(starts)], default=None)
+        if end is None:
+            end = max([ends.max() for starts, ends, weights
+                       in arrays.values() if len(ends)], default=None)
+        if start is None or end is None:
+            return self.setup_columns([], parsed_args)
+
+        rows = []
+        for group in sorted(capacity, key=str):
+            starts, ends, weights = arrays.get(group, ([], [], []))
+            times, reserved = analytics.utilization(
+                starts, ends, weights, start, end, resolution)
+            for time, count in zip(times, reserved):
+                row = {
+                    'time': (utils.EPOCH + datetime.timedelta(
+                        seconds=float(time))).strftime(utils.API_DATE_FORMAT),
+                    'reserved': round(float(count), 3),
+                    'capacity': capacity[group],
+                    'utilization': round(float(count) / capacity[group], 4),
+                }
+                if parsed_args.group_by:
+                    row['group'] = group
+                rows.append(row)
+        return self.setup_columns(rows, parsed_args)
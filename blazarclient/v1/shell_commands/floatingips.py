@@ -28,7 +28,8 @@ class ListFloatingIPs(command.ListCommand):
         parser = super(ListFloatingIPs, self).get_parser(prog_name)
         parser.add_argument(
             '--sort-by', metavar="<floatingip_column>",
-            help='column name used to sort result',
+            help='columns used to sort result, as '
+                 '<column>[:asc|desc],...',
             default='id'
         )
         return parser
@@ -16,7 +16,6 @@
 import logging
 
 from blazarclient import command
-from blazarclient import exception
 
 HOST_ID_PATTERN = '^[0-9]+$'
 
@@ -25,6 +24,7 @@ class ListHosts(command.ListCommand):
     """Print a list of hosts."""
     resource = 'host'
     log = logging.getLogger(__name__ + '.ListHosts')
+    allow_mirror = True
     list_columns = ['id', 'hypervisor_hostname', 'vcpus', 'memory_mb',
                     'local_gb']
 
@@ -32,7 +32,8 @@ class ListHosts(command.ListCommand):
         parser = super(ListHosts, self).get_parser(prog_name)
         parser.add_argument(
             '--sort-by', metavar="<host_column>",
-            help='column name used to sort result',
+            help='columns used to sort result, as '
+                 '<column>[:asc|desc],...',
             default='hypervisor_hostname'
         )
         return parser
@@ -45,6 +46,7 @@ class ShowHost(command.ShowCommand):
     name_key = 'hypervisor_hostname'
     id_pattern = HOST_ID_PATTERN
     log = logging.getLogger(__name__ + '.ShowHost')
+    allow_mirror = True
 
     def get_parser(self, prog_name):
         parser = super(ShowHost, self).get_parser(prog_name)
@@ -145,6 +147,8 @@ class ListHostProperties(command.ListCommand):
     resource = 'host'
     log = logging.getLogger(__name__ + '.ListHostProperties')
     list_columns = ['property', 'private', 'property_values']
+    allow_stream = False
+    allow_limit = False
 
     def args2body(self, parsed_args):
         params = {
@@ -152,11 +156,8 @@ class ListHostProperties(command.ListCommand):
             'all': parsed_args.all,
         }
         if parsed_args.sort_by:
-            if parsed_args.sort_by in self.list_columns:
-                params['sort_by'] = parsed_args.sort_by
-            else:
-                msg = 'Invalid sort option %s' % parsed_args.sort_by
-                raise exception.BlazarClientException(msg)
+            self.validate_sort_by(parsed_args.sort_by)
+            params['sort_by'] = parsed_args.sort_by
 
         return params
 
@@ -178,7 +179,8 @@ class ListHostProperties(command.ListCommand):
         )
         parser.add_argument(
             '--sort-by', metavar="<property_column>",
-            help='column name used to sort result',
+            help='columns used to sort result, as '
+                 '<column>[:asc|desc],...',
             default='property'
         )
         parser.add_argument(
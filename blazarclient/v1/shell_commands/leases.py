@@ -16,14 +16,17 @@
 import argparse
 import datetime
 import logging
-import re
 
+from cliff import show
 from oslo_serialization import jsonutils
 from oslo_utils import strutils
 from oslo_utils import timeutils
 
 from blazarclient import command
 from blazarclient import exception
+from blazarclient.i18n import _
+from blazarclient import utils
+from blazarclient.v1 import leases
 
 
 # All valid reservation parameters must be added to CREATE_RESERVATION_KEYS to
@@ -65,27 +68,94 @@ CREATE_RESERVATION_KEYS = {
 }
 
 
+def _parse_key_values(str_params, keys, list_keys, err_msg):
+    """Parse a '<key=value>,...' reservation argument into a dict.
+
+    Integer values are converted to int and values of list_keys are
+    decoded as JSON.
+    """
+    try:
+        pairs = utils.split_key_values(str_params, keys)
+    except ValueError:
+        raise exception.IncorrectLease(err_msg)
+    params = {}
+    for k, v in pairs:
+        if k in params:
+            raise exception.DuplicatedLeaseParameters(err_msg)
+        if k in list_keys:
+            try:
+                v = jsonutils.loads(v)
+            except ValueError:
+                raise exception.IncorrectLease(err_msg)
+        elif strutils.is_int_like(v):
+            v = int(v)
+        params[k] = v
+    return params
+
+
 class ListLeases(command.ListCommand):
     """Print a list of leases."""
     resource = 'lease'
     log = logging.getLogger(__name__ + '.ListLeases')
+    allow_mirror = True
     list_columns = ['id', 'name', 'start_date', 'end_date']
 
     def get_parser(self, prog_name):
         parser = super(ListLeases, self).get_parser(prog_name)
         parser.add_argument(
             '--sort-by', metavar="<lease_column>",
-            help='column name used to sort result',
+            help='columns used to sort result, as '
+                 '<column>[:asc|desc],...',
             default='name'
         )
+        parser.add_argument(
+            '--status', metavar='<status>',
+            help='Show only leases with this status',
+            default=None
+        )
+        parser.add_argument(
+            '--project-id', metavar='<project_id>',
+            help='Show only leases of this project',
+            default=None
+        )
+        parser.add_argument(
+            '--user-id', metavar='<user_id>',
+            help='Show only leases of this user',
+            default=None
+        )
+        parser.add_argument(
+            '--name-prefix', metavar='<prefix>',
+            help='Show only leases whose name starts with this prefix',
+            default=None
+        )
+        parser.add_argument(
+            '--overlap-start', metavar='<YYYY-MM-DD HH:MM>',
+            help='Show only leases ending after this time (UTC TZ)',
+            default=None
+        )
+        parser.add_argument(
+            '--overlap-end', metavar='<YYYY-MM-DD HH:MM>',
+            help='Show only leases starting before this time (UTC TZ)',
+            default=None
+        )
         return parser
 
+    def args2body(self, parsed_args):
+        params = super(ListLeases, self).args2body(parsed_args)
+        for key in ('status', 'project_id', 'user_id', 'name_prefix',
+                    'overlap_start', 'overlap_end'):
+            value = getattr(parsed_args, key, None)
+            if value is not None:
+                params[key] = value
+        return params
+
 
 class ShowLease(command.ShowCommand):
     """Show details about the given lease."""
     resource = 'lease'
     json_indent = 4
     log = logging.getLogger(__name__ + '.ShowLease')
+    allow_mirror = True
 
     def get_parser(self, prog_name):
         parser = super(ShowLease, self).get_parser(prog_name)
@@ -105,13 +175,35 @@ class CreateLeaseBase(command.CreateCommand):
     log = logging.getLogger(__name__ + '.CreateLease')
     default_start = 'now'
     default_end = timeutils.utcnow() + datetime.timedelta(days=1)
+    # Number of leases which could not be created with --from-file.
+    failed_leases = 0
 
     def get_parser(self, prog_name):
         parser = super(CreateLeaseBase, self).get_parser(prog_name)
         parser.add_argument(
-            'name', metavar=self.resource.upper(),
+            'name', metavar=self.resource.upper(), nargs='?',
             help='Name for the %s' % self.resource
         )
+        parser.add_argument(
+            '--from-file', metavar='<file>',
+            help='Create the leases listed in a YAML or JSON file instead, '
+                 'each with a name, start, end, reservations and optional '
+                 'events and before_end. Every lease is checked before any '
+                 'is created.',
+            default=None
+        )
+        parser.add_argument(
+            '--concurrency', metavar='<count>', type=int,
+            help='Maximum number of leases created at a time with '
+                 '--from-file (default: %d)' % leases.DEFAULT_CONCURRENCY,
+            default=leases.DEFAULT_CONCURRENCY
+        )
+        parser.add_argument(
+            '--retries', metavar='<count>', type=int,
+            help='Number of times a lease is submitted again after a '
+                 'transient error with --from-file (default: 0)',
+            default=0
+        )
         parser.add_argument(
             '--start-date',
             dest='start',
@@ -161,6 +253,79 @@ class CreateLeaseBase(command.CreateCommand):
             raise exception.IncorrectLease
         return params
 
+    def run(self, parsed_args):
+        result = super(CreateLeaseBase, self).run(parsed_args)
+        return 1 if self.failed_leases else result
+
+    def get_data(self, parsed_args):
+        if not parsed_args.from_file:
+            if not parsed_args.name:
+                raise exception.BlazarClientException(
+                    _('A lease name or --from-file is required.'))
+            return super(CreateLeaseBase, self).get_data(parsed_args)
+        if parsed_args.name or parsed_args.reservations or getattr(
+                parsed_args, 'physical_reservations', None):
+            raise exception.BlazarClientException(
+                _('--from-file cannot be used with a lease name or '
+                  'reservations.'))
+
+        self.failed_leases = 0
+        results = self.get_client().lease.create_many(
+            self._load_leases(parsed_args.from_file),
+            concurrency=parsed_args.concurrency,
+            retries=parsed_args.retries)
+        rows = []
+        for result in results:
+            row = {'index': result['index'], 'name': result['name']}
+            if result['lease'] is not None:
+                row['id'] = result['lease']['id']
+            else:
+                row['error'] = result['error']
+                self.failed_leases += 1
+            rows.append(row)
+        # One line per lease, whatever json_indent is.
+        data = {'created': len(rows) - self.failed_leases,
+                'failed': self.failed_leases,
+                'leases': utils.format_nested(rows)}
+        return list(zip(*sorted(data.items())))
+
+    def _load_leases(self, path):
+        """Load lease values from a file, with reservation defaults."""
+        # NOTE: Imported here, so that the other commands do not import
+        #       PyYAML.
+        import yaml
+
+        try:
+            with open(path) as f:
+                content = yaml.safe_load(f)
+        except (OSError, yaml.YAMLError) as e:
+            raise exception.BlazarClientException(
+                _("Unable to load leases from '%(path)s': %(error)s") %
+                {'path': path, 'error': e})
+        if isinstance(content, dict):
+            content = content.get('leases')
+        if not isinstance(content, list):
+            raise exception.BlazarClientException(
+                _("'%s' must hold a list of leases or a mapping with a "
+                  "leases list.") % path)
+        for values in content:
+            if isinstance(values, dict) and isinstance(
+                    values.get('reservations'), list):
+                values['reservations'] = [
+                    self._reservation_defaults(reservation)
+                    for reservation in values['reservations']]
+        return content
+
+    @staticmethod
+    def _reservation_defaults(reservation):
+        if not isinstance(reservation, dict):
+            return reservation
+        defaults = CREATE_RESERVATION_KEYS.get(
+            reservation.get('resource_type'), {})
+        values = {k: v for k, v in defaults.items() if v is not None}
+        values.update(reservation)
+        return values
+
     def _generate_params(self, parsed_args):
         params = {}
         if parsed_args.name:
@@ -168,14 +333,12 @@ class CreateLeaseBase(command.CreateCommand):
         if not isinstance(parsed_args.start, datetime.datetime):
             if parsed_args.start != 'now':
                 try:
-                    parsed_args.start = datetime.datetime.strptime(
-                        parsed_args.start, '%Y-%m-%d %H:%M')
+                    parsed_args.start = utils.parse_date(parsed_args.start)
                 except ValueError:
                     raise exception.IncorrectLease
         if not isinstance(parsed_args.end, datetime.datetime):
             try:
-                parsed_args.end = datetime.datetime.strptime(
-                    parsed_args.end, '%Y-%m-%d %H:%M')
+                parsed_args.end = utils.parse_date(parsed_args.end)
             except ValueError:
                 raise exception.IncorrectLease
 
@@ -189,23 +352,21 @@ class CreateLeaseBase(command.CreateCommand):
 
         if parsed_args.before_end:
             try:
-                parsed_args.before_end = datetime.datetime.strptime(
-                    parsed_args.before_end, '%Y-%m-%d %H:%M')
+                parsed_args.before_end = utils.parse_date(
+                    parsed_args.before_end)
             except ValueError:
                 raise exception.IncorrectLease
             if (parsed_args.before_end < start or
                     parsed_args.end < parsed_args.before_end):
                 raise exception.IncorrectLease
-            params['before_end'] = datetime.datetime.strftime(
-                parsed_args.before_end, '%Y-%m-%d %H:%M')
+            params['before_end'] = utils.format_api_date(
+                parsed_args.before_end)
 
         if parsed_args.start == 'now':
             params['start'] = parsed_args.start
         else:
-            params['start'] = datetime.datetime.strftime(parsed_args.start,
-                                                         '%Y-%m-%d %H:%M')
-        params['end'] = datetime.datetime.strftime(parsed_args.end,
-                                                   '%Y-%m-%d %H:%M')
+            params['start'] = utils.format_api_date(parsed_args.start)
+        params['end'] = utils.format_api_date(parsed_args.end)
 
         params['reservations'] = []
         params['events'] = []
@@ -254,9 +415,8 @@ class CreateLeaseBase(command.CreateCommand):
                 raise exception.IncorrectLease(err_msg)
             event_date = event_info['event_date']
             try:
-                date = datetime.datetime.strptime(event_date, '%Y-%m-%d %H:%M')
-                event_date = datetime.datetime.strftime(date, '%Y-%m-%d %H:%M')
-                event_info['event_date'] = event_date
+                event_info['event_date'] = utils.format_api_date(
+                    utils.parse_date(event_date))
             except ValueError:
                 raise exception.IncorrectLease
             events.append(event_info)
@@ -266,33 +426,16 @@ class CreateLeaseBase(command.CreateCommand):
         return params
 
     def _parse_params(self, str_params, default, err_msg):
-        request_params = {}
-        prog = re.compile('^(?:(.*),)?(%s)=(.*)$'
-                          % "|".join(default.keys()))
-
-        while str_params != "":
-            match = prog.search(str_params)
-
-            if match is None:
-                raise exception.IncorrectLease(err_msg)
-
-            self.log.info("Matches: %s", match.groups())
-            k, v = match.group(2, 3)
-            if k in request_params.keys():
-                raise exception.DuplicatedLeaseParameters(err_msg)
-            else:
-                if strutils.is_int_like(v):
-                    request_params[k] = int(v)
-                elif isinstance(default[k], list):
-                    request_params[k] = jsonutils.loads(v)
-                else:
-                    request_params[k] = v
-
-            str_params = match.group(1) if match.group(1) else ""
+        # The '.*' key of the 'others' defaults accepts any key.
+        keys = None if '.*' in default else default
+        list_keys = [k for k, v in default.items() if isinstance(v, list)]
+        request_params = _parse_key_values(str_params, keys, list_keys,
+                                           err_msg)
+        self.log.info("Matches: %s", request_params)
 
         request_params.update({k: v for k, v in default.items()
                                if k not in request_params.keys() and
-                               v is not None})
+                               v is not None and k != '.*'})
         return request_params
 
 
@@ -466,22 +609,8 @@ class UpdateLease(command.UpdateCommand):
                 err_msg = ("Invalid reservation argument '%s'. "
                            "Reservation arguments must be of the form "
                            "--reservation <key=value>" % res_str)
-                res_info = {}
-                prog = re.compile('^(?:(.*),)?(%s)=(.*)$' % '|'.join(keys))
-
-                def parse_params(params):
-                    match = prog.search(params)
-                    if match:
-                        k, v = match.group(2, 3)
-                        if k in list_keys:
-                            v = jsonutils.loads(v)
-                        elif strutils.is_int_like(v):
-                            v = int(v)
-                        res_info[k] = v
-                        if match.group(1) is not None:
-                            parse_params(match.group(1))
-
-                parse_params(res_str)
+                res_info = _parse_key_values(res_str, keys, list_keys,
+                                             err_msg)
                 if res_info:
                     if 'id' not in res_info:
                         raise exception.IncorrectLease(
@@ -494,6 +623,58 @@ class UpdateLease(command.UpdateCommand):
         return params
 
 
+class FindLeaseSlot(command.BlazarCommand, show.ShowOne):
+    """Find the earliest window where enough hosts can be reserved."""
+    resource = 'lease'
+    log = logging.getLogger(__name__ + '.FindLeaseSlot')
+
+    def get_parser(self, prog_name):
+        parser = super(FindLeaseSlot, self).get_parser(prog_name)
+        parser.add_argument(
+            '--count', metavar='<count>',
+            type=int,
+            required=True,
+            help='Number of hosts to reserve'
+        )
+        parser.add_argument(
+            '--duration', metavar='<duration>',
+            required=True,
+            help='Length of the lease, e.g. 12h or 2d'
+        )
+        parser.add_argument(
+            '--resource-properties', metavar='<resource_properties>',
+            default=None,
+            help='JSON expression selecting the hosts, see doc'
+        )
+        parser.add_argument(
+            '--not-before', metavar='<YYYY-MM-DD HH:MM>',
+            default=None,
+            help='Earliest start of the lease (UTC TZ, default: now)'
+        )
+        parser.add_argument(
+            '--not-after', metavar='<YYYY-MM-DD HH:MM>',
+            default=None,
+            help='Latest start of the lease (UTC TZ, default: unbounded)'
+        )
+        return parser
+
+    def get_data(self, parsed_args):
+        self.log.debug('get_data(%s)' % parsed_args)
+        blazar_client = self.get_client()
+        resource_manager = getattr(blazar_client, self.resource)
+        data = resource_manager.find_slot(
+            parsed_args.count, parsed_args.duration,
+            resource_properties=parsed_args.resource_properties,
+            not_before=parsed_args.not_before,
+            not_after=parsed_args.not_after)
+        if data is None:
+            raise exception.BlazarClientException(
+                'No window found where %d hosts are free for %s.' % (
+                    parsed_args.count, parsed_args.duration))
+        self.format_output_data(data)
+        return list(zip(*sorted(data.items())))
+
+
 class DeleteLease(command.DeleteCommand):
     """Delete a lease."""
     resource = 'lease'
@@ -0,0 +1,68 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+from cliff import lister
+
+from blazarclient import base
+from blazarclient import command
+
+SYNC_COLUMNS = ('collection', 'added', 'updated', 'deleted', 'unchanged')
+# blazarclient.mirror.COLLECTIONS, which is not imported with the commands
+# so that they do not import sqlite3.
+COLLECTIONS = ('lease', 'host', 'allocation')
+
+
+class SyncMirror(command.BlazarCommand, lister.Lister):
+    """Update the local mirror of leases, hosts and allocations."""
+    log = logging.getLogger(__name__ + '.SyncMirror')
+
+    def get_parser(self, prog_name):
+        parser = super(SyncMirror, self).get_parser(prog_name)
+        parser.add_argument(
+            '--path', metavar='<path>',
+            default=None,
+            help='Path of the mirror database (default: BLAZAR_MIRROR or '
+                 'a file per endpoint and project in ~/.cache/blazarclient)'
+        )
+        parser.add_argument(
+            '--resource',
+            choices=COLLECTIONS,
+            action='append',
+            dest='collections',
+            default=[],
+            help='Resource to sync, can be repeated (default: all)'
+        )
+        parser.add_argument(
+            '--page-size', metavar='<page_size>',
+            type=int,
+            default=base.DEFAULT_PAGE_SIZE,
+            help='Number of records to fetch per request (default: %d)' %
+                 base.DEFAULT_PAGE_SIZE
+        )
+        return parser
+
+    def get_data(self, parsed_args):
+        from blazarclient import mirror
+
+        self.log.debug('get_data(%s)' % parsed_args)
+        client = self.get_client()
+        path = parsed_args.path or mirror.default_path(mirror.source(client))
+        with mirror.Mirror(path) as local_mirror:
+            stats = local_mirror.sync(
+                client, collections=parsed_args.collections or COLLECTIONS,
+                page_size=parsed_args.page_size)
+        return SYNC_COLUMNS, [
+            (collection,) + tuple(stats[collection][column]
+                                  for column in SYNC_COLUMNS[1:])
+            for collection in COLLECTIONS if collection in stats]
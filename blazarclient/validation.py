@@ -0,0 +1,361 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline validation of lease and reservation parameters.
+
+Lease bodies are checked against the schemas below before any request is
+sent, so that mistakes such as a malformed resource_properties filter or a
+min greater than max are reported with their location, for example
+``reservations[1].min``, without a round trip to the API.
+
+Schemas use a subset of JSON Schema: type, properties, required,
+additionalProperties, items, minimum, minLength, enum, pattern, $ref to
+another schema of SCHEMAS by name, and the date, date-or-now and
+json-filter formats. Two extensions are supported: x-discriminator, which
+selects the schema of an object from one of its properties, and x-ordered,
+which lists pairs of properties whose values must not decrease. Each schema
+is compiled once, on first use, into nested validation functions.
+
+Integers may be given as strings, such as the values of a YAML file, which
+the API accepts as well. Unknown keys of the schemas whose
+additionalProperties is false are only logged as warnings, as newer API
+versions may accept them.
+"""
+
+import collections.abc
+import datetime
+import functools
+import logging
+import re
+
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
+
+from blazarclient import exception
+from blazarclient.i18n import _
+from blazarclient import utils
+
+_FILTER = {'type': 'string', 'format': 'json-filter'}
+_AFFINITY = {'type': ['string', 'boolean', 'null']}
+_COUNT = {'type': 'integer', 'minimum': 0}
+_AMOUNT = {'type': 'integer', 'minimum': 1}
+_ELAPSED_TIME = {'type': 'string', 'pattern': utils.ELAPSED_TIME_REGEX}
+_INTEGER = re.compile(r'\s*[-+]?\d+\s*\Z')
+
+LOG = logging.getLogger(__name__)
+
+
+def _reservation_schema(resource_type, properties, required=(),
+                        ordered=()):
+    properties = dict(properties, resource_type={
+        'type': 'string', 'enum': [resource_type]})
+    return {'type': 'object',
+            'properties': properties,
+            'required': ['resource_type'] + list(required),
+            'additionalProperties': False,
+            'x-ordered': list(ordered)}
+
+
+SCHEMAS = {
+    'lease': {
+        'type': 'object',
+        'properties': {
+            'name': {'type': 'string', 'minLength': 1},
+            'start': {'format': 'date-or-now'},
+            'end': {'format': 'date'},
+            'before_end': {'format': 'date'},
+            'reservations': {'type': 'array',
+                             'items': {'$ref': 'reservation'}},
+            'events': {'type': 'array', 'items': {'$ref': 'event'}},
+        },
+        'required': ['name', 'start', 'end'],
+        'additionalProperties': False,
+        'x-ordered': [['start', 'end'], ['start', 'before_end'],
+                      ['before_end', 'end']],
+    },
+    'lease-update': {
+        'type': 'object',
+        'properties': {
+            'name': {'type': 'string', 'minLength': 1},
+            'prolong_for': _ELAPSED_TIME,
+            'reduce_by': _ELAPSED_TIME,
+            'defer_by': _ELAPSED_TIME,
+            'advance_by': _ELAPSED_TIME,
+            'start_date': {'format': 'date'},
+            'end_date': {'format': 'date'},
+            'reservations': {'type': 'array',
+                             'items': {'$ref': 'reservation-update'}},
+        },
+        'additionalProperties': False,
+        'x-ordered': [['start_date', 'end_date']],
+    },
+    'event': {
+        'type': 'object',
+        'properties': {
+            'event_type': {'type': 'string', 'minLength': 1},
+            'event_date': {'format': 'date'},
+        },
+        'required': ['event_type', 'event_date'],
+        'additionalProperties': False,
+    },
+    'reservation': {
+        'type': 'object',
+        'required': ['resource_type'],
+        'x-discriminator': {
+            'property': 'resource_type',
+            'mapping': {
+                'physical:host': 'physical:host',
+                'virtual:instance': 'virtual:instance',
+                'virtual:floatingip': 'virtual:floatingip',
+                'flavor:instance': 'flavor:instance',
+            },
+        },
+    },
+    'physical:host': _reservation_schema(
+        'physical:host',
+        {'min': _AMOUNT, 'max': _AMOUNT,
+         'hypervisor_properties': _FILTER, 'resource_properties': _FILTER,
+         'before_end': {'type': ['string', 'null']}},
+        required=['min', 'max'], ordered=[['min', 'max']]),
+    'virtual:instance': _reservation_schema(
+        'virtual:instance',
+        {'vcpus': _AMOUNT, 'memory_mb': _AMOUNT, 'disk_gb': _COUNT,
+         'amount': _AMOUNT, 'affinity': _AFFINITY,
+         'resource_properties': _FILTER},
+        required=['vcpus', 'memory_mb', 'disk_gb', 'amount']),
+    'virtual:floatingip': _reservation_schema(
+        'virtual:floatingip',
+        {'amount': _AMOUNT, 'network_id': {'type': 'string'},
+         'required_floatingips': {'type': 'array',
+                                  'items': {'type': 'string'}}},
+        required=['network_id']),
+    'flavor:instance': _reservation_schema(
+        'flavor:instance',
+        {'flavor_id': {'type': 'string'}, 'amount': _AMOUNT,
+         'affinity': _AFFINITY},
+        required=['flavor_id', 'amount']),
+    'reservation-update': {
+        'type': 'object',
+        'properties': {
+            'id': {'type': 'string', 'minLength': 1},
+            'min': _AMOUNT, 'max': _AMOUNT,
+            'hypervisor_properties': _FILTER, 'resource_properties': _FILTER,
+            'vcpus': _AMOUNT, 'memory_mb': _AMOUNT, 'disk_gb': _COUNT,
+            'amount': _AMOUNT, 'affinity': _AFFINITY,
+            'network_id': {'type': 'string'},
+            'required_floatingips': {'type': 'array',
+                                     'items': {'type': 'string'}},
+        },
+        'required': ['id'],
+        'additionalProperties': False,
+        'x-ordered': [['min', 'max']],
+    },
+}
+
+_TYPES = {
+    'string': lambda value: isinstance(value, str),
+    'integer': lambda value: (
+        (isinstance(value, int) and not isinstance(value, bool)) or
+        (isinstance(value, str) and _INTEGER.match(value) is not None)),
+    'boolean': lambda value: isinstance(value, bool),
+    'null': lambda value: value is None,
+    'array': lambda value: isinstance(value, (list, tuple)),
+    'object': lambda value: isinstance(value, collections.abc.Mapping),
+}
+
+
+def _location(path, key):
+    if isinstance(key, int):
+        return '%s[%d]' % (path, key)
+    return '%s.%s' % (path, key) if path else key
+
+
+def _to_date(value):
+    if isinstance(value, datetime.datetime):
+        return value
+    if value == 'now':
+        return timeutils.utcnow()
+    return utils.parse_date(value)
+
+
+def _check_date(value, allow_now=False):
+    if allow_now and value == 'now':
+        return None
+    try:
+        _to_date(value)
+    except (TypeError, ValueError):
+        if allow_now:
+            return _("must be 'now' or a date of the form YYYY-MM-DD HH:MM")
+        return _('must be a date of the form YYYY-MM-DD HH:MM')
+    return None
+
+
+def _check_filter(value):
+    if not value:
+        return None
+    try:
+        expression = jsonutils.loads(value)
+    except ValueError as e:
+        return _('must be a JSON filter expression: %s') % e
+    if not isinstance(expression, list):
+        return _('must be a JSON filter expression, such as '
+                 '["==", "$key", "value"]')
+    return None
+
+
+_FORMATS = {
+    'date': _check_date,
+    'date-or-now': functools.partial(_check_date, allow_now=True),
+    'json-filter': _check_filter,
+}
+
+
+def _ordering_value(value):
+    """Return a value comparable with others of its kind, or None."""
+    if isinstance(value, (int, datetime.datetime)):
+        return value
+    if isinstance(value, str) and _INTEGER.match(value):
+        return int(value)
+    try:
+        return _to_date(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def get_validator(name):
+    """Return the compiled validator of a schema of SCHEMAS.
+
+    Validators are called with a value, its location and a list to which
+    (location, message) tuples are appended.
+    """
+    return _compile(SCHEMAS[name])
+
+
+def _compile(schema):
+    if '$ref' in schema:
+        name = schema['$ref']
+        # Referenced schemas are compiled on first use, so that schemas
+        # can refer to each other.
+        return lambda value, path, errors: get_validator(name)(
+            value, path, errors)
+
+    checks = []
+    types = schema.get('type')
+    if types is not None:
+        if isinstance(types, str):
+            types = [types]
+        predicates = [_TYPES[t] for t in types]
+        type_error = _('must be of type %s') % ' or '.join(types)
+    else:
+        predicates = None
+
+    if 'enum' in schema:
+        choices = schema['enum']
+        message = _('must be one of %s') % ', '.join(map(str, choices))
+        checks.append(lambda value: None if value in choices else message)
+    if 'minimum' in schema:
+        minimum = schema['minimum']
+        message = _('must be at least %s') % minimum
+        # Only integers have a minimum, which may be given as strings.
+        checks.append(
+            lambda value: None if int(value) >= minimum else message)
+    if 'minLength' in schema:
+        min_length = schema['minLength']
+        message = _('must be at least %d characters long') % min_length
+        checks.append(
+            lambda value: None if len(value) >= min_length else message)
+    if 'pattern' in schema:
+        pattern = re.compile(schema['pattern'])
+        message = _('must match %s') % schema['pattern']
+        checks.append(
+            lambda value: None if pattern.match(value) else message)
+    if 'format' in schema:
+        checks.append(_FORMATS[schema['format']])
+
+    properties = {key: _compile(subschema) for key, subschema
+                  in schema.get('properties', {}).items()}
+    required = schema.get('required', ())
+    additional = schema.get('additionalProperties', True)
+    items = schema.get('items') and _compile(schema['items'])
+    discriminator = schema.get('x-discriminator')
+    ordered = schema.get('x-ordered', ())
+
+    def validate(value, path, errors):
+        if predicates is not None and not any(
+                predicate(value) for predicate in predicates):
+            errors.append((path, type_error))
+            return
+        for check in checks:
+            message = check(value)
+            if message is not None:
+                errors.append((path, message))
+                return
+        if isinstance(value, collections.abc.Mapping):
+            _validate_object(value, path, errors)
+        elif items is not None and isinstance(value, (list, tuple)):
+            for index, item in enumerate(value):
+                items(item, _location(path, index), errors)
+
+    def _validate_object(value, path, errors):
+        for key in required:
+            if value.get(key) in (None, ''):
+                errors.append((_location(path, key), _('is required')))
+        for key, item in value.items():
+            if key in properties:
+                # None means unset, and an empty required value was
+                # reported above.
+                if item is None or (item == '' and key in required):
+                    continue
+                properties[key](item, _location(path, key), errors)
+            elif not additional:
+                LOG.warning('%s is not a known key, it is sent to the API '
+                            'as is.', _location(path, key))
+        if discriminator is not None:
+            name = discriminator['mapping'].get(
+                value.get(discriminator['property']))
+            if name is not None:
+                get_validator(name)(value, path, errors)
+        for low, high in ordered:
+            low_value = _ordering_value(value.get(low))
+            high_value = _ordering_value(value.get(high))
+            if (low_value is not None and high_value is not None and
+                    type(low_value) is type(high_value) and
+                    high_value < low_value):
+                errors.append((_location(path, high),
+                               _('must not be less than %s') % low))
+
+    return validate
+
+
+def find_errors(name, values):
+    """Return the (location, message) tuples of each problem of values.
+
+    :param name: name of the schema in SCHEMAS, such as 'lease'.
+    """
+    found = []
+    get_validator(name)(values, '', found)
+    return found
+
+
+def validate(name, values):
+    """Validate values against a schema of SCHEMAS.
+
+    :raises: InvalidLeaseParameters listing every problem found.
+    """
+    found = find_errors(name, values)
+    if found:
+        raise exception.InvalidLeaseParameters(
+            _('Invalid lease parameters:\n%s') % '\n'.join(
+                '%s: %s' % (location or '<lease>', message)
+                for location, message in found),
+            errors=found)
@@ -0,0 +1,104 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the allocation index against a linear scan.
+
+Run with ``python -m perf.allocation_index``.
+"""
+
+import argparse
+import datetime
+import random
+import sys
+import time
+
+from blazarclient import allocation_index
+from blazarclient import utils
+
+from perf import timing
+
+START = datetime.datetime(2026, 1, 1)
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+
+def make_allocations(hosts=10000, reservations=100, seed=0):
+    """Return synthetic host allocations with back to back reservations."""
+    rand = random.Random(seed)
+    allocations = []
+    for host in range(hosts):
+        date = START + datetime.timedelta(hours=rand.randint(0, 48))
+        host_reservations = []
+        for i in range(reservations):
+            end = date + datetime.timedelta(hours=rand.randint(4, 72))
+            host_reservations.append({
+                'id': '%d-%d' % (host, i),
+                'lease_id': '%d-%d' % (host, i),
+                'start_date': date.strftime(DATE_FORMAT),
+                'end_date': end.strftime(DATE_FORMAT),
+            })
+            date = end + datetime.timedelta(hours=rand.randint(0, 48))
+        allocations.append({'resource_id': str(host),
+                            'reservations': host_reservations})
+    return allocations
+
+
+def _linear_free(allocations, start, end):
+    start = utils.to_timestamp(start)
+    end = utils.to_timestamp(end)
+    free = []
+    for allocation in allocations:
+        for reservation in allocation['reservations']:
+            if (utils.to_timestamp(reservation['start_date']) <
+                    end and start < utils.to_timestamp(
+                        reservation['end_date'])):
+                break
+        else:
+            free.append(allocation['resource_id'])
+    return free
+
+
+def run(hosts=10000, reservations=100, number=5, repeat=3):
+    allocations = make_allocations(hosts, reservations)
+    start = time.perf_counter()
+    index = allocation_index.AllocationIndex(allocations)
+    build = time.perf_counter() - start
+
+    window = (START + datetime.timedelta(days=60),
+              START + datetime.timedelta(days=64, hours=9))
+    assert index.free(*window) == _linear_free(allocations, *window)
+    return {
+        'build_seconds': build,
+        'overlapping': timing.measure(
+            lambda: index.overlapping(*window), number, repeat),
+        'free': timing.measure(lambda: index.free(*window), number, repeat),
+        'free_count_10': timing.measure(
+            lambda: index.free(*window, count=10), number, repeat),
+        'linear_free': timing.measure(
+            lambda: _linear_free(allocations, *window), 1, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hosts', type=int, default=10000)
+    parser.add_argument('--reservations', type=int, default=100,
+                        help='Reservations per host.')
+    args = parser.parse_args()
+    results = run(args.hosts, args.reservations)
+    sys.stdout.write('%-40s %10.3f s\n' % (
+        'build', results.pop('build_seconds')))
+    for name, result in results.items():
+        timing.report(name, result)
+
+
+if __name__ == '__main__':
+    main()
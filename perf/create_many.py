@@ -0,0 +1,68 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of bulk lease creation against a server with latency.
+
+Run with ``python -m perf.create_many``. Requests are answered
+by a fake request manager sleeping for the given latency.
+"""
+
+import argparse
+import time
+
+from blazarclient.v1 import leases
+
+from perf import timing
+
+
+class _SlowRequestManager(object):
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def post(self, url, body):
+        time.sleep(self.latency)
+        return None, {'lease': dict(body, id=body['name'])}
+
+
+def make_leases(count):
+    return [{'name': 'lease-%d' % i, 'start': '2026-01-01 00:00',
+             'end': '2026-01-08 00:00',
+             'reservations': [{'resource_type': 'physical:host',
+                               'min': 1, 'max': 1}]}
+            for i in range(count)]
+
+
+def run(count=200, latency=0.02, concurrencies=(1, 8, 32)):
+    manager = leases.LeaseClientManager(
+        blazar_url='http://blazar', auth_token='token', session=None)
+    manager.request_manager = _SlowRequestManager(latency)
+    values = make_leases(count)
+    return {
+        'concurrency_%d' % concurrency: timing.measure(
+            lambda: manager.create_many(values, concurrency=concurrency),
+            1, 1)
+        for concurrency in concurrencies
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--leases', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.02)
+    args = parser.parse_args()
+    for name, result in run(args.leases, args.latency).items():
+        timing.report(name, result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of shifting lease dates with strptime and with utils.
+
+Run with ``python -m perf.dates``.
+"""
+
+import argparse
+import datetime
+
+from oslo_utils import timeutils
+
+from blazarclient import utils
+
+from perf import sorting
+from perf import timing
+
+DELTA = datetime.timedelta(days=1)
+
+
+def _strptime_shift(dates):
+    return [(timeutils.parse_strtime(date, utils.LEASE_DATE_FORMAT) +
+             DELTA).strftime(utils.API_DATE_FORMAT) for date in dates]
+
+
+def _cached_shift(dates):
+    return [utils.format_api_date(utils.parse_lease_date(date) + DELTA)
+            for date in dates]
+
+
+def run(count=50000, number=3, repeat=3):
+    dates = [lease['end_date'] for lease in sorting.make_leases(count)]
+    return {
+        'strptime': timing.measure(lambda: _strptime_shift(dates),
+                                   number, repeat),
+        'cached_parser': timing.measure(lambda: _cached_shift(dates),
+                                        number, repeat),
+        'shift_dates': timing.measure(
+            lambda: utils.shift_dates(dates, DELTA), number, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dates', type=int, default=50000)
+    args = parser.parse_args()
+    for name, result in run(args.dates).items():
+        timing.report(name, result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Memory used by each stage of the list commands, traced with tracemalloc.
+
+Run with ``python -m perf.memory --sizes 1000,10000``. For
+each list command and dataset size, the command runs against a fake API
+server loaded with a generated dataset, see blazarclient.testing, and the
+memory allocated by each stage of the list pipeline is reported:
+
+- http_body: the response read from the server;
+- parsed_json: the response decoded and parsed into dicts;
+- sort: the filtering and sorting done by the manager;
+- item_properties: the row tuples built by get_item_properties();
+- formatter: the output written by the formatter.
+
+For each stage, peak is the highest memory reached during the stage and
+retained the memory still held at its end, both relative to its start.
+Retained memory is negative when a stage frees what earlier stages held,
+such as the response once the manager returns.
+``--budget STAGE=MIB`` makes the run exit with 1 when the peak of a stage
+goes over a budget, and check_budgets() does the same for tests.
+
+The server runs in another process so that its allocations are not traced.
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import sys
+import tracemalloc
+
+from keystoneauth1 import session as ks_session
+from keystoneauth1 import token_endpoint
+from oslo_serialization import jsonutils
+import requests
+
+from blazarclient import base
+from blazarclient.testing import fake_server
+from blazarclient.v1 import client
+from blazarclient.v1.shell_commands import allocations
+from blazarclient.v1.shell_commands import hosts
+from blazarclient.v1.shell_commands import leases
+
+STAGES = ('http_body', 'parsed_json', 'sort', 'item_properties',
+          'formatter')
+# List commands by name, with their arguments.
+LISTINGS = {
+    'lease-list': (leases.ListLeases, ['--sort-by', 'name']),
+    'host-list': (hosts.ListHosts, []),
+    'allocation-list': (allocations.ListAllocations, ['host']),
+}
+DEFAULT_SIZES = (1000, 10000)
+
+
+class StageTracer(object):
+    """Record the memory allocated by consecutive stages.
+
+    begin() ends the current stage, if any, and starts the next one.
+    A stage entered several times, for example by paginated requests,
+    accumulates its retained memory and keeps its highest peak.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        # Highest traced memory reached during any stage.
+        self.peak = 0
+        self._current = None
+        self._start = 0
+
+    def begin(self, name):
+        self.end()
+        tracemalloc.reset_peak()
+        self._current = name
+        self._start = tracemalloc.get_traced_memory()[0]
+
+    def end(self):
+        if self._current is None:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        stage = self.stages.setdefault(self._current,
+                                       {'peak': 0, 'retained': 0})
+        stage['peak'] = max(stage['peak'], peak - self._start)
+        stage['retained'] += current - self._start
+        self.peak = max(self.peak, peak)
+        self._current = None
+
+
+class _TracedRequestManager(base.RequestManager):
+    """RequestManager marking where the body is read and parsed."""
+
+    def __init__(self, blazar_url, tracer):
+        super(_TracedRequestManager, self).__init__(blazar_url, 'token',
+                                                    'blazar-memory')
+        self.tracer = tracer
+
+    def request(self, url, method, **kwargs):
+        self.tracer.begin('http_body')
+        resp = requests.request(method, self.blazar_url + url,
+                                headers={'Accept': 'application/json',
+                                         'User-Agent': self.user_agent,
+                                         'x-auth-token': self.auth_token})
+        resp.content
+        self.tracer.begin('parsed_json')
+        body = jsonutils.loads(resp.text)
+        # The manager filters and sorts the body once it is returned.
+        self.tracer.begin('sort')
+        return resp, body
+
+
+def _serve(size, seed, connection):
+    app = fake_server.FakeBlazar()
+    app.populate(hosts=size, leases=size, seed=seed)
+    server = fake_server.make_server(app)
+    connection.send('http://%s:%d' % server.server_address[:2])
+    server.serve_forever()
+
+
+@contextlib.contextmanager
+def server_process(size, seed=0):
+    """Serve a dataset of size hosts and leases from another process.
+
+    Yields the URL of the server.
+    """
+    context = multiprocessing.get_context('spawn')
+    parent, child = context.Pipe()
+    process = context.Process(target=_serve, args=(size, seed, child),
+                              daemon=True)
+    process.start()
+    try:
+        yield parent.recv()
+    finally:
+        process.terminate()
+        process.join()
+
+
+def measure_listing(name, url, formatter='table'):
+    """Trace the memory of a list command.
+
+    :param name: name of LISTINGS.
+    :param url: URL of a Blazar API.
+    :param formatter: output format, as given to --format.
+    :returns: a dict with the peak and retained bytes of each stage, the
+              peak of the whole command and the size of its output.
+    """
+    command_class, args = LISTINGS[name]
+    tracer = StageTracer()
+    blazar_client = client.Client(session=ks_session.Session(
+        auth=token_endpoint.Token(url, 'token')))
+    manager = getattr(blazar_client, command_class.resource)
+    manager.request_manager = _TracedRequestManager(url, tracer)
+    stdout = io.StringIO()
+    app = argparse.Namespace(client=blazar_client, stdout=stdout)
+    command = command_class(app, None)
+    parsed_args = command.get_parser(name).parse_args(
+        args + ['--format', formatter])
+    command.formatter = command._formatter_plugins[parsed_args.formatter].obj
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        data = command.retrieve_list(parsed_args)
+        tracer.begin('item_properties')
+        columns, rows = command.setup_columns(data, parsed_args)
+        rows = list(rows)
+        tracer.begin('formatter')
+        command.produce_output(parsed_args, columns, rows)
+        tracer.end()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return {'stages': tracer.stages, 'peak': tracer.peak - start,
+            'rows': len(rows), 'output': len(stdout.getvalue())}
+
+
+def run(sizes=DEFAULT_SIZES, names=None, formatter='table', seed=0):
+    """Trace the list commands over datasets of each size.
+
+    :returns: a dict of measure_listing() results by size and name.
+    """
+    results = {}
+    for size in sizes:
+        with server_process(size, seed) as url:
+            results[size] = {name: measure_listing(name, url, formatter)
+                             for name in names or LISTINGS}
+    return results
+
+
+def check_budgets(results, budgets):
+    """Return the stages whose peak goes over their budget.
+
+    :param results: run() results.
+    :param budgets: dict of maximum peak bytes by stage name, or 'total'
+                    for the whole command.
+    :returns: a list of messages, empty when every budget is met.
+    """
+    violations = []
+    for size, listings in sorted(results.items()):
+        for name, result in listings.items():
+            peaks = dict((stage, values['peak'])
+                         for stage, values in result['stages'].items())
+            peaks['total'] = result['peak']
+            for stage, budget in budgets.items():
+                if peaks.get(stage, 0) > budget:
+                    violations.append(
+                        '%s with %d records: %s peak %.1f MiB over budget '
+                        '%.1f MiB' % (name, size, stage,
+                                      peaks[stage] / 2.0 ** 20,
+                                      budget / 2.0 ** 20))
+    return violations
+
+
+def report(results, stream=None):
+    """Write a table of run() results, in KiB."""
+    stream = stream or sys.stdout
+    for size, listings in sorted(results.items()):
+        for name, result in listings.items():
+            stream.write('%s, %d records, %d rows, %d bytes of output\n' % (
+                name, size, result['rows'], result['output']))
+            for stage in STAGES:
+                values = result['stages'].get(stage)
+                if values is None:
+                    continue
+                stream.write('  %-16s peak %10.1f KiB  retained %10.1f KiB'
+                             '\n' % (stage, values['peak'] / 1024.0,
+                                     values['retained'] / 1024.0))
+            stream.write('  %-16s peak %10.1f KiB\n' % (
+                'total', result['peak'] / 1024.0))
+
+
+def _budget(value):
+    stage, sep, mebibytes = value.partition('=')
+    if not sep or stage not in STAGES + ('total',):
+        raise argparse.ArgumentTypeError(
+            'budgets are STAGE=MIB, STAGE being one of %s or total' %
+            ', '.join(STAGES))
+    return stage, float(mebibytes) * 2 ** 20
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma separated numbers of leases and hosts')
+    parser.add_argument('--command', dest='names', action='append',
+                        choices=list(LISTINGS),
+                        help='list command to trace, may be repeated')
+    parser.add_argument('--format', dest='formatter', default='table',
+                        help='output format of the commands')
+    parser.add_argument('--budget', dest='budgets', action='append',
+                        type=_budget, default=[], metavar='STAGE=MIB',
+                        help='maximum peak of a stage, may be repeated')
+    parser.add_argument('--output', default=None,
+                        help='file to write the JSON results to')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = run(sizes, args.names, args.formatter)
+    report(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(jsonutils.dumps(results, indent=2, sort_keys=True))
+            f.write('\n')
+    violations = check_budgets(results, dict(args.budgets))
+    for violation in violations:
+        print('OVER BUDGET %s' % violation)
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
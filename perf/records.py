@@ -0,0 +1,116 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Memory benchmark of compact lease records against raw dicts.
+
+Run with ``python -m perf.records``.
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import random
+import time
+import tracemalloc
+
+from blazarclient import records
+from blazarclient import utils
+
+START = datetime.datetime(2026, 1, 1)
+STATUSES = ('PENDING', 'ACTIVE', 'TERMINATED')
+
+
+def make_body(leases=100000, reservations=2, seed=0):
+    """Return a lease list response body, as sent by the API."""
+    rand = random.Random(seed)
+    projects = ['project-%d' % i for i in range(50)]
+    body = []
+    for i in range(leases):
+        start = START + datetime.timedelta(minutes=rand.randint(0, 525600))
+        end = start + datetime.timedelta(days=rand.randint(1, 7))
+        lease_id = '%032x' % rand.getrandbits(128)
+        body.append({
+            'id': lease_id,
+            'name': 'lease-%d' % i,
+            'status': rand.choice(STATUSES),
+            'project_id': rand.choice(projects),
+            'user_id': rand.choice(projects),
+            'start_date': start.strftime(utils.LEASE_DATE_FORMAT),
+            'end_date': end.strftime(utils.LEASE_DATE_FORMAT),
+            'trust_id': '%032x' % rand.getrandbits(128),
+            'degraded': False,
+            'created_at': start.strftime('%Y-%m-%d %H:%M:%S'),
+            'updated_at': None,
+            'events': [],
+            'reservations': [{
+                'id': '%032x' % rand.getrandbits(128),
+                'lease_id': lease_id,
+                'resource_id': '%032x' % rand.getrandbits(128),
+                'resource_type': 'physical:host',
+                'status': 'pending',
+                'min': 1,
+                'max': rand.randint(1, 4),
+                'hypervisor_properties': '',
+                'resource_properties': '["==", "$gpu", "True"]',
+                'before_end': 'default',
+                'created_at': start.strftime('%Y-%m-%d %H:%M:%S'),
+                'updated_at': None,
+            } for _ in range(reservations)],
+        })
+    return json.dumps({'leases': body})
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def run(leases=100000, reservations=2):
+    text = make_body(leases, reservations)
+    dicts, dict_bytes, dict_seconds = _measure(
+        lambda: json.loads(text)['leases'])
+    del dicts
+    compact, record_bytes, record_seconds = _measure(
+        lambda: [records.Lease(lease)
+                 for lease in json.loads(text)['leases']])
+    return {
+        'dict_bytes': dict_bytes,
+        'record_bytes': record_bytes,
+        'dict_seconds': dict_seconds,
+        'record_seconds': record_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--leases', type=int, default=100000)
+    parser.add_argument('--reservations', type=int, default=2,
+                        help='Reservations per lease.')
+    args = parser.parse_args()
+    result = run(args.leases, args.reservations)
+    for kind in ('dict', 'record'):
+        print('%-40s %10.1f MiB  %8.3f s (traced)' % (
+            kind, result['%s_bytes' % kind] / 2.0 ** 20,
+            result['%s_seconds' % kind]))
+    print('%-40s %10.2f' % ('ratio', result['record_bytes'] /
+                            result['dict_bytes']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Microbenchmarks for the output of the show commands.
+
+Run with ``python -m perf.show_output``.
+"""
+
+import argparse
+import types
+
+from oslo_serialization import jsonutils
+
+from blazarclient.v1.shell_commands import allocations
+from blazarclient.v1.shell_commands import hosts
+from blazarclient.v1.shell_commands import leases
+
+from perf import timing
+
+LEASE_ID = '6f3e4a2c-1b7d-4c9e-8a5f-0d2b3c4e5f60'
+
+
+class _FakeManager(object):
+    """Returns a freshly parsed copy of a canned body on every get()."""
+
+    def __init__(self, body):
+        self.body = jsonutils.dumps(body)
+
+    def get(self, *args, **kwargs):
+        return jsonutils.loads(self.body)
+
+
+def make_lease(reservations=50):
+    properties = jsonutils.dumps(
+        ['and'] + [['==', '$key_%d' % i, 'value_%d' % i]
+                   for i in range(20)])
+    return {
+        'id': LEASE_ID,
+        'name': 'lease-bench',
+        'start_date': '2026-01-01T00:00:00.000000',
+        'end_date': '2026-01-08T00:00:00.000000',
+        'status': 'ACTIVE',
+        'degraded': False,
+        'user_id': 'b' * 32,
+        'project_id': 'c' * 32,
+        'trust_id': 'd' * 32,
+        'created_at': '2025-12-31 12:00:00',
+        'updated_at': None,
+        'reservations': [
+            {'id': '%08d-0000-0000-0000-000000000000' % i,
+             'lease_id': LEASE_ID,
+             'status': 'active',
+             'resource_type': 'physical:host',
+             'min': 1,
+             'max': 10,
+             'hypervisor_properties': '',
+             'resource_properties': properties,
+             'before_end': 'default',
+             'missing_resources': False,
+             'resources_changed': False}
+            for i in range(reservations)],
+        'events': [
+            {'id': 'e%d' % i, 'event_type': 'start_lease',
+             'time': '2026-01-01T00:00:00.000000', 'status': 'DONE'}
+            for i in range(3)],
+    }
+
+
+def make_host(capabilities=200):
+    host = {
+        'id': '1',
+        'hypervisor_hostname': 'compute-0001',
+        'hypervisor_type': 'QEMU',
+        'hypervisor_version': 2011000,
+        'vcpus': 64,
+        'memory_mb': 262144,
+        'local_gb': 1800,
+        'cpu_info': jsonutils.dumps({
+            'arch': 'x86_64', 'model': 'Cascadelake-Server',
+            'vendor': 'Intel', 'features': ['f%d' % i for i in range(100)],
+            'topology': {'cells': 2, 'sockets': 2, 'cores': 16,
+                         'threads': 2}}),
+        'service_name': 'compute-0001',
+        'trust_id': 'd' * 32,
+        'reservable': True,
+        'disabled': False,
+        'created_at': '2025-12-31 12:00:00',
+        'updated_at': None,
+    }
+    for i in range(capabilities):
+        host['extra_key_%d' % i] = 'extra_value_%d' % i
+    return host
+
+
+def make_allocation(reservations=500):
+    return {
+        'resource_id': '1',
+        'reservations': [
+            {'id': '%08d-0000-0000-0000-000000000000' % i,
+             'lease_id': '%08d-1111-1111-1111-111111111111' % i,
+             'start_date': '2026-01-01T00:00:00.000000',
+             'end_date': '2026-01-08T00:00:00.000000'}
+            for i in range(reservations)],
+    }
+
+
+def _command(cls, resource, body):
+    client = types.SimpleNamespace(**{resource: _FakeManager(body)})
+    app = types.SimpleNamespace(client=client)
+    return cls(app, None)
+
+
+def run(number=100, repeat=5):
+    """Run the benchmarks and return a dict of measure() results."""
+    show_lease = _command(leases.ShowLease, 'lease', make_lease())
+    lease_args = argparse.Namespace(id=LEASE_ID)
+
+    show_host = _command(hosts.ShowHost, 'host', make_host())
+    host_args = argparse.Namespace(id='1')
+
+    show_allocations = _command(allocations.ShowAllocations, 'allocation',
+                                make_allocation())
+    allocation_args = argparse.Namespace(id='1', resource_type='host',
+                                         lease_id=None, reservation_id=None)
+
+    return {
+        'ShowLease': timing.measure(
+            lambda: show_lease.get_data(lease_args), number, repeat),
+        'ShowHost': timing.measure(
+            lambda: show_host.get_data(host_args), number, repeat),
+        'ShowAllocations': timing.measure(
+            lambda: show_allocations.get_data(allocation_args),
+            number, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    for name, result in run(args.number, args.repeat).items():
+        timing.report(name, result)
+
+
+if __name__ == '__main__':
+    main()
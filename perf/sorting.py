@@ -0,0 +1,73 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of typed lease sorting with and without a limit.
+
+Run with ``python -m perf.sorting``.
+"""
+
+import argparse
+import datetime
+import random
+
+from blazarclient import utils
+
+from perf import timing
+
+START = datetime.datetime(2026, 1, 1)
+STATUSES = ('PENDING', 'ACTIVE', 'TERMINATED', 'ERROR')
+
+
+def make_leases(count=50000, seed=0):
+    rand = random.Random(seed)
+    leases = []
+    for i in range(count):
+        start = START + datetime.timedelta(minutes=rand.randint(0, 525600))
+        end = start + datetime.timedelta(minutes=rand.randint(60, 20160))
+        leases.append({
+            'id': str(i),
+            'name': 'lease-%d' % rand.randint(0, count),
+            'status': rand.choice(STATUSES),
+            'start_date': start.strftime(utils.LEASE_DATE_FORMAT),
+            'end_date': end.strftime(utils.LEASE_DATE_FORMAT),
+        })
+    return leases
+
+
+def run(count=50000, limit=20, number=3, repeat=3):
+    leases = make_leases(count)
+    return {
+        'lexical_sort': timing.measure(
+            lambda: sorted(leases, key=lambda lease: lease['end_date']),
+            number, repeat),
+        'typed_sort': timing.measure(
+            lambda: utils.sort_records(leases, 'end_date'), number, repeat),
+        'typed_top_%d' % limit: timing.measure(
+            lambda: utils.sort_records(leases, 'end_date', limit=limit),
+            number, repeat),
+        'multi_key_top_%d' % limit: timing.measure(
+            lambda: utils.sort_records(leases, 'status,end_date:desc',
+                                       limit=limit), number, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--leases', type=int, default=50000)
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+    for name, result in run(args.leases, args.limit).items():
+        timing.report(name, result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Startup time, import time and peak memory of the CLI commands.
+
+Run with ``python -m perf.startup --output startup.json``, and
+check a later run against it with ``--baseline startup.json``, which exits
+with 1 when a command got slower than the tolerance or imports modules the
+baseline did not.
+
+Each command runs in a new interpreter against the in-process fake API,
+see blazarclient.testing.fake_server:
+
+- a cold run, with an empty bytecode cache so that every module is
+  compiled again; the operating system file cache is not dropped;
+- warm runs, measuring the time to the first byte written to stdout, the
+  total time and the peak RSS;
+- a run with ``-X importtime``, giving the cumulative import time of each
+  module.
+
+``blazar lease-list`` runs blazarclient.shell.main(). ``openstack
+reservation lease list`` loads the OSC plugin and the lease list command
+from their entry points, as OpenStackClient does, and runs the command
+with the client made by the plugin. The whole ``openstack`` command also
+runs when python-openstackclient is installed.
+"""
+
+import argparse
+import importlib.util
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from oslo_serialization import jsonutils
+
+from blazarclient import bench
+from blazarclient.testing import fake_server
+
+# Version of the layout of the JSON results.
+RESULTS_FORMAT = 1
+DEFAULT_TOLERANCE = 0.2
+
+# Written to stderr at exit by every command, read back by _run().
+_RSS_MARKER = 'blazar-startup-maxrss:'
+_PRELUDE = '''
+import atexit
+import resource
+import sys
+
+def _report_rss():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        rss //= 1024
+    sys.stderr.write('%s %%d\\n' %% rss)
+
+atexit.register(_report_rss)
+url = sys.argv[1]
+auth_args = ['--os-auth-type', 'admin_token', '--os-endpoint', url,
+             '--os-token', 'token']
+''' % _RSS_MARKER
+
+_BLAZAR = _PRELUDE + '''
+from blazarclient import shell
+sys.exit(shell.main(auth_args + sys.argv[2:]))
+'''
+
+_OPENSTACK = _PRELUDE + '''
+from openstackclient import shell
+sys.exit(shell.main(auth_args + sys.argv[2:]))
+'''
+
+_OSC_PLUGIN = _PRELUDE + '''
+from importlib import metadata
+import types
+
+from keystoneauth1 import session
+from keystoneauth1 import token_endpoint
+
+plugin, = [ep.load() for ep in metadata.entry_points(
+    group='openstack.cli.extension') if ep.name == 'reservation']
+command_class, = [ep.load() for ep in metadata.entry_points(
+    group='openstack.reservation.v1') if ep.name == 'reservation_lease_list']
+instance = types.SimpleNamespace(
+    _api_version={plugin.API_NAME: plugin.DEFAULT_API_VERSION},
+    session=session.Session(auth=token_endpoint.Token(url, 'token')),
+    interface='public', _region_name=None,
+    get_endpoint_for_service_type=lambda *args, **kwargs: url)
+client_manager = types.SimpleNamespace(
+    reservation=plugin.make_client(instance))
+app = types.SimpleNamespace(client_manager=client_manager, stdin=sys.stdin,
+                            stdout=sys.stdout, stderr=sys.stderr)
+command = command_class(app, None)
+sys.exit(command.run(command.get_parser(
+    'openstack reservation lease list').parse_args(sys.argv[2:])))
+'''
+
+# Commands by name, as (code run by the interpreter, arguments, module
+# which must be importable).
+COMMANDS = {
+    'blazar lease-list': (_BLAZAR, ['lease-list', '-f', 'value'], None),
+    'openstack reservation lease list': (
+        _OSC_PLUGIN, ['-f', 'value'], None),
+    'openstack (full CLI)': (
+        _OPENSTACK, ['reservation', 'lease', 'list', '-f', 'value'],
+        'openstackclient'),
+}
+
+_IMPORT_TIME = re.compile(
+    r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+
+def available_commands():
+    """Return the names of the commands which can run here, in order."""
+    return [name for name, (code, args, module) in COMMANDS.items()
+            if module is None or importlib.util.find_spec(module)]
+
+
+def _run(name, url, env, python_args=()):
+    """Run a command once and return its timings and stderr."""
+    code, args, module = COMMANDS[name]
+    argv = [sys.executable] + list(python_args) + ['-c', code, url] + args
+    # stderr goes to a file, as a full pipe would block the command before
+    # it writes to stdout.
+    with tempfile.TemporaryFile() as stderr_file:
+        started = time.perf_counter()
+        process = subprocess.Popen(argv, stdout=subprocess.PIPE,
+                                   stderr=stderr_file, env=env)
+        first_byte = process.stdout.read(1)
+        first_byte_time = time.perf_counter() - started
+        process.communicate()
+        wall_time = time.perf_counter() - started
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode('utf-8', 'replace')
+    if process.returncode or not first_byte:
+        raise RuntimeError('%s failed with code %s:\n%s' % (
+            name, process.returncode, stderr))
+    max_rss = None
+    for line in stderr.splitlines():
+        if line.startswith(_RSS_MARKER):
+            max_rss = int(line[len(_RSS_MARKER):])
+    return {'first_byte': first_byte_time, 'wall': wall_time,
+            'max_rss_kb': max_rss}, stderr
+
+
+def parse_import_times(stderr):
+    """Return the cumulative import time of each module in microseconds.
+
+    :param stderr: output of a ``python -X importtime`` run.
+    """
+    imports = {}
+    for line in stderr.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match:
+            imports[match.group(4)] = int(match.group(2))
+    return imports
+
+
+def measure(name, url, warm_runs=5):
+    """Measure a command.
+
+    :returns: a dict with the cold run, the best and mean of the warm runs,
+              and the cumulative import time of each module.
+    """
+    with tempfile.TemporaryDirectory() as cache:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=cache)
+        cold = _run(name, url, env)[0]
+        runs = [_run(name, url, env)[0] for i in range(warm_runs)]
+        stderr = _run(name, url, env, ('-X', 'importtime'))[1]
+    warm = {key: {'best': min(run[key] for run in runs),
+                  'mean': sum(run[key] for run in runs) / len(runs)}
+            for key in ('first_byte', 'wall')}
+    warm['max_rss_kb'] = max(run['max_rss_kb'] or 0 for run in runs)
+    return {'cold': cold, 'warm': warm,
+            'imports': parse_import_times(stderr)}
+
+
+def run(names=None, warm_runs=5, size=100):
+    """Measure commands against a fake server.
+
+    :param names: names of COMMANDS, all the available ones by default.
+    :param warm_runs: number of warm runs of each command.
+    :param size: number of leases returned by lease list.
+    """
+    app = fake_server.FakeBlazar()
+    app.populate(hosts=size, leases=size)
+    with fake_server.serve(app) as url:
+        return {name: measure(name, url, warm_runs)
+                for name in names or available_commands()}
+
+
+def report(results, top=10, stream=None):
+    """Write a summary of run() results."""
+    stream = stream or sys.stdout
+    for name, result in results.items():
+        cold, warm = result['cold'], result['warm']
+        stream.write(
+            '%s\n  cold: first byte %8.1f ms  total %8.1f ms\n'
+            '  warm: first byte %8.1f ms  total %8.1f ms  peak RSS %d KiB\n'
+            % (name, cold['first_byte'] * 1000, cold['wall'] * 1000,
+               warm['first_byte']['best'] * 1000,
+               warm['wall']['best'] * 1000, warm['max_rss_kb']))
+        imports = sorted(result['imports'].items(),
+                         key=lambda item: item[1], reverse=True)
+        for module, microseconds in imports[:top]:
+            stream.write('    %-50s %8.1f ms\n' % (module,
+                                                   microseconds / 1000.0))
+
+
+def compare(baseline, results, tolerance=DEFAULT_TOLERANCE):
+    """Return the regressions of results from a baseline.
+
+    A command regresses when its best warm time to first byte or its
+    peak RSS grew by more than tolerance, or when it imports modules
+    which it did not in the baseline.
+
+    :returns: a list of messages, empty without regressions.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]['warm'], result['warm']
+        for label, old, new, unit in (
+                ('first byte time', before['first_byte']['best'] * 1000,
+                 after['first_byte']['best'] * 1000, 'ms'),
+                ('peak RSS', before['max_rss_kb'], after['max_rss_kb'],
+                 'KiB')):
+            if old and new > old * (1 + tolerance):
+                regressions.append(
+                    '%s: %s went from %.1f %s to %.1f %s (+%d%%)' % (
+                        name, label, old, unit, new, unit,
+                        (new / old - 1) * 100))
+        new_modules = set(result['imports']) - set(baseline[name]['imports'])
+        if new_modules:
+            regressions.append('%s: new imports %s' % (
+                name, ', '.join(sorted(new_modules))))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5,
+                        help='number of warm runs of each command')
+    parser.add_argument('--size', type=int, default=100,
+                        help='number of leases listed')
+    parser.add_argument('--command', dest='names', action='append',
+                        choices=list(COMMANDS),
+                        help='command to measure, may be repeated')
+    parser.add_argument('--top', type=int, default=10,
+                        help='number of slowest imports shown')
+    parser.add_argument('--output', default=None,
+                        help='file to write the JSON results to')
+    parser.add_argument('--baseline', default=None,
+                        help='JSON results to check these ones against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown, as a fraction')
+    args = parser.parse_args(argv)
+
+    results = run(args.names, args.runs, args.size)
+    report(results, args.top)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(jsonutils.dumps(
+                {'format': RESULTS_FORMAT,
+                 'metadata': bench.metadata(runs=args.runs,
+                                            size=args.size),
+                 'results': results}, indent=2, sort_keys=True))
+            f.write('\n')
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = jsonutils.loads(f.read())
+        if baseline.get('format') != RESULTS_FORMAT:
+            parser.error('%s is not a startup results file of format %d.'
+                         % (args.baseline, RESULTS_FORMAT))
+        regressions = compare(baseline['results'], results, args.tolerance)
+        for regression in regressions:
+            print('REGRESSION %s' % regression)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,356 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark suite of the client and CLI hot paths, with JSON results.
+
+Run with ``python -m perf.suite --output results.json``, then
+compare two runs with ``python -m perf.suite --compare
+before.json after.json``.
+
+Requests are answered by an in-process fake Blazar API on a local port,
+see blazarclient.testing.fake_server, so the numbers include the HTTP
+round trips but no network or server latency. Results are only comparable
+between runs made on the same machine with the same --size.
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import logging
+import re
+import sys
+
+from keystoneauth1 import session as ks_session
+from keystoneauth1 import token_endpoint
+from oslo_serialization import jsonutils
+
+from blazarclient import base
+from blazarclient import bench
+from blazarclient import command
+from blazarclient import shell
+from blazarclient.testing import fake_server
+from blazarclient import utils
+from blazarclient.v1 import client
+from blazarclient.v1.shell_commands import leases as lease_commands
+
+from perf import show_output
+from perf import timing
+
+# Version of the layout of the JSON results.
+RESULTS_FORMAT = 1
+
+_BENCHMARKS = []
+
+
+def benchmark(name, number=None):
+    """Register a benchmark.
+
+    The decorated function takes a Context and returns the callable to
+    time. number overrides the suite's calls per timing run, for slow
+    benchmarks.
+    """
+    def decorator(factory):
+        _BENCHMARKS.append((name, factory, number))
+        return factory
+    return decorator
+
+
+class Context(object):
+    """Fake server, clients and data shared by the benchmarks.
+
+    :param url: base URL of the fake server.
+    :param app: the FakeBlazar application serving it.
+    :param size: number of leases and hosts loaded in it.
+    """
+
+    def __init__(self, url, app, size):
+        self.url = url
+        self.app = app
+        self.size = size
+        self.session = ks_session.Session(
+            auth=token_endpoint.Token(url, 'token'))
+        self.client = client.Client(session=self.session)
+        self.lease_id = next(iter(app.leases))
+        self.host_id = next(iter(app.hosts))
+        self.floatingip_id = next(iter(app.floatingips))
+        self.leases = self.client.lease.list()
+
+
+def _remove_created(store):
+    """Return a callable removing a created resource from store.
+
+    Created resources are dropped right away, so that the size of the
+    dataset does not depend on the number of timing runs.
+    """
+    def remove(resource):
+        store.pop(resource['id'], None)
+    return remove
+
+
+@benchmark('client.construction')
+def _client_construction(context):
+    return lambda: client.Client(session=context.session)
+
+
+@benchmark('request_manager.get')
+def _request_manager_get(context):
+    manager = base.RequestManager(context.url, 'token', 'blazar-bench')
+    url = '/leases/%s' % context.lease_id
+    return lambda: manager.get(url)
+
+
+@benchmark('lease.list', number=10)
+def _lease_list(context):
+    return context.client.lease.list
+
+
+@benchmark('lease.get')
+def _lease_get(context):
+    return lambda: context.client.lease.get(context.lease_id)
+
+
+@benchmark('lease.create')
+def _lease_create(context):
+    remove = _remove_created(context.app.leases)
+    reservations = [{'resource_type': 'virtual:floatingip',
+                     'network_id': 'public', 'amount': 1,
+                     'required_floatingips': []}]
+    return lambda: remove(context.client.lease.create(
+        'bench', '2030-01-01 00:00', '2030-01-02 00:00', reservations, []))
+
+
+@benchmark('host.list', number=10)
+def _host_list(context):
+    return context.client.host.list
+
+
+@benchmark('host.get')
+def _host_get(context):
+    return lambda: context.client.host.get(context.host_id)
+
+
+@benchmark('host.create')
+def _host_create(context):
+    remove = _remove_created(context.app.hosts)
+    return lambda: remove(context.client.host.create('bench', rack='r1'))
+
+
+@benchmark('floatingip.list', number=10)
+def _floatingip_list(context):
+    return context.client.floatingip.list
+
+
+@benchmark('floatingip.get')
+def _floatingip_get(context):
+    return lambda: context.client.floatingip.get(context.floatingip_id)
+
+
+@benchmark('floatingip.create')
+def _floatingip_create(context):
+    remove = _remove_created(context.app.floatingips)
+    return lambda: remove(context.client.floatingip.create(
+        'public', '192.0.2.1'))
+
+
+@benchmark('allocation.list', number=10)
+def _allocation_list(context):
+    return lambda: context.client.allocation.list('os-hosts')
+
+
+@benchmark('allocation.get')
+def _allocation_get(context):
+    return lambda: context.client.allocation.get('os-hosts',
+                                                 context.host_id)
+
+
+@benchmark('utils.get_item_properties', number=10)
+def _get_item_properties(context):
+    fields = ('id', 'name', 'start_date', 'end_date', 'status')
+    return lambda: [utils.get_item_properties(lease, fields)
+                    for lease in context.leases]
+
+
+@benchmark('command.format_output_data')
+def _format_output_data(context):
+    show = lease_commands.ShowLease(None, None)
+    lease = show_output.make_lease()
+    return lambda: show.format_output_data(copy.deepcopy(lease))
+
+
+@benchmark('lease_create.args2body')
+def _lease_create_args2body(context):
+    create = lease_commands.CreateLease(None, None)
+    parsed_args = create.get_parser('lease-create').parse_args([
+        '--start-date', '2030-01-01 00:00', '--end-date', '2030-01-02 00:00',
+        '--physical-reservation',
+        'min=1,max=2,resource_properties=["and", ["==", "$gpu", "True"], '
+        '[">=", "$memory_mb", "65536"]]',
+        '--reservation',
+        'resource_type=virtual:instance,vcpus=4,memory_mb=8192,disk_gb=40,'
+        'amount=10,affinity=False',
+        '--event', 'event_type=notification,event_date=2030-01-01 12:00',
+        'bench'])
+    return lambda: create.args2body(parsed_args)
+
+
+@benchmark('utils.find_resource_id_by_name_or_id', number=10)
+def _find_resource_id(context):
+    name = context.leases[-1]['name']
+    return lambda: utils.find_resource_id_by_name_or_id(
+        context.client, 'lease', name, 'name', command.UUID_PATTERN)
+
+
+def _shell_command(context, *argv):
+    """Return a callable running a CLI command against the fake server."""
+    argv = ['--os-auth-type', 'admin_token', '--os-endpoint', context.url,
+            '--os-token', 'token'] + list(argv)
+
+    def run():
+        # BlazarShell.run() adds a handler to the root logger and writes to
+        # stdout, both are restored after each command.
+        root_logger = logging.getLogger()
+        handlers, level = root_logger.handlers[:], root_logger.level
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = shell.BlazarShell().run(argv)
+        finally:
+            root_logger.handlers[:] = handlers
+            root_logger.setLevel(level)
+        if result:
+            raise RuntimeError('%s failed.' % ' '.join(argv))
+    return run
+
+
+@benchmark('shell.lease-list', number=5)
+def _shell_lease_list(context):
+    return _shell_command(context, 'lease-list', '-f', 'value')
+
+
+@benchmark('shell.lease-show', number=5)
+def _shell_lease_show(context):
+    return _shell_command(context, 'lease-show', context.lease_id)
+
+
+@benchmark('shell.host-list', number=5)
+def _shell_host_list(context):
+    return _shell_command(context, 'host-list', '-f', 'value')
+
+
+@benchmark('shell.allocation-list', number=5)
+def _shell_allocation_list(context):
+    return _shell_command(context, 'allocation-list', 'host', '-f', 'value')
+
+
+def names():
+    """Return the names of the registered benchmarks, in order."""
+    return [name for name, factory, number in _BENCHMARKS]
+
+
+def run(size=1000, number=100, repeat=5, pattern=None, seed=0):
+    """Run the benchmarks against a fake server with size leases.
+
+    :param size: number of leases, hosts and floating IPs in the dataset.
+    :param number: calls per timing run, unless set by the benchmark.
+    :param repeat: number of timing runs.
+    :param pattern: regular expression selecting benchmarks by name.
+    :param seed: seed of the generated dataset.
+    :returns: a dict of measure() results by benchmark name.
+    """
+    app = fake_server.FakeBlazar()
+    app.populate(hosts=size, leases=size, floatingips=size, seed=seed)
+    results = {}
+    with fake_server.serve(app) as url:
+        context = Context(url, app, size)
+        for name, factory, bench_number in _BENCHMARKS:
+            if pattern and not re.search(pattern, name):
+                continue
+            results[name] = timing.measure(factory(context),
+                                           bench_number or number, repeat)
+    return results
+
+
+def dump_results(results, stream, **options):
+    """Write results and their metadata as JSON."""
+    stream.write(jsonutils.dumps({'format': RESULTS_FORMAT,
+                                  'metadata': bench.metadata(**options),
+                                  'results': results},
+                                 indent=2, sort_keys=True))
+    stream.write('\n')
+
+
+def load_results(path):
+    """Return the results saved by dump_results() in a file."""
+    with open(path) as f:
+        data = jsonutils.loads(f.read())
+    if data.get('format') != RESULTS_FORMAT:
+        raise ValueError('%s is not a benchmark results file of format %d.'
+                         % (path, RESULTS_FORMAT))
+    return data
+
+
+def compare(before, after):
+    """Compare the best times of two result sets.
+
+    :returns: a list of (name, best before, best after, after / before)
+              tuples for the benchmarks found in both.
+    """
+    return [(name, before[name]['best'], after[name]['best'],
+             after[name]['best'] / before[name]['best'])
+            for name in after if name in before]
+
+
+def report_comparison(rows, stream=None):
+    """Write the output of compare() as a table."""
+    stream = stream or sys.stdout
+    for name, best_before, best_after, ratio in rows:
+        stream.write('%-40s %10.3f ms -> %10.3f ms  %6.2fx\n' % (
+            name, best_before * 1000, best_after * 1000, ratio))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1000,
+                        help='number of leases, hosts and floating IPs')
+    parser.add_argument('--number', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', dest='pattern', default=None,
+                        help='regular expression selecting benchmarks')
+    parser.add_argument('--output', default=None,
+                        help='file to write the JSON results to')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'),
+                        help='compare two JSON results files instead')
+    parser.add_argument('--list', action='store_true',
+                        help='list the benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print('\n'.join(names()))
+        return 0
+    if args.compare:
+        before, after = (load_results(path)['results']
+                         for path in args.compare)
+        report_comparison(compare(before, after))
+        return 0
+
+    results = run(args.size, args.number, args.repeat, args.pattern)
+    for name, result in results.items():
+        timing.report(name, result)
+    if args.output:
+        with open(args.output, 'w') as f:
+            dump_results(results, f, size=args.size, number=args.number,
+                         repeat=args.repeat)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the stream-table formatter against PrettyTable.
+
+Run with ``python -m perf.table_formatter [--rows N]``.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+from cliff.formatters import table
+
+from blazarclient import formatters
+
+COLUMNS = ['id', 'hypervisor_hostname', 'vcpus', 'memory_mb', 'local_gb']
+
+
+class _Sink(object):
+    """Output stream recording the time of the first write."""
+
+    def __init__(self):
+        self.first_write = None
+        self.size = 0
+
+    def write(self, text):
+        if self.first_write is None:
+            self.first_write = time.perf_counter()
+        self.size += len(text)
+
+
+def host_rows(count):
+    """Yield synthetic host-list rows."""
+    for i in range(count):
+        yield (str(i), 'compute-%06d.example.org' % i, 64, 262144, 1800)
+
+
+def _run(formatter, parsed_args, rows, memory):
+    sink = _Sink()
+    start = time.perf_counter()
+    formatter.emit_list(COLUMNS, host_rows(rows), sink, parsed_args)
+    end = time.perf_counter()
+    result = {
+        'seconds': end - start,
+        'first_byte_seconds': sink.first_write - start,
+        'output_bytes': sink.size,
+    }
+    if memory:
+        # NOTE: tracemalloc slows allocations down a lot, so peak memory is
+        #       measured in a separate run from the timings.
+        tracemalloc.start()
+        formatter.emit_list(COLUMNS, host_rows(rows), _Sink(), parsed_args)
+        result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def run(rows=100000, memory=False):
+    """Format rows with both formatters and return their measurements."""
+    prettytable_args = argparse.Namespace(print_empty=False, max_width=0,
+                                          fit_width=False)
+    stream_args = argparse.Namespace(
+        sample_rows=formatters.DEFAULT_SAMPLE_ROWS, column_widths=[])
+    return {
+        'prettytable': _run(table.TableFormatter(), prettytable_args, rows,
+                            memory),
+        'stream-table': _run(formatters.StreamingTableFormatter(),
+                             stream_args, rows, memory),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--memory', action='store_true',
+                        help='Also measure peak memory with tracemalloc.')
+    args = parser.parse_args()
+    for name, result in run(args.rows, args.memory).items():
+        line = '%-14s total %8.3f s  first byte %8.3f s' % (
+            name, result['seconds'], result['first_byte_seconds'])
+        if 'peak_bytes' in result:
+            line += '  peak %8.1f MiB' % (result['peak_bytes'] / 2.0 ** 20)
+        sys.stdout.write(line + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+
+import testtools
+
+from blazarclient import analytics
+from blazarclient import tests
+
+from perf import allocation_index
+from perf import create_many
+from perf import dates
+from perf import memory
+from perf import records
+from perf import show_output
+from perf import sorting
+from perf import startup
+from perf import suite
+from perf import table_formatter
+from perf import timing
+from perf import tokenizer
+from perf import utilization
+from perf import validation
+
+
+class BenchmarksTestCase(tests.TestCase):
+    """Run each benchmark at a minimal size."""
+
+    def assertMeasured(self, result):
+        self.assertEqual({'number', 'repeat', 'best', 'mean'}, set(result))
+        self.assertGreaterEqual(result['mean'], result['best'])
+
+    def test_timing(self):
+        result = timing.measure(lambda: None, number=2, repeat=3)
+        self.assertMeasured(result)
+        self.assertEqual((2, 3), (result['number'], result['repeat']))
+        stream = io.StringIO()
+        timing.report('noop', result, stream)
+        self.assertIn('(3 x 2)', stream.getvalue())
+
+    def test_allocation_index(self):
+        results = allocation_index.run(hosts=20, reservations=5, number=1,
+                                       repeat=1)
+        self.assertGreater(results.pop('build_seconds'), 0)
+        for result in results.values():
+            self.assertMeasured(result)
+
+    def test_create_many(self):
+        results = create_many.run(count=4, latency=0, concurrencies=(1, 2))
+        self.assertEqual(['concurrency_1', 'concurrency_2'], sorted(results))
+
+    def test_dates(self):
+        results = dates.run(count=10, number=1, repeat=1)
+        self.assertEqual({'strptime', 'cached_parser', 'shift_dates'},
+                         set(results))
+
+    def test_records(self):
+        results = records.run(leases=10, reservations=1)
+        self.assertLess(results['record_bytes'], results['dict_bytes'])
+
+    def test_show_output(self):
+        results = show_output.run(number=1, repeat=1)
+        self.assertEqual({'ShowLease', 'ShowHost', 'ShowAllocations'},
+                         set(results))
+
+    def test_sorting(self):
+        results = sorting.run(count=10, limit=3, number=1, repeat=1)
+        self.assertIn('typed_top_3', results)
+
+    def test_table_formatter(self):
+        results = table_formatter.run(rows=10)
+        self.assertEqual({'prettytable', 'stream-table'}, set(results))
+
+    def test_tokenizer(self):
+        results = tokenizer.run(terms=(1, 5), number=1, repeat=1)
+        self.assertEqual(['regex_1_terms', 'regex_5_terms',
+                          'tokenizer_1_terms', 'tokenizer_5_terms'],
+                         sorted(results))
+
+    @testtools.skipIf(analytics.numpy is None, 'NumPy is not installed')
+    def test_utilization(self):
+        results = utilization.run(hosts=5, reservations=5, number=1,
+                                  repeat=1)
+        self.assertEqual(25, results['reservations'])
+        self.assertMeasured(results['utilization'])
+
+    def test_validation(self):
+        results = validation.run(count=5, number=1, repeat=1)
+        self.assertMeasured(results['validate_5_leases'])
+
+    def test_suite(self):
+        results = suite.run(size=5, number=1, repeat=1)
+        self.assertEqual(suite.names(), list(results))
+        stream = io.StringIO()
+        suite.dump_results(results, stream, size=5)
+        self.assertIn('"size": 5', stream.getvalue())
+
+    def test_memory(self):
+        results = memory.run(sizes=(5,), names=['lease-list'])
+        result = results[5]['lease-list']
+        self.assertEqual(5, result['rows'])
+        self.assertLessEqual(set(result['stages']), set(memory.STAGES))
+
+    def test_startup(self):
+        results = startup.run(names=['blazar lease-list'], warm_runs=1,
+                              size=5)
+        result = results['blazar lease-list']
+        self.assertGreater(result['warm']['first_byte']['best'], 0)
+        self.assertIn('blazarclient', result['imports'])
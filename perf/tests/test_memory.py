@@ -0,0 +1,62 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import argparse
+
+from blazarclient import tests
+
+from perf import memory
+
+MIB = 2 ** 20
+
+
+class MemoryTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(MemoryTestCase, self).setUp()
+        self.results = {
+            1000: {'lease-list': {
+                'stages': {'http_body': {'peak': 2 * MIB, 'retained': 0},
+                           'sort': {'peak': MIB, 'retained': 0}},
+                'peak': 3 * MIB, 'rows': 1000, 'output': 0}},
+            10: {'host-list': {
+                'stages': {'http_body': {'peak': MIB // 2, 'retained': 0}},
+                'peak': MIB, 'rows': 10, 'output': 0}},
+        }
+
+    def test_check_budgets(self):
+        self.assertEqual([], memory.check_budgets(
+            self.results, {'http_body': 2 * MIB, 'total': 3 * MIB}))
+        self.assertEqual(
+            ['host-list with 10 records: total peak 1.0 MiB over budget '
+             '0.5 MiB',
+             'lease-list with 1000 records: http_body peak 2.0 MiB over '
+             'budget 1.5 MiB',
+             'lease-list with 1000 records: total peak 3.0 MiB over budget '
+             '0.5 MiB'],
+            memory.check_budgets(self.results, {'http_body': 1.5 * MIB,
+                                                'total': MIB // 2}))
+
+    def test_check_budgets_missing_stage(self):
+        # Stages which did not run, like sort in host-list, are within
+        # any budget.
+        self.assertEqual(
+            ['lease-list with 1000 records: sort peak 1.0 MiB over budget '
+             '0.0 MiB'],
+            memory.check_budgets(self.results, {'sort': 0, 'formatter': 0}))
+
+    def test_budget(self):
+        self.assertEqual(('sort', 1.5 * MIB), memory._budget('sort=1.5'))
+        self.assertEqual(('total', 10 * MIB), memory._budget('total=10'))
+        self.assertRaises(argparse.ArgumentTypeError, memory._budget, 'sort')
+        self.assertRaises(argparse.ArgumentTypeError, memory._budget,
+                          'parse=1')
@@ -0,0 +1,69 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from blazarclient import tests
+
+from perf import startup
+
+
+def _result(first_byte, max_rss_kb, imports):
+    return {'warm': {'first_byte': {'best': first_byte, 'mean': first_byte},
+                     'wall': {'best': 0.5, 'mean': 0.5},
+                     'max_rss_kb': max_rss_kb},
+            'imports': dict.fromkeys(imports, 100)}
+
+
+class StartupTestCase(tests.TestCase):
+
+    def setUp(self):
+        super(StartupTestCase, self).setUp()
+        self.baseline = {
+            'blazar lease-list': _result(0.1, 40000, ['blazarclient']),
+        }
+
+    def test_compare_within_tolerance(self):
+        results = {'blazar lease-list': _result(0.119, 47000,
+                                                ['blazarclient'])}
+        self.assertEqual([], startup.compare(self.baseline, results))
+
+    def test_compare_regressions(self):
+        results = {'blazar lease-list': _result(
+            0.15, 60000, ['blazarclient', 'yaml', 'numpy'])}
+        self.assertEqual(
+            ['blazar lease-list: first byte time went from 100.0 ms to '
+             '150.0 ms (+50%)',
+             'blazar lease-list: peak RSS went from 40000.0 KiB to '
+             '60000.0 KiB (+50%)',
+             'blazar lease-list: new imports numpy, yaml'],
+            startup.compare(self.baseline, results))
+        self.assertEqual(
+            ['blazar lease-list: new imports numpy, yaml'],
+            startup.compare(self.baseline, results, tolerance=0.6))
+
+    def test_compare_skips_new_commands(self):
+        results = {'openstack reservation lease list': _result(
+            1.0, 90000, ['openstackclient'])}
+        self.assertEqual([], startup.compare(self.baseline, results))
+
+    def test_compare_without_rss(self):
+        self.baseline['blazar lease-list']['warm']['max_rss_kb'] = 0
+        results = {'blazar lease-list': _result(0.1, 60000,
+                                                ['blazarclient'])}
+        self.assertEqual([], startup.compare(self.baseline, results))
+
+    def test_parse_import_times(self):
+        stderr = ('import time: self [us] | cumulative | imported package\n'
+                  'import time:       120 |        120 |   _io\n'
+                  'import time:      2000 |      15000 | blazarclient\n'
+                  'blazar-startup-maxrss:40000\n')
+        self.assertEqual({'_io': 120, 'blazarclient': 15000},
+                         startup.parse_import_times(stderr))
@@ -0,0 +1,41 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Helpers shared by the blazarclient microbenchmarks."""
+
+import sys
+import timeit
+
+
+def measure(func, number=100, repeat=5):
+    """Time func and return per-call statistics in seconds.
+
+    :param func: callable taking no arguments.
+    :param number: calls per timing run.
+    :param repeat: number of timing runs.
+    """
+    runs = timeit.Timer(func).repeat(repeat=repeat, number=number)
+    per_call = [run / number for run in runs]
+    return {
+        'number': number,
+        'repeat': repeat,
+        'best': min(per_call),
+        'mean': sum(per_call) / len(per_call),
+    }
+
+
+def report(name, result, stream=None):
+    """Write a one-line summary of a measure() result."""
+    stream = stream or sys.stdout
+    stream.write('%-40s best %10.3f ms  mean %10.3f ms  (%d x %d)\n' % (
+        name, result['best'] * 1000, result['mean'] * 1000,
+        result['repeat'], result['number']))
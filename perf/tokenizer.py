@@ -0,0 +1,71 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the parsing of long --reservation strings.
+
+Run with ``python -m perf.tokenizer``. The regular expression
+based parser previously used by lease-create is kept here for comparison.
+"""
+
+import argparse
+import re
+
+from blazarclient import utils
+
+from perf import timing
+
+KEYS = ('min', 'max', 'hypervisor_properties', 'resource_properties',
+        'before_end', 'resource_type')
+
+
+def _regex_split(text, keys=KEYS):
+    pairs = []
+    prog = re.compile('^(?:(.*),)?(%s)=(.*)$' % '|'.join(keys))
+    while text:
+        match = prog.search(text)
+        if match is None:
+            raise ValueError(text)
+        pairs.append(match.group(2, 3))
+        text = match.group(1) or ''
+    return pairs[::-1]
+
+
+def make_reservation(terms):
+    expression = ', '.join('["==", "$key%d", "value%d"]' % (i, i)
+                           for i in range(terms))
+    return ('resource_type=physical:host,min=1,max=2,'
+            'hypervisor_properties=["and", %s],'
+            'resource_properties=["or", %s],before_end=default'
+            % (expression, expression))
+
+
+def run(terms=(1, 50, 500), number=200, repeat=3):
+    results = {}
+    for count in terms:
+        text = make_reservation(count)
+        results['regex_%d_terms' % count] = timing.measure(
+            lambda: _regex_split(text), number, repeat)
+        results['tokenizer_%d_terms' % count] = timing.measure(
+            lambda: utils.split_key_values(text, KEYS), number, repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=200)
+    args = parser.parse_args()
+    for name, result in run(number=args.number).items():
+        timing.report(name, result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of utilization binning against a Python loop.
+
+Run with ``python -m perf.utilization``. NumPy is required.
+"""
+
+import argparse
+
+from blazarclient import analytics
+from blazarclient import utils
+
+from perf import allocation_index as perf_allocation_index
+from perf import timing
+
+
+def _python_utilization(allocations, start, end, resolution):
+    bins = [0.0] * int(-(-(end - start) // resolution))
+    for allocation in allocations:
+        for reservation in allocation['reservations']:
+            left = max(utils.to_timestamp(
+                reservation['start_date']), start)
+            right = min(utils.to_timestamp(
+                reservation['end_date']), end)
+            while left < right:
+                index = int((left - start) // resolution)
+                bin_end = min(start + (index + 1) * resolution, right)
+                bins[index] += bin_end - left
+                left = bin_end
+    return bins
+
+
+def run(hosts=1000, reservations=400, resolution=3600, number=3, repeat=3):
+    allocations = perf_allocation_index.make_allocations(hosts, reservations)
+    starts, ends, weights = analytics.allocation_arrays(allocations)[None]
+    start, end = starts.min(), ends.max()
+    return {
+        'reservations': len(starts),
+        'days': (end - start) / 86400,
+        'arrays': timing.measure(
+            lambda: analytics.allocation_arrays(allocations), 1, repeat),
+        'utilization': timing.measure(
+            lambda: analytics.utilization(starts, ends, weights, start, end,
+                                          resolution), number, repeat),
+        'python_loop': timing.measure(
+            lambda: _python_utilization(allocations, start, end, resolution),
+            1, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hosts', type=int, default=1000)
+    parser.add_argument('--reservations', type=int, default=400,
+                        help='Reservations per host.')
+    parser.add_argument('--resolution', type=int, default=3600,
+                        help='Width of the bins in seconds.')
+    args = parser.parse_args()
+    results = run(args.hosts, args.reservations, args.resolution)
+    print('%d reservations over %.0f days' % (results.pop('reservations'),
+                                              results.pop('days')))
+    for name, result in results.items():
+        timing.report(name, result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark of the offline validation of lease bodies.
+
+Run with ``python -m perf.validation``.
+"""
+
+import argparse
+
+from blazarclient import validation
+
+from perf import create_many
+from perf import timing
+
+
+def run(count=2000, number=3, repeat=3):
+    leases = create_many.make_leases(count)
+    for values in leases:
+        values['reservations'][0].update(
+            hypervisor_properties='',
+            resource_properties='["==", "$gpu", "True"]')
+    return {
+        'validate_%d_leases' % count: timing.measure(
+            lambda: [validation.find_errors('lease', values)
+                     for values in leases], number, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--leases', type=int, default=2000)
+    args = parser.parse_args()
+    for name, result in run(args.leases).items():
+        timing.report(name, result)
+
+
+if __name__ == '__main__':
+    main()